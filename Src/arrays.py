@@ -0,0 +1,190 @@
+import weakref
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:   # без numpy модуль импортируется, но функции недоступны
+    np = None
+
+# Режимы, которые Pillow может держать поверх чужого буфера без копирования:
+# режим -> каналов в массиве; RGB хранится внутри Pillow по 4 байта на пиксель (RGBX),
+# поэтому наружу отдаётся срез [..., :3] массива (h, w, 4). L и RGBA отображаются через
+# Image.frombuffer, RGB - через внутренний API Pillow, если он есть (иначе RGB копируется)
+SHARED_MODES = {'L': 1, 'RGB': 3, 'RGBA': 4}
+
+# Изображения, отображённые на массивы: id(изображения) -> (массив, ядро Pillow при отображении);
+# запись удаляется вместе с изображением
+_shared = {}
+
+# Доступно ли отображение RGB без копии (проверяется при первом обращении, см. _rgb_mapping)
+_RGB_MAPPING = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Для обмена с массивами нужен numpy")
+
+
+def _map_rgb(buffer, size: tuple) -> Image.Image:
+    """
+    RGB поверх буфера (h, w, 4): Image.frombuffer отображает RGB только как RGBX, поэтому
+    буфер отображается напрямую, как внутри frombuffer (внутренний API Pillow, см. _rgb_mapping)
+    """
+    image = Image.new('RGB', (0, 0))._new(Image.core.map_buffer(buffer, size, 'raw', 0, ('RGB', 0, 1)))
+    image.readonly = 1
+    return image
+
+
+def _new_rgb(size: tuple, fill) -> Image.Image:
+    """
+    RGB в новом буфере (h, w, 4), заполненном fill(image) на месте - одна копия пикселей
+    (только при доступном _map_rgb: запись идёт в обход копирования при записи)
+    """
+    width, height = size
+    image = _map(np.empty((height, width, 4), dtype=np.uint8), 'RGB', size)
+    image.readonly = 0
+    fill(image)
+    image.readonly = 1
+    return image
+
+
+def _rgb_mapping() -> bool:
+    """Проверка, что эта версия Pillow отображает RGB на буфер без копии; иначе RGB копируется"""
+    global _RGB_MAPPING
+    if _RGB_MAPPING is None:
+        try:
+            buffer = np.zeros((1, 2, 4), dtype=np.uint8)
+            image = _map_rgb(buffer, (2, 1))
+            buffer[0, 1, :3] = (1, 2, 3)
+            _RGB_MAPPING = image.getpixel((1, 0)) == (1, 2, 3)
+        except Exception:
+            _RGB_MAPPING = False
+    return _RGB_MAPPING
+
+
+def can_share(mode: str) -> bool:
+    """Может ли изображение этого режима отображаться на массив без копирования"""
+    return mode in SHARED_MODES and (mode != 'RGB' or _rgb_mapping())
+
+
+def _map(buffer, mode: str, size: tuple) -> Image.Image:
+    """
+    Изображение поверх непрерывного буфера uint8 без копирования
+    Pillow не пишет в отображённый буфер: изменения на месте копируют изображение
+    """
+    if mode == 'RGB':
+        image = _map_rgb(buffer, size)
+    else:
+        image = Image.frombuffer(mode, size, buffer, 'raw', mode, 0, 1)
+    # Вместе с ядром: после копирования при записи Pillow заменяет ядро, и связь с массивом теряется
+    _shared[id(image)] = (buffer, image.im)
+    weakref.finalize(image, _shared.pop, id(image), None)
+    return image
+
+
+def _view(buffer, mode: str):
+    return buffer[..., :3] if mode == 'RGB' else buffer
+
+
+def _rgbx_base(pixels):
+    """Буфер (h, w, 4), срезом [..., :3] которого является массив, или None"""
+    base = pixels.base
+    if (isinstance(base, np.ndarray) and base.dtype == np.uint8 and base.flags.c_contiguous
+            and base.shape == pixels.shape[:2] + (4,)
+            and base.__array_interface__['data'][0] == pixels.__array_interface__['data'][0]):
+        return base
+    return None
+
+
+def shared_array(image: Image.Image):
+    """Массив, поверх которого отображено изображение (None - изображение владеет пикселями само)"""
+    buffer, core = _shared.get(id(image), (None, None))
+    if buffer is None or image.im is not core:
+        return None
+    return _view(buffer, image.mode)
+
+
+def _to_uint8(pixels):
+    """
+    Многоканальный массив не uint8 -> uint8 (RGB и RGBA Pillow хранит по байту на канал):
+    float - диапазон 0..1 (умножение на 255 с округлением, вне диапазона - обрезка),
+    uint16 - диапазон 0..65535 (деление на 257 с округлением), bool - 0 / 255,
+    прочие целые - обрезка до 0..255
+    """
+    kind = pixels.dtype.kind
+    if kind == 'f':
+        return (np.clip(pixels, 0, 1) * 255 + 0.5).astype(np.uint8)
+    if pixels.dtype == np.uint16:
+        return ((pixels.astype(np.uint32) + 128) // 257).astype(np.uint8)
+    if kind == 'b':
+        return pixels.astype(np.uint8) * 255
+    if kind in 'iu':
+        return np.clip(pixels, 0, 255).astype(np.uint8)
+    raise ValueError(f"Неподдерживаемый тип массива {pixels.dtype}: "
+                     f"поддерживаются uint8, uint16, прочие целые, bool и float")
+
+
+def from_array(pixels, copy: bool = False) -> Image.Image:
+    """
+    Изображение из массива numpy
+    Без копирования (изображение читает пиксели массива) для uint8:
+    (h, w) - 'L', непрерывный (h, w, 4) - 'RGBA', срез [..., :3] непрерывного (h, w, 4) - 'RGB'
+    Остальные массивы копируются - один раз, RGB - и в случае, когда Pillow не умеет
+    отображать его без копии (can_share('RGB') ложно); (h, w, 3|4) другого типа сначала
+    переводятся в uint8 (см. _to_uint8: float - диапазон 0..1, uint16 - 0..65535),
+    (h, w) другого типа - в режимы Pillow 'F', 'I', 'I;16'
+    copy=True - всегда отдельная копия, изменения массива изображение не затрагивают
+    """
+    _require_numpy()
+    pixels = np.asarray(pixels)
+    if pixels.ndim == 3 and pixels.shape[2] == 1:
+        pixels = pixels[:, :, 0]
+    if pixels.ndim == 3 and pixels.shape[2] in (3, 4) and pixels.dtype != np.uint8:
+        pixels = _to_uint8(pixels)
+    if pixels.dtype != np.uint8 or pixels.ndim not in (2, 3) or \
+            (pixels.ndim == 3 and pixels.shape[2] not in (3, 4)):
+        return Image.fromarray(np.ascontiguousarray(pixels))
+    height, width = pixels.shape[:2]
+    if pixels.ndim == 2:
+        mode, buffer = 'L', pixels
+    elif pixels.shape[2] == 4:
+        mode, buffer = 'RGBA', pixels
+    else:
+        mode, buffer = 'RGB', _rgbx_base(pixels)
+    if mode == 'RGB' and not _rgb_mapping():
+        return Image.fromarray(np.ascontiguousarray(pixels))
+    if not copy and buffer is not None and buffer.flags.c_contiguous:
+        return _map(buffer, mode, (width, height))
+    if mode != 'RGB':
+        return _map(np.array(pixels, order='C'), mode, (width, height))
+    # Распаковка RGB -> RGBX декодером Pillow прямо в новый буфер: одна копия,
+    # в несколько раз быстрее поканального присваивания в numpy
+    return _new_rgb((width, height), lambda image: image.frombytes(np.ascontiguousarray(pixels)))
+
+
+def share(image: Image.Image) -> Image.Image:
+    """
+    Копия изображения в новом массиве numpy (одно копирование) - её пиксели
+    затем отдаются через to_array без копий. Режимы, для которых can_share ложно, не поддерживаются
+    """
+    _require_numpy()
+    if not can_share(image.mode):
+        raise ValueError(f"Режим {image.mode} не отображается в массив без копирования")
+    if image.mode != 'RGB':
+        return _map(np.array(image), image.mode, image.size)
+    return _new_rgb(image.size, lambda shared: shared.paste(image))
+
+
+def to_array(image: Image.Image):
+    """
+    Пиксели изображения как массив numpy: (h, w) для 'L', (h, w, 3) для 'RGB', (h, w, 4) для 'RGBA'
+    Изображение, отображённое на массив (from_array / share), отдаётся без копирования -
+    массив и изображение делят память; для остальных - копия
+    """
+    _require_numpy()
+    pixels = shared_array(image)
+    if pixels is not None:
+        return pixels
+    if can_share(image.mode):
+        return shared_array(share(image))
+    return np.array(image)
@@ -0,0 +1,207 @@
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from image_processor import ImageProcessor
+from manifest import Manifest
+from recipe import Recipe
+
+SUPPORTED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def discover_inputs(paths: list, exclude: list = ()) -> list:
+    """
+    Раскрытие списка файлов и папок (рекурсивно) в список поддерживаемых изображений
+    Папки из exclude (результаты, обработанные и неудачные входы) и их подпапки не просматриваются
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [name for name in dirs if os.path.abspath(os.path.join(root, name)) not in excluded]
+                if os.path.abspath(root) in excluded:
+                    dirs[:] = []
+                    continue
+                for name in files:
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        found.append(os.path.join(root, name))
+        elif path.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.exists(path):
+            found.append(path)
+    return sorted(os.path.abspath(path) for path in found)
+
+
+def input_root(path: str, paths: list) -> str:
+    """
+    Папка из списка входов, в которой найден файл (самая внешняя из подходящих),
+    или None для файла, переданного напрямую; относительно неё строится путь результата
+    """
+    path = os.path.abspath(path)
+    roots = [os.path.abspath(root) for root in paths if os.path.isdir(root)]
+    roots = [root for root in roots if os.path.commonpath([root, path]) == root]
+    return min(roots, key=len) if roots else None
+
+
+def output_paths(recipe: Recipe, inputs: list, output_dir: str, paths: list = None) -> dict:
+    """
+    Пути результатов для всех входов пакета: {вход: абсолютный путь результата}
+    Входы, чьи результаты без расширения совпали бы (a.jpg и a.png), сохраняют его в имени
+    """
+    def target(path, keep_extension=None):
+        root = input_root(path, paths) if paths else None
+        return os.path.abspath(recipe.output_path(path, output_dir, root, keep_extension))
+
+    targets = {path: target(path) for path in inputs}
+    counts = {}
+    for output_path in targets.values():
+        counts[output_path] = counts.get(output_path, 0) + 1
+    for path, output_path in targets.items():
+        if counts[output_path] > 1:
+            targets[path] = target(path, keep_extension=True)
+    return targets
+
+
+class BatchRunner:
+    """
+    Инкрементальная пакетная обработка
+    Входы, уже обработанные тем же рецептом и не изменившиеся с тех пор,
+    пропускаются по манифесту без открытия изображения
+    """
+
+    def __init__(self, recipe: Recipe, output_dir: str = 'output',
+                 manifest_path: str = None, jobs: int = 4, use_hash: bool = False,
+                 memory_budget: int = None, processes: int = 0, max_jobs_per_worker: int = 500,
+                 max_bytes_per_worker: int = 4 * 2**30, commit_every: int = 100,
+                 commit_interval: float = 5.0):
+        """
+        processes > 0 - обработка в пуле долгоживущих процессов (worker_pool.WorkerPool)
+        вместо потоков; процесс перезапускается после max_jobs_per_worker задач
+        или max_bytes_per_worker выделенной памяти
+        Манифест фиксируется каждые commit_every результатов или commit_interval секунд:
+        после прерывания пакета уже сделанная работа не повторяется
+        """
+        self.recipe = recipe
+        self.memory_budget = memory_budget
+        self.output_dir = output_dir
+        self.jobs = jobs
+        self.processes = processes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_bytes_per_worker = max_bytes_per_worker
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.manifest = Manifest(manifest_path or os.path.join(output_dir, '.manifest.sqlite'),
+                                 use_hash=use_hash)
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _processor(self) -> ImageProcessor:
+        """Один прогретый процессор на поток"""
+        if not hasattr(self._local, 'processor'):
+            self._local.processor = ImageProcessor(memory_budget=self.memory_budget)
+        return self._local.processor
+
+    def _process(self, path: str, output_path: str) -> bool:
+        try:
+            return self.recipe.apply(self._processor(), path, output_path)
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки {path}: {str(e)}")
+            return False
+
+    def _run_threads(self, jobs: list):
+        """Обработка в потоках, результаты (input_path, ok) по мере готовности"""
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {executor.submit(self._process, path, output_path): path
+                       for path, output_path in jobs}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _run_processes(self, jobs: list):
+        """Обработка в пуле прогретых процессов, результаты (input_path, ok) по мере готовности"""
+        from worker_pool import WorkerPool
+        with WorkerPool(self.recipe, self.processes, self.max_jobs_per_worker,
+                        self.max_bytes_per_worker, self.memory_budget) as pool:
+            for result in pool.run(jobs):
+                if result['error']:
+                    self.logger.error(f"Ошибка обработки {result['input']}: {result['error']}")
+                yield result['input'], result['ok']
+
+    def plan(self, inputs: list) -> list:
+        """Отбор входов, которые нужно обработать: новые, изменённые или со сменой рецепта"""
+        recipe_hash = self.recipe.digest()
+        pending = []
+        for path in inputs:
+            stat = os.stat(path)
+            if not self.manifest.is_current(path, stat.st_size, stat.st_mtime_ns, recipe_hash):
+                pending.append((path, stat))
+        return pending
+
+    def run(self, paths: list, collect_garbage: bool = False, progress=None, exclude: list = ()) -> dict:
+        """
+        Запуск пакета, возвращает сводку
+        progress(done, pending, path, ok) вызывается после каждого обработанного входа
+        exclude - папки, которые не считаются входами; папка результатов исключается всегда
+        """
+        start_time = time.perf_counter()
+        inputs = discover_inputs(paths, [self.output_dir] + list(exclude))
+        pending = self.plan(inputs)
+        recipe_hash = self.recipe.digest()
+        summary = {
+            'total': len(inputs),
+            'skipped': len(inputs) - len(pending),
+            'processed': 0,
+            'failed': 0,
+            'removed': 0,
+            'failures': []
+        }
+
+        targets = output_paths(self.recipe, inputs, self.output_dir, paths)
+        planned = {path: (stat, targets[path]) for path, stat in pending}
+        jobs = [(path, output_path) for path, (_, output_path) in planned.items()]
+        results = self._run_processes(jobs) if self.processes > 0 else self._run_threads(jobs)
+        uncommitted = 0
+        last_commit = time.monotonic()
+        try:
+            for done, (path, ok) in enumerate(results, 1):
+                stat, output_path = planned[path]
+                if ok:
+                    self.manifest.record(path, stat.st_size, stat.st_mtime_ns,
+                                         recipe_hash, output_path)
+                    summary['processed'] += 1
+                    uncommitted += 1
+                else:
+                    summary['failed'] += 1
+                    summary['failures'].append(path)
+                if progress is not None:
+                    progress(done, len(pending), path, ok)
+                if uncommitted and (uncommitted >= self.commit_every
+                                    or time.monotonic() - last_commit >= self.commit_interval):
+                    self.manifest.commit()
+                    uncommitted = 0
+                    last_commit = time.monotonic()
+        finally:
+            self.manifest.commit()
+
+        if collect_garbage:
+            summary['removed'] = self.manifest.collect_garbage()
+
+        summary['elapsed_s'] = round(time.perf_counter() - start_time, 3)
+        self.logger.info(f"Пакет завершён: обработано {summary['processed']}, "
+                         f"пропущено {summary['skipped']}, ошибок {summary['failed']}")
+        return summary
+
+    def close(self):
+        """Закрытие манифеста"""
+        self.manifest.close()
+
+
+def main(argv=None):
+    """Точка входа инкрементальной пакетной обработки (то же, что python -m image_processor run)"""
+    from image_processor.cli import main as cli_main
+    return cli_main(['run'] + list(sys.argv[1:] if argv is None else argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+from PIL import Image, ImageChops
+
+try:
+    import numpy as np
+except ImportError:   # numpy нужен только для операций над массивами
+    np = None
+
+# Коэффициенты яркости (R, G, B); 'lightness' - (max + min) / 2 без весов
+LUMA_WEIGHTS = {
+    'bt601': (0.299, 0.587, 0.114),
+    'bt709': (0.2126, 0.7152, 0.0722),
+    'average': (1 / 3, 1 / 3, 1 / 3),
+}
+GRAYSCALE_METHODS = tuple(LUMA_WEIGHTS) + ('lightness',)
+
+
+def _check_method(method: str):
+    if method not in GRAYSCALE_METHODS:
+        raise ValueError(f"Неизвестный способ перевода в оттенки серого: {method}")
+
+
+def _fixed_point(method: str) -> tuple:
+    """Веса в фиксированной точке (сумма 256): яркость помещается в uint16 без переполнения"""
+    weights = [round(weight * 256) for weight in LUMA_WEIGHTS[method]]
+    weights[1] += 256 - sum(weights)
+    return tuple(weights)
+
+
+def _lightness(image: Image.Image) -> Image.Image:
+    """
+    (max + min + 1) // 2 - с тем же округлением, что luma_array и палитра
+    ImageChops.add отбрасывает дробную часть, поэтому сумма берётся по инвертированным каналам:
+    255 - (инв. max + инв. min) // 2 == (max + min + 1) // 2
+    """
+    red, green, blue = ImageChops.invert(image).split()[:3]
+    inverted_brightest = ImageChops.darker(ImageChops.darker(red, green), blue)
+    inverted_darkest = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+    return ImageChops.invert(ImageChops.add(inverted_brightest, inverted_darkest, 2.0))
+
+
+def _palette_luma(image: Image.Image, method: str) -> Image.Image:
+    """
+    Палитровое изображение: яркость считается для 256 цветов палитры,
+    индексы переводятся в яркость одной таблицей, без разворачивания в RGB
+    """
+    palette = image.getpalette() or []
+    colors = [tuple(palette[index:index + 3]) for index in range(0, len(palette), 3)]
+    if method == 'lightness':
+        table = [(max(color) + min(color) + 1) // 2 for color in colors]
+    else:
+        weights = LUMA_WEIGHTS[method]
+        table = [min(255, int(sum(w * c for w, c in zip(weights, color)) + 0.5)) for color in colors]
+    table += [0] * (256 - len(table))
+    return Image.frombytes('L', image.size, image.tobytes()).point(table)
+
+
+def to_luma(image: Image.Image, method: str = 'bt601') -> Image.Image:
+    """
+    Яркость изображения (режим 'L') с выбранными коэффициентами
+    Всё считается циклами Pillow на C за один проход по пикселям:
+    BT.601 - встроенное преобразование Pillow (оно быстрее матричного), прочие веса -
+    convert с матрицей, P - таблица по палитре; остальные режимы сначала переводятся в RGB
+    """
+    _check_method(method)
+    mode = image.mode
+    if mode in ('L', '1', 'I', 'F', 'I;16'):
+        return image.convert('L') if mode != 'L' else image.copy()
+    if mode == 'LA':
+        return image.getchannel('L')
+    if mode == 'P':
+        return _palette_luma(image, method)
+    if mode in ('RGB', 'RGBA', 'CMYK', 'YCbCr') and method == 'bt601':
+        return image.convert('L')   # коэффициенты Pillow - BT.601
+    if mode != 'RGB':
+        image = image.convert('RGB')
+    if method == 'lightness':
+        return _lightness(image)
+    return image.convert('L', LUMA_WEIGHTS[method] + (0,))
+
+
+def grayscale(image: Image.Image, method: str = 'bt601', output_mode: str = 'RGB') -> Image.Image:
+    """
+    Оттенки серого в режиме output_mode ('L' или 'RGB')
+    RGB собирается из одного канала яркости (merge) - дешевле, чем convert('RGB')
+    """
+    if output_mode not in ('L', 'RGB'):
+        raise ValueError(f"Неподдерживаемый режим результата: {output_mode}")
+    luma = to_luma(image, method)
+    return luma if output_mode == 'L' else Image.merge('RGB', (luma, luma, luma))
+
+
+def luma_array(pixels, method: str = 'bt601', out=None):
+    """
+    Яркость массива uint8 (..., каналы) - кадр (h, w, 3|4) или пачка (n, h, w, 3|4)
+    Целочисленная арифметика в uint16 (веса в фиксированной точке) без float-копий;
+    out - готовый массив uint8 формы (...) для результата
+    """
+    if np is None:
+        raise ImportError("Для операций над массивами нужен numpy")
+    _check_method(method)
+    if out is None:
+        out = np.empty(pixels.shape[:-1], dtype=np.uint8)
+    # Плоскости каналов подряд в памяти: одна перестановка дешевле, чем три
+    # арифметических прохода по каналам с шагом в 3-4 байта
+    red, green, blue = np.ascontiguousarray(np.moveaxis(pixels[..., :3], -1, 0))
+    if method == 'lightness':
+        brightest = np.maximum(np.maximum(red, green), blue)
+        darkest = np.minimum(np.minimum(red, green), blue)
+        total = brightest.astype(np.uint16)
+        total += darkest
+        total += 1
+        np.right_shift(total, 1, out=total)
+    else:
+        weight_red, weight_green, weight_blue = _fixed_point(method)
+        total = np.multiply(red, weight_red, dtype=np.uint16)
+        total += np.multiply(green, weight_green, dtype=np.uint16)
+        total += np.multiply(blue, weight_blue, dtype=np.uint16)
+        total += 128   # округление; максимум 255 * 256 + 128 помещается в uint16
+        np.right_shift(total, 8, out=total)
+    out[...] = total
+    return out
+
+
+def grayscale_array(pixels, method: str = 'bt601'):
+    """На месте: каналы R, G, B массива (..., 3|4) заменяются яркостью, альфа не меняется"""
+    luma = luma_array(pixels, method)
+    for channel in range(3):
+        pixels[..., channel] = luma
+    return pixels
+
+
+def grayscale_like(image: Image.Image, method: str = 'bt601') -> Image.Image:
+    """
+    Оттенки серого в режиме исходного изображения (альфа-канал сохраняется)
+    Палитровые режимы не поддерживаются: новая палитра не совпала бы с палитрой изображения,
+    в которое вставляется результат
+    """
+    if image.mode in ('P', 'PA'):
+        raise ValueError(f"Режим {image.mode} не поддерживается: сначала преобразуйте изображение в RGB")
+    luma = to_luma(image, method)
+    if image.mode == 'L':
+        return luma
+    if image.mode == 'LA':
+        return Image.merge('LA', (luma, image.getchannel('A')))
+    if image.mode in ('RGB', 'RGBA'):
+        bands = (luma, luma, luma) + ((image.getchannel('A'),) if image.mode == 'RGBA' else ())
+        return Image.merge(image.mode, bands)
+    return luma.convert(image.mode)
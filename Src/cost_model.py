@@ -0,0 +1,312 @@
+import json
+import os
+import time
+from instrumentation import estimate_nbytes
+
+# Откалиброванная модель хранится локально, рядом с настройками приложения
+DEFAULT_MODEL_PATH = os.path.join('config', 'cost_model.json')
+
+# Кривые по умолчанию (до калибровки): ключ операции -> (ms постоянная часть, ms на мегапиксель)
+# Мегапиксели шага - сумма пикселей входа и выхода (для resize важны оба размера)
+DEFAULT_CURVES = {
+    'load_image:jpg': (1.0, 12.0),
+    'load_image:png': (1.0, 27.0),
+    'save_image:jpg': (1.0, 9.0),
+    'save_image:png': (10.0, 190.0),
+    'convert_to_grayscale': (0.1, 1.5),
+    'remove_noise:1': (0.0, 0.0),
+    'remove_noise:3': (0.2, 280.0),
+    'remove_noise:5': (0.2, 900.0),
+    'remove_noise:7': (0.2, 1650.0),
+    'remove_noise:adaptive:3': (0.5, 45.0),
+    'remove_noise:adaptive:5': (0.5, 50.0),
+    'remove_noise:adaptive:7': (0.5, 60.0),
+    'remove_noise:box': (0.5, 12.0),
+    'remove_noise:fast_gaussian': (0.5, 30.0),
+    'remove_noise:gaussian': (1.0, 75.0),
+    'remove_noise:bilateral': (1.0, 400.0),
+    'remove_noise:nlm': (1.0, 450.0),
+    'remove_noise:nlm:5': (1.0, 900.0),
+    'remove_noise:nlm:6': (1.0, 900.0),
+    'remove_noise:nlm:7': (1.0, 900.0),
+    'resize_image:best': (0.2, 22.0),
+    'resize_image:high': (0.2, 23.0),
+    'resize_image:balanced': (0.2, 9.5),
+    'resize_image:fast': (0.2, 6.0),
+    'resize_image:draft': (0.2, 1.6),
+}
+_FALLBACK_CURVE = (0.5, 20.0)
+
+_FORMAT_ALIASES = {'jpeg': 'jpg'}
+
+# Методы шумоподавления, чья стоимость не зависит от силы (проходы Pillow за O(1) на пиксель
+# при любом радиусе): ключ без силы; для остальных методов своя кривая на каждую силу
+_STRENGTH_FREE_METHODS = ('box', 'fast_gaussian')
+
+
+def _format_key(path_or_format: str) -> str:
+    """Ключ формата по пути к файлу или имени формата"""
+    name = os.path.splitext(path_or_format)[1] or path_or_format
+    name = name.lower().lstrip('.')
+    return _FORMAT_ALIASES.get(name, name)
+
+
+def operation_key(step: dict) -> str:
+    """Ключ кривой для шага рецепта: операция и параметр, от которого зависит стоимость"""
+    op = step['op']
+    if op == 'remove_noise':
+        method = step.get('method', 'median')
+        if step.get('quality') is not None:
+            import denoise
+            method = denoise.method_for_quality(step['quality'])
+        if method in _STRENGTH_FREE_METHODS:
+            return f"remove_noise:{method}"
+        if method != 'median':
+            return f"remove_noise:{method}:{max(1, min(7, step.get('strength', 3)))}"
+        window = max(1, min(7, step.get('strength', 3))) | 1
+        if step.get('mode') == 'adaptive' and window > 1:
+            return f"remove_noise:adaptive:{window}"
+        return f"remove_noise:{window}"
+    if op == 'resize_image':
+        return f"resize_image:{step.get('quality', 'best')}"
+    if op in ('load_image', 'save_image'):
+        return f"{op}:{_format_key(step.get('format', 'jpg'))}"
+    return op
+
+
+def output_shape(step: dict, size: tuple, mode: str) -> tuple:
+    """Размер и режим изображения после шага (без выполнения операции)"""
+    op = step['op']
+    if op == 'convert_to_grayscale':
+        return size, step.get('output_mode', 'RGB')
+    if op == 'resize_image':
+        import resize_engine
+        target, _ = resize_engine.compute_geometry(size, (step['width'], step['height']),
+                                                   step.get('mode', 'stretch'))
+        return target, mode
+    return size, mode
+
+
+def fit_curve(samples: list) -> tuple:
+    """
+    Наименьшие квадраты ms = a + b * megapixels по списку (megapixels, ms)
+    Отрицательная постоянная часть заменяется подгонкой через ноль
+    """
+    count = len(samples)
+    mean_x = sum(x for x, _ in samples) / count
+    mean_y = sum(y for _, y in samples) / count
+    spread = sum((x - mean_x) ** 2 for x, _ in samples)
+    if spread > 0:
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / spread
+        intercept = mean_y - slope * mean_x
+        if intercept >= 0 and slope >= 0:
+            return intercept, slope
+    squares = sum(x * x for x, _ in samples)
+    slope = sum(x * y for x, y in samples) / squares if squares else 0.0
+    return 0.0, max(0.0, slope)
+
+
+class CostModel:
+    """
+    Модель стоимости операций: время по кривым a + b * Мп (Мп входа + выхода)
+    для каждой операции и режима изображения, память - по размерам изображений,
+    которые процессор держит во время шага (исходное, снимок отмены, результат)
+    """
+
+    def __init__(self, curves: dict = None, environment: dict = None):
+        self.curves = dict(curves or {})
+        self.environment = environment or {}
+
+    @property
+    def calibrated(self) -> bool:
+        return bool(self.curves)
+
+    def curve(self, key: str, mode: str) -> tuple:
+        """
+        Кривая для операции: откалиброванная для режима -> для любого режима -> по умолчанию
+        (для ключа или для операции без последнего параметра, например remove_noise:gaussian)
+        """
+        return (self.curves.get(f"{key}|{mode}") or self.curves.get(key)
+                or DEFAULT_CURVES.get(key) or DEFAULT_CURVES.get(key.rsplit(':', 1)[0])
+                or _FALLBACK_CURVE)
+
+    def step_ms(self, step: dict, input_size: tuple, output_size: tuple, mode: str) -> float:
+        intercept, slope = self.curve(operation_key(step), mode)
+        megapixels = (input_size[0] * input_size[1] + output_size[0] * output_size[1]) / 1e6
+        return intercept + slope * megapixels
+
+    def estimate(self, size: tuple, operations: list, mode: str = 'RGB',
+                 input_format: str = None, output_format: str = None) -> dict:
+        """
+        Оценка цепочки операций (шаги в формате рецепта: {"op": ..., параметры})
+        input_format / output_format добавляют шаги загрузки и сохранения
+        Возвращает time_ms, peak_bytes, итоговые size / mode и оценку каждого шага
+        """
+        steps = [dict(step) for step in operations]
+        if input_format:
+            steps.insert(0, {'op': 'load_image', 'format': input_format})
+        if output_format:
+            steps.append({'op': 'save_image', 'format': output_format})
+
+        original_bytes = estimate_nbytes(size, mode)
+        estimates = []
+        peak = 0
+        for index, step in enumerate(steps):
+            if step['op'] in ('load_image', 'save_image'):
+                new_size, new_mode = size, mode
+                # Загрузка: только декодированное изображение; сохранение: результат и буфер кодека
+                held = original_bytes if step['op'] == 'load_image' else estimate_nbytes(size, mode)
+                megapixels_size = (0, 0)
+            else:
+                new_size, new_mode = output_shape(step, size, mode)
+                held = estimate_nbytes(size, mode) + estimate_nbytes(new_size, new_mode)
+                # Исходное держится отдельно, пока текущее - уже не оно
+                if index > (1 if input_format else 0):
+                    held += original_bytes
+                megapixels_size = new_size
+            time_ms = self.step_ms(step, size, megapixels_size, mode)
+            estimates.append({'op': step['op'], 'key': operation_key(step),
+                              'time_ms': time_ms, 'bytes': held})
+            peak = max(peak, held)
+            size, mode = new_size, new_mode
+        return {
+            'time_ms': sum(step['time_ms'] for step in estimates),
+            'peak_bytes': peak,
+            'size': size,
+            'mode': mode,
+            'steps': estimates,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'curves': {key: list(curve) for key, curve in sorted(self.curves.items())},
+            'environment': self.environment,
+        }
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        """Сохранение откалиброванных кривых в JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'CostModel':
+        """Загрузка модели; при отсутствии файла - модель с кривыми по умолчанию"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        curves = {key: tuple(curve) for key, curve in data.get('curves', {}).items()}
+        return cls(curves, data.get('environment'))
+
+
+_default_model = None
+
+
+def default_model() -> CostModel:
+    """Модель из DEFAULT_MODEL_PATH (читается один раз на процесс)"""
+    global _default_model
+    if _default_model is None:
+        try:
+            _default_model = CostModel.load()
+        except (OSError, ValueError):
+            _default_model = CostModel()
+    return _default_model
+
+
+# Шаги, которые измеряет калибровка: по шагу на каждый ключ operation_key
+# (медиана - окна 3, 5, 7; методы с ключом по силе - силы 1-7)
+CALIBRATION_STEPS = [
+    {'op': 'remove_noise', 'strength': window, **mode}
+    for mode in ({}, {'mode': 'adaptive'}) for window in (3, 5, 7)
+] + [{'op': 'remove_noise', 'strength': 3, 'method': method} for method in _STRENGTH_FREE_METHODS] + [
+    {'op': 'remove_noise', 'strength': strength, 'method': method}
+    for method in ('gaussian', 'bilateral', 'nlm') for strength in range(1, 8)
+] + [
+    {'op': 'convert_to_grayscale'},
+] + [{'op': 'resize_image', 'scale': 0.5, 'quality': quality}
+     for quality in ('best', 'high', 'balanced', 'fast', 'draft')]
+
+
+def _synthetic_image(width: int, height: int, mode: str):
+    """Шумное изображение: медианный фильтр и кодеки на нём работают как на фото, а не на заливке"""
+    from PIL import Image
+    bands = [Image.effect_noise((width, height), 48 + 16 * index) for index in range(3)]
+    image = Image.merge('RGB', bands)
+    return image if mode == 'RGB' else image.convert(mode)
+
+
+def calibrate(sizes: tuple = ((320, 240), (640, 480), (1280, 720)), repeats: int = 3,
+              modes: tuple = ('RGB', 'L'), formats: tuple = ('jpg', 'png'),
+              image_factory=None, workdir: str = '.') -> CostModel:
+    """
+    Калибровка: каждая операция выполняется на ImageProcessor для нескольких размеров,
+    лучшее из repeats время подгоняется прямой a + b * Мп
+    image_factory(width, height, mode) - источник тестовых изображений
+    """
+    import platform
+    import PIL
+    import denoise
+    from image_processor import ImageProcessor
+
+    available = denoise.available_methods()
+    steps = [step for step in CALIBRATION_STEPS if step.get('method', 'median') in available]
+    image_factory = image_factory or _synthetic_image
+    processor = ImageProcessor()
+    samples = {}
+
+    def measure(key, func, megapixels):
+        best = None
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            if not func():
+                raise RuntimeError(f"Калибровка: операция {key} завершилась ошибкой")
+            elapsed = (time.perf_counter() - start_time) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        samples.setdefault(key, []).append((megapixels, best))
+
+    for mode in modes:
+        for width, height in sizes:
+            image = image_factory(width, height, mode)
+            pixels = width * height / 1e6
+            for step in steps:
+                params = {name: value for name, value in step.items() if name != 'op'}
+                if step['op'] == 'resize_image':
+                    scale = params.pop('scale')
+                    target = (max(1, int(width * scale)), max(1, int(height * scale)))
+                    params.update(width=target[0], height=target[1])
+                    megapixels = pixels + target[0] * target[1] / 1e6
+                else:
+                    megapixels = 2 * pixels
+                key = f"{operation_key(dict(step, **params))}|{mode}"
+
+                def run(params=params, op=step['op']):
+                    processor.current_image = image
+                    return getattr(processor, op)(**params)
+                measure(key, run, megapixels)
+
+            for format_name in formats:
+                path = os.path.join(workdir, f'_calibration_{width}x{height}.{format_name}')
+                try:
+                    processor.current_image = image
+                    measure(f"save_image:{format_name}|{mode}",
+                            lambda: processor.save_image(path), pixels)
+                    measure(f"load_image:{format_name}|{mode}",
+                            lambda: processor.load_image(path), pixels)
+                finally:
+                    if os.path.exists(path):
+                        os.remove(path)
+    processor.release()
+
+    curves = {key: fit_curve(points) for key, points in samples.items()}
+    environment = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'pillow': PIL.__version__,
+        'sizes': [list(size) for size in sizes],
+    }
+    return CostModel(curves, environment)
@@ -0,0 +1,354 @@
+import math
+from PIL import Image, ImageChops, ImageFilter
+
+try:
+    import numpy as np
+except ImportError:   # numpy необязателен: без него - попиксельный путь на Pillow
+    np = None
+
+# Порог отличия от всех четырёх соседей, после которого пиксель считается импульсным
+DEFAULT_IMPULSE_THRESHOLD = 40
+# Сторона плитки карты шума: фильтр применяется только к плиткам с импульсами
+DEFAULT_TILE = 32
+# Если помечено больше этой доли плиток, один проход по всему изображению дешевле вырезок
+_FULL_PASS_FRACTION = 0.5
+# Без numpy медиана по отдельным пикселям на Python выгоднее полного прохода,
+# пока помечено меньше этой доли пикселей
+_PIXELWISE_FRACTION = 0.005
+# Предел окон numpy-пути в байтах: помеченные пиксели обрабатываются порциями,
+# память не растёт с числом импульсов
+_NUMPY_WINDOW_BYTES = 8 * 1024 * 1024
+
+
+def impulse_mask(image: Image.Image, threshold: int = DEFAULT_IMPULSE_THRESHOLD) -> Image.Image:
+    """
+    Карта импульсного шума (режим 'L', 255 - шум): пиксель отличается больше чем на threshold
+    от каждого из четырёх соседей хотя бы в одном канале
+    Края и текстуры не помечаются - у них есть похожий сосед; всё считается поканальными
+    операциями ImageChops без ранговых фильтров
+    """
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+    nearest = None
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        difference = ImageChops.difference(image, ImageChops.offset(image, dx, dy))
+        nearest = difference if nearest is None else ImageChops.darker(nearest, difference)
+    if nearest.mode != 'L':
+        bands = nearest.split()
+        nearest = bands[0]
+        for band in bands[1:]:
+            nearest = ImageChops.lighter(nearest, band)
+    return nearest.point(lambda value: 255 if value > threshold else 0)
+
+
+def flagged_tiles(mask: Image.Image, tile: int = DEFAULT_TILE) -> list:
+    """Координаты (столбец, строка) плиток, в которых есть хотя бы один помеченный пиксель"""
+    # В режиме 'F' среднее по плитке не округляется, и одиночный пиксель не теряется;
+    # умножение на площадь плитки возвращает сумму, которая в 'L' даёт ненулевой байт
+    sums = mask.convert('F').reduce(tile).point(lambda value: value * tile * tile).convert('L')
+    columns = sums.width
+    return [(index % columns, index // columns)
+            for index, value in enumerate(sums.tobytes()) if value]
+
+
+def _median_at_numpy(source: Image.Image, mask: Image.Image, size: int) -> Image.Image:
+    """
+    Медиана окна size x size только в помеченных пикселях (векторно, numpy)
+    Окна собираются порциями не больше _NUMPY_WINDOW_BYTES; медиана нечётного окна -
+    средний элемент после np.partition на месте, без копии и перевода в float64
+    """
+    pixels = np.asarray(source)
+    ys, xs = np.nonzero(np.asarray(mask))
+    halo = size // 2
+    middle = size * size // 2
+    pad = ((halo, halo), (halo, halo)) + ((0, 0),) * (pixels.ndim - 2)
+    padded = np.pad(pixels, pad, mode='edge')
+    result = pixels.copy()
+    channels = pixels.shape[2] if pixels.ndim == 3 else 1
+    chunk = max(1, _NUMPY_WINDOW_BYTES // (size * size * channels))
+    for start in range(0, len(ys), chunk):
+        chunk_ys, chunk_xs = ys[start:start + chunk], xs[start:start + chunk]
+        window = np.stack([padded[chunk_ys + dy, chunk_xs + dx]
+                           for dy in range(size) for dx in range(size)], axis=1)
+        window.partition(middle, axis=1)
+        result[chunk_ys, chunk_xs] = window[:, middle]
+    return Image.fromarray(result, source.mode)
+
+
+def _median_at_pixels(source: Image.Image, mask: Image.Image, size: int) -> Image.Image:
+    """Медиана окна size x size только в помеченных пикселях (попиксельно, без numpy)"""
+    result = source.copy()
+    src = source.load()
+    dst = result.load()
+    width, height = source.size
+    halo = size // 2
+    middle = size * size // 2
+    # Поиск помеченных байтов идёт в C (bytes.find), Python проходит только по ним
+    flags = mask.tobytes()
+    index = flags.find(255)
+    while index >= 0:
+        y, x = divmod(index, width)
+        index = flags.find(255, index + 1)
+        window = [src[min(width - 1, max(0, x + dx)), min(height - 1, max(0, y + dy))]
+                  for dy in range(-halo, halo + 1) for dx in range(-halo, halo + 1)]
+        if source.mode == 'L':
+            dst[x, y] = sorted(window)[middle]
+        else:
+            dst[x, y] = tuple(sorted(values)[middle] for values in zip(*window))
+    return result
+
+
+def _median_in_tiles(source: Image.Image, mask: Image.Image, size: int, tile: int) -> Image.Image:
+    """Медиана в плитках с помеченными пикселями, замена только помеченных"""
+    width, height = source.size
+    tiles = flagged_tiles(mask, tile)
+    result = source.copy()
+    total_tiles = -(-width // tile) * -(-height // tile)
+    if len(tiles) > _FULL_PASS_FRACTION * total_tiles:
+        result.paste(source.filter(ImageFilter.MedianFilter(size)), (0, 0), mask)
+        return result
+    # Соседние плитки строки объединяются в одну вырезку с запасом на окно фильтра
+    halo = size // 2
+    runs = []
+    for column, row in tiles:
+        if runs and runs[-1][1] == row and runs[-1][2] == column:
+            runs[-1][2] = column + 1
+        else:
+            runs.append([column, row, column + 1])
+    for first, row, last in runs:
+        box = (first * tile, row * tile, min(width, last * tile), min(height, (row + 1) * tile))
+        outer = (max(0, box[0] - halo), max(0, box[1] - halo),
+                 min(width, box[2] + halo), min(height, box[3] + halo))
+        filtered = source.crop(outer).filter(ImageFilter.MedianFilter(size))
+        inner = (box[0] - outer[0], box[1] - outer[1], box[2] - outer[0], box[3] - outer[1])
+        result.paste(filtered.crop(inner), box, mask.crop(box))
+    return result
+
+
+def adaptive_median(image: Image.Image, size: int = 3, threshold: int = DEFAULT_IMPULSE_THRESHOLD,
+                    tile: int = DEFAULT_TILE) -> tuple:
+    """
+    Переключающийся медианный фильтр: медиана заменяет только пиксели из карты
+    импульсного шума, остальные остаются нетронутыми
+    Медиана считается векторно в помеченных пикселях (numpy), без numpy - попиксельно
+    при редком шуме или в плитках, где он есть; если помечено больше _FULL_PASS_FRACTION
+    пикселей, дешевле один полный MedianFilter, вставленный по маске
+    Фильтруются только цветовые каналы: альфа-канал 'LA' / 'RGBA' переносится без изменений
+    Палитровые и прочие режимы не поддерживаются - медиана индексов палитры не имеет смысла,
+    а перевод в RGB и обратно изменил бы и непомеченные пиксели
+    Возвращает (результат, доля заменённых пикселей)
+    """
+    if image.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+        raise ValueError(f"Адаптивная медиана не поддерживает режим {image.mode}: сначала преобразуйте в RGB или L")
+    alpha = image.getchannel('A') if image.mode in ('LA', 'RGBA') else None
+    source = image if alpha is None else image.convert(image.mode[:-1])
+    mask = impulse_mask(source, threshold)
+    count = mask.histogram()[255]
+    if not count:
+        return image.copy(), 0.0
+
+    if count > _FULL_PASS_FRACTION * image.width * image.height:
+        result = source.copy()
+        result.paste(source.filter(ImageFilter.MedianFilter(size)), (0, 0), mask)
+    elif np is not None:
+        result = _median_at_numpy(source, mask, size)
+    elif count <= _PIXELWISE_FRACTION * image.width * image.height:
+        result = _median_at_pixels(source, mask, size)
+    else:
+        result = _median_in_tiles(source, mask, size, tile)
+    if alpha is not None:
+        result = Image.merge(image.mode, result.split() + (alpha,))
+    return result, count / (image.width * image.height)
+
+
+# --- Подключаемые методы шумоподавления ---------------------------------------------
+# Каждый метод: функция (image, strength 1-7) -> новое изображение
+# Методы на numpy работают с массивами float32 формы (высота, ширина, каналы)
+
+_METHODS = {}
+_NUMPY_METHODS = set()
+
+# Уровни качества -> методы в порядке предпочтения (первый доступный)
+QUALITY_PRESETS = {
+    'best': ('nlm', 'bilateral', 'fast_gaussian'),
+    'high': ('bilateral', 'fast_gaussian'),
+    'balanced': ('gaussian', 'fast_gaussian'),
+    'fast': ('fast_gaussian',),
+    'draft': ('box',),
+}
+
+
+def register_method(name: str, func, requires_numpy: bool = False):
+    """Регистрация метода шумоподавления func(image, strength) -> Image"""
+    _METHODS[name] = func
+    if requires_numpy:
+        _NUMPY_METHODS.add(name)
+    else:
+        _NUMPY_METHODS.discard(name)
+
+
+def available_methods() -> list:
+    """Методы, доступные в текущем окружении"""
+    return [name for name in _METHODS if np is not None or name not in _NUMPY_METHODS]
+
+
+def method_for_quality(quality: str) -> str:
+    """Самый подходящий доступный метод для уровня качества"""
+    if quality not in QUALITY_PRESETS:
+        raise ValueError(f"Неизвестный уровень качества шумоподавления: {quality}")
+    available = available_methods()
+    for name in QUALITY_PRESETS[quality]:
+        if name in available:
+            return name
+    raise ValueError(f"Нет доступного метода для уровня качества: {quality}")
+
+
+def denoise(image: Image.Image, method: str = 'median', strength: int = 3) -> Image.Image:
+    """Шумоподавление выбранным методом; strength 1-7 переводится в параметры метода"""
+    if method not in _METHODS:
+        raise ValueError(f"Неизвестный метод шумоподавления: {method}")
+    if method in _NUMPY_METHODS and np is None:
+        raise ValueError(f"Метод шумоподавления {method} требует numpy")
+    return _METHODS[method](image, max(1, min(7, strength)))
+
+
+def context_radius(method: str, strength: int, mode: str = 'uniform') -> int:
+    """
+    Сколько пикселей вокруг области нужно методу, чтобы результат внутри области
+    совпал с обработкой всего изображения (поля для обработки по области)
+    """
+    strength = max(1, min(7, strength))
+    sigma = 0.35 * strength + 0.15
+    radii = {
+        'median': (strength | 1) // 2 + (1 if mode == 'adaptive' else 0),   # + соседи маски шума
+        'box': (strength + 1) // 2,
+        'fast_gaussian': int(math.ceil(3 * sigma)) + 1,
+        'gaussian': int(math.ceil(3 * sigma)) + 1,
+        'bilateral': 3,
+        'nlm': (2 if strength <= 4 else 3) + 1,
+    }
+    return radii.get(method, 2 * strength)
+
+
+def _to_array(image: Image.Image):
+    """Изображение -> (float32 массив (h, w, c), режим для обратного преобразования)"""
+    mode = image.mode if image.mode in ('L', 'RGB', 'RGBA') else 'RGB'
+    pixels = np.asarray(image if image.mode == mode else image.convert(mode), dtype=np.float32)
+    return (pixels[:, :, None] if pixels.ndim == 2 else pixels), mode
+
+
+def _from_array(pixels, mode: str, original: Image.Image) -> Image.Image:
+    pixels = np.clip(pixels + 0.5, 0, 255).astype(np.uint8)
+    result = Image.fromarray(pixels[:, :, 0] if mode == 'L' else pixels, mode)
+    return result if result.mode == original.mode else result.convert(original.mode)
+
+
+def _box_sum(values, radius: int):
+    """Сумма по окну (2r+1)x(2r+1) для двумерного массива: два прохода сдвинутых срезов"""
+    height, width = values.shape
+    padded = np.pad(values, radius, mode='edge')
+    rows = sum(padded[offset:offset + height] for offset in range(1, 2 * radius + 1))
+    rows += padded[:height]
+    return sum(rows[:, offset:offset + width] for offset in range(1, 2 * radius + 1)) + rows[:, :width]
+
+
+def _weighted_average(pixels, radius: int, pad_mode: str, weight_for):
+    """
+    Взвешенное среднее соседей в окне (2r+1)x(2r+1): цикл только по смещениям,
+    каждое смещение обрабатывается целиком для всех пикселей
+    weight_for(dy, dx, luma, neighbour_luma) -> веса (h, w); веса считаются по яркости
+    (среднему каналов), чтобы не повторять работу для каждого канала
+    """
+    height, width = pixels.shape[:2]
+    padded = np.pad(pixels, ((radius, radius), (radius, radius), (0, 0)), mode=pad_mode)
+    padded_luma = padded.mean(axis=2)
+    luma = padded_luma[radius:radius + height, radius:radius + width]
+    total = np.zeros_like(pixels)
+    weights = np.zeros((height, width), dtype=np.float32)
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            rows = slice(radius + dy, radius + dy + height)
+            columns = slice(radius + dx, radius + dx + width)
+            weight = weight_for(dy, dx, luma, padded_luma[rows, columns])
+            total += weight[:, :, None] * padded[rows, columns]
+            weights += weight
+    return total / weights[:, :, None]
+
+
+def _median(image, strength):
+    size = strength | 1
+    return image.filter(ImageFilter.MedianFilter(size)) if size > 1 else image.copy()
+
+
+def _box(image, strength):
+    """Box blur: радиус 1-4, самый дешёвый проход Pillow"""
+    return image.filter(ImageFilter.BoxBlur((strength + 1) // 2))
+
+
+def _fast_gaussian(image, strength):
+    """Гауссово размытие Pillow (приближение несколькими проходами box blur)"""
+    return image.filter(ImageFilter.GaussianBlur(0.35 * strength + 0.15))
+
+
+def _gaussian(image, strength):
+    """Точное сепарабельное гауссово размытие: два одномерных прохода"""
+    sigma = 0.35 * strength + 0.15
+    radius = max(1, int(np.ceil(3 * sigma)))
+    taps = np.exp(-np.arange(-radius, radius + 1) ** 2 / (2 * sigma ** 2)).astype(np.float32)
+    taps /= taps.sum()
+    pixels, mode = _to_array(image)
+    height, width = pixels.shape[:2]
+    for axis in (0, 1):
+        pad = [(0, 0)] * 3
+        pad[axis] = (radius, radius)
+        padded = np.pad(pixels, pad, mode='edge')
+        result = np.zeros_like(pixels)
+        for offset, weight in enumerate(taps):
+            result += weight * (padded[offset:offset + height] if axis == 0
+                                else padded[:, offset:offset + width])
+        pixels = result
+    return _from_array(pixels, mode, image)
+
+
+def _bilateral(image, strength):
+    """
+    Билатеральный фильтр: вес соседа - произведение гауссиан по расстоянию
+    и по разнице яркости, поэтому края не размываются
+    Окно не больше 7x7: дальние соседи почти не меняют результат, а стоят квадратично
+    """
+    sigma_space = 0.5 * strength + 0.5
+    sigma_range = 8.0 * strength + 10.0
+    radius = min(3, max(1, int(np.ceil(1.5 * sigma_space))))
+
+    def weight_for(dy, dx, luma, neighbour):
+        spatial = np.float32(np.exp(-(dx * dx + dy * dy) / (2 * sigma_space ** 2)))
+        return spatial * np.exp((neighbour - luma) ** 2 * np.float32(-0.5 / sigma_range ** 2))
+
+    pixels, mode = _to_array(image)
+    return _from_array(_weighted_average(pixels, radius, 'edge', weight_for), mode, image)
+
+
+def _nlm(image, strength):
+    """
+    Быстрый non-local means: для каждого смещения в окне поиска расстояние между
+    патчами 3x3 считается сразу для всех пикселей суммой по окну (интегральное изображение)
+    """
+    search = 2 if strength <= 4 else 3
+    patch = 1
+    h = 4.0 * strength + 6.0
+    patch_area = (2 * patch + 1) ** 2
+
+    def weight_for(dy, dx, luma, neighbour):
+        distance = _box_sum((neighbour - luma) ** 2, patch) / patch_area
+        return np.exp(np.maximum(distance - 2 * h * h / 9, 0) * np.float32(-1 / (h * h)))
+
+    pixels, mode = _to_array(image)
+    return _from_array(_weighted_average(pixels, search, 'reflect', weight_for), mode, image)
+
+
+register_method('median', _median)
+register_method('box', _box)
+register_method('fast_gaussian', _fast_gaussian)
+register_method('gaussian', _gaussian, requires_numpy=True)
+register_method('bilateral', _bilateral, requires_numpy=True)
+register_method('nlm', _nlm, requires_numpy=True)
@@ -0,0 +1,233 @@
+import math
+from functools import lru_cache
+from PIL import Image
+import arrays
+import color
+import resize_engine
+
+try:
+    import numpy as np
+except ImportError:   # пачки кадров обрабатываются только на numpy
+    np = None
+
+
+def _box(x):
+    return 1.0 if -0.5 < x <= 0.5 else 0.0
+
+
+def _bilinear(x):
+    x = abs(x)
+    return 1.0 - x if x < 1.0 else 0.0
+
+
+def _bicubic(x, a=-0.5):
+    x = abs(x)
+    if x < 1.0:
+        return ((a + 2.0) * x - (a + 3.0)) * x * x + 1
+    if x < 2.0:
+        return (((x - 5) * x + 8) * x - 4) * a
+    return 0.0
+
+
+def _sinc(x):
+    if x == 0.0:
+        return 1.0
+    x *= math.pi
+    return math.sin(x) / x
+
+
+def _lanczos(x):
+    return _sinc(x) * _sinc(x / 3.0) if -3.0 <= x < 3.0 else 0.0
+
+
+# Ядра фильтров Pillow: функция и радиус (support) при масштабе 1
+_FILTERS = {
+    Image.Resampling.BOX: (_box, 0.5),
+    Image.Resampling.BILINEAR: (_bilinear, 1.0),
+    Image.Resampling.BICUBIC: (_bicubic, 2.0),
+    Image.Resampling.LANCZOS: (_lanczos, 3.0),
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Для обработки пачек кадров нужен numpy")
+
+
+def as_stack(frames):
+    """
+    Пачка кадров одного размера как массив uint8: (N, H, W, C) или (N, H, W) для оттенков серого
+    frames: такой массив (возвращается как есть) или список изображений PIL / массивов
+    """
+    _require_numpy()
+    if isinstance(frames, np.ndarray):
+        stack = frames
+    else:
+        frames = [np.asarray(frame) for frame in frames]
+        if not frames:
+            raise ValueError("Пустая пачка кадров")
+        if len({frame.shape for frame in frames}) > 1:
+            raise ValueError("Кадры пачки должны быть одного размера и режима")
+        stack = np.stack(frames)
+    if stack.dtype != np.uint8 or stack.ndim not in (3, 4):
+        raise ValueError(f"Ожидается массив uint8 (N, H, W[, C]), получен {stack.dtype} {stack.shape}")
+    return stack
+
+
+@lru_cache(maxsize=64)
+def resize_weights(in_size: int, out_size: int, start: float, end: float, resample: int):
+    """
+    Матрица весов (out_size, in_size) одномерного прохода фильтром - те же коэффициенты,
+    что Pillow считает для каждой строки; для пачки проход сводится к одному умножению матриц
+    Кэшируется: у пачек одного размера матрицы общие
+    """
+    kernel, support = _FILTERS[resample]
+    start, end = float(np.float32(start)), float(np.float32(end))   # Pillow принимает box как float
+    scale = (end - start) / out_size
+    filter_scale = max(scale, 1.0)
+    support *= filter_scale
+    inverse_scale = 1.0 / filter_scale
+    weights = np.zeros((out_size, in_size), dtype=np.float32)
+    for index in range(out_size):
+        center = start + (index + 0.5) * scale
+        low = max(int(center - support + 0.5), 0)
+        high = min(int(center + support + 0.5), in_size)
+        taps = [kernel((position - center + 0.5) * inverse_scale) for position in range(low, high)]
+        total = sum(taps)
+        if total:
+            weights[index, low:high] = [tap / total for tap in taps]
+    weights.setflags(write=False)
+    return weights
+
+
+def _to_uint8_range(pixels):
+    """Округление до целых и обрезка до 0..255 на месте (float32)"""
+    pixels += 0.5
+    np.floor(pixels, out=pixels)
+    return np.clip(pixels, 0, 255, out=pixels)
+
+
+def _reduce_stack(stack, factor: tuple, box: tuple):
+    """
+    Как Image.reduce(factor, box) для каждого кадра: среднее блоков factor_y x factor_x
+    от начала box; неполные блоки у правого и нижнего края усредняются по имеющимся
+    пикселям, деление - с тем же округлением в фиксированной точке, что у Pillow
+    """
+    factor_x, factor_y = factor
+    left, top, right, bottom = box
+    pixels = stack[:, top:bottom, left:right]
+    frames, height, width = pixels.shape[:3]
+    channels = pixels.shape[3:]
+    out_height, out_width = -(-height // factor_y), -(-width // factor_x)
+    padded = np.zeros((frames, out_height * factor_y, out_width * factor_x) + channels, dtype=np.uint32)
+    padded[:, :height, :width] = pixels
+    sums = padded.reshape((frames, out_height, factor_y, out_width, factor_x) + channels).sum(
+        axis=(2, 4), dtype=np.uint64)
+    rows = np.minimum(factor_y, height - np.arange(out_height) * factor_y)
+    columns = np.minimum(factor_x, width - np.arange(out_width) * factor_x)
+    area = (rows[:, None] * columns[None, :]).astype(np.uint64)
+    area = area.reshape((out_height, out_width) + (1,) * len(channels))
+    multiplier = (4.0 * (1 << 30) / (256 * area.astype(np.float64))).astype(np.uint64)
+    return (((sums + area // 2) * multiplier) >> 24).astype(np.uint8)
+
+
+def _reduce_for_resize(stack, size: tuple, box: tuple, resample: int, gap: float) -> tuple:
+    """
+    Предварительный reduce() перед проходом фильтром - как Image.resize с reducing_gap
+    (коэффициенты, область с запасом на фильтр и пересчёт box - по правилам Pillow)
+    Возвращает (пачка, box в её координатах)
+    """
+    factor_x = int((box[2] - box[0]) / size[0] / gap) or 1
+    factor_y = int((box[3] - box[1]) / size[1] / gap) or 1
+    if factor_x == 1 and factor_y == 1:
+        return stack, box
+    height, width = stack.shape[1:3]
+    support = _FILTERS[resample][1] - 0.5
+    support_x = support * (box[2] - box[0]) / size[0]
+    support_y = support * (box[3] - box[1]) / size[1]
+    reduce_box = (max(0, int(box[0] - support_x)), max(0, int(box[1] - support_y)),
+                  min(width, math.ceil(box[2] + support_x)), min(height, math.ceil(box[3] + support_y)))
+    reduced = _reduce_stack(stack, (factor_x, factor_y), reduce_box)
+    box = ((box[0] - reduce_box[0]) / factor_x, (box[1] - reduce_box[1]) / factor_y,
+           (box[2] - reduce_box[0]) / factor_x, (box[3] - reduce_box[1]) / factor_y)
+    return reduced, box
+
+
+def grayscale_stack(stack, method: str = 'bt601', output_mode: str = 'RGB'):
+    """
+    Оттенки серого для всей пачки одним вызовом Pillow: кадры, сложенные друг под другом,
+    - одно высокое изображение (для RGBA без копирования, см. arrays.from_array);
+    преобразование Pillow на C быстрее арифметики numpy и даёт те же значения, что color.grayscale
+    """
+    if output_mode not in ('L', 'RGB'):
+        raise ValueError(f"Неподдерживаемый режим результата: {output_mode}")
+    if stack.ndim == 3:
+        luma = stack.copy()   # уже оттенки серого; результат - новая пачка, как у остальных операций
+    else:
+        frames, height, width, channels = stack.shape
+        tall = arrays.from_array(stack.reshape(frames * height, width, channels))
+        luma = arrays.to_array(color.to_luma(tall, method)).reshape(frames, height, width)
+    if output_mode == 'L':
+        return luma
+    return np.repeat(luma[..., None], 3, axis=-1)
+
+
+def resize_stack(stack, width: int, height: int, mode: str = 'stretch', quality: str = 'best'):
+    """
+    Изменение размера всей пачки: два прохода фильтром (по строкам и по столбцам)
+    как умножение на матрицы весов, без цикла по кадрам
+    Геометрия, фильтр и предварительный reduce() уровня качества - как у resize_engine.resize,
+    результат совпадает с покадровым resize_image с точностью до округления;
+    пачки RGBA Pillow не уменьшает reduce() (и умножает на альфу) - здесь каналы независимы
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError("Размеры должны быть положительными")
+    source_height, source_width = stack.shape[1:3]
+    size, box = resize_engine.compute_geometry((source_width, source_height), (width, height), mode)
+    if quality not in resize_engine.QUALITY_PRESETS:
+        raise ValueError(f"Неизвестный уровень качества: {quality}")
+    resample, gap = resize_engine.QUALITY_PRESETS[quality]
+    if gap is not None and not (stack.ndim == 4 and stack.shape[3] == 4):
+        stack, box = _reduce_for_resize(stack, size, box, resample, gap)
+        source_height, source_width = stack.shape[1:3]
+    rows = resize_weights(source_height, size[1], box[1], box[3], resample)
+    columns = resize_weights(source_width, size[0], box[0], box[2], resample)
+
+    # Как у Pillow: сначала проход по строкам, промежуточный результат округляется
+    # и обрезается до 0..255, затем проход по столбцам
+    frames = stack.shape[0]
+    channels = stack.shape[3] if stack.ndim == 4 else 1
+    pixels = stack.astype(np.float32)
+    if channels > 1:
+        pixels = pixels.transpose(0, 1, 3, 2)   # строка каждого канала подряд: один GEMM на пачку
+    pixels = _to_uint8_range(np.matmul(pixels.reshape(-1, source_width), columns.T))
+    pixels = pixels.reshape(frames, source_height, channels, size[0])
+    if channels > 1:
+        pixels = pixels.transpose(0, 1, 3, 2)
+    pixels = pixels.reshape(frames, source_height, size[0] * channels)
+    pixels = _to_uint8_range(np.matmul(rows, pixels))   # (h, H) x (N, H, W'*C) -> (N, h, W'*C)
+    result = pixels.astype(np.uint8).reshape(frames, size[1], size[0], channels)
+    return result if stack.ndim == 4 else result[..., 0]
+
+
+# Операции рецепта, которые выполняются над пачкой: имя -> функция(stack, **params)
+STACK_OPERATIONS = {
+    'convert_to_grayscale': grayscale_stack,
+    'resize_image': resize_stack,
+}
+
+
+def process_stack(frames, operations: list):
+    """
+    Цепочка операций в формате рецепта над пачкой кадров
+    ([{"op": "convert_to_grayscale"}, {"op": "resize_image", "width": 64, "height": 64}])
+    Возвращает новую пачку (N, H, W[, C]); входной массив не изменяется
+    """
+    stack = as_stack(frames)
+    for step in operations:
+        operation = STACK_OPERATIONS.get(step['op'])
+        if operation is None:
+            raise ValueError(f"Операция не поддерживается для пачки: {step['op']}")
+        params = {key: value for key, value in step.items() if key != 'op'}
+        stack = operation(stack, **params)
+    return stack
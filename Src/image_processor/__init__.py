@@ -0,0 +1,27 @@
+"""
+Ядро обработки изображений без графического интерфейса
+Импорт пакета лёгкий: модули загружаются при первом обращении к их именам,
+Pillow и настройка логирования - при первой операции
+"""
+import importlib
+
+# Имя -> модуль пакета, из которого оно загружается
+_LAZY_ATTRIBUTES = {
+    'ImageProcessor': '.processor',
+    'MemoryBudgetExceeded': '.processor',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from image_processor.cli import main
+
+sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Командная строка без графического интерфейса:
+python -m image_processor run --recipe R --inputs ... --jobs N
+python -m image_processor watch ПАПКА --recipe R
+python -m image_processor coordinate --queue Q.sqlite --recipe R --inputs ... [--local-workers N] [--timeout S]
+python -m image_processor work --queue Q.sqlite
+"""
+import argparse
+import json
+import sys
+import time
+
+# Коды завершения
+EXIT_OK = 0
+EXIT_FAILURES = 1      # часть входов не обработана
+EXIT_USAGE = 2         # неверные параметры или рецепт
+EXIT_TIMEOUT = 124     # пакет не завершён за отведённое время
+EXIT_INTERRUPTED = 130
+
+
+class ProgressReporter:
+    """
+    Прогресс пакета в stderr: на терминале - одна обновляемая строка,
+    иначе - строка не чаще раза в interval секунд (для логов CI и серверов)
+    """
+
+    def __init__(self, stream=None, interval: float = 1.0):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.tty = self.stream.isatty()
+        self.failed = 0
+        self._start_time = time.perf_counter()
+        self._last_print = 0.0
+
+    def __call__(self, done: int, pending: int, path: str, ok: bool):
+        if not ok:
+            self.failed += 1
+        now = time.perf_counter()
+        if done < pending and now - self._last_print < (0.1 if self.tty else self.interval):
+            return
+        self._last_print = now
+        elapsed = now - self._start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (pending - done) / rate if rate > 0 else 0.0
+        line = (f"[{done}/{pending}] ошибок: {self.failed}, {rate:.1f} изобр/с, "
+                f"осталось ~{eta:.0f} с")
+        if self.tty:
+            self.stream.write('\r' + line + ('\n' if done == pending else ''))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+
+def _memory_budget(args) -> int:
+    return args.memory_budget * 2**20 if args.memory_budget else None
+
+
+def _load_recipe(path: str):
+    from recipe import Recipe
+    try:
+        return Recipe.from_file(path)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка рецепта {path}: {e}", file=sys.stderr)
+        return None
+
+
+def command_run(args) -> int:
+    """Инкрементальная пакетная обработка, сводка в JSON на stdout"""
+    from batch import BatchRunner
+    from profiling import profile_to
+
+    inputs = list(args.inputs) + list(args.inputs_option or [])
+    if not inputs:
+        print("Не указаны входные файлы или папки", file=sys.stderr)
+        return EXIT_USAGE
+    recipe = _load_recipe(args.recipe)
+    if recipe is None:
+        return EXIT_USAGE
+
+    runner = BatchRunner(recipe, args.output, args.manifest, args.jobs, args.hash,
+                         _memory_budget(args), args.processes, args.max_jobs_per_worker,
+                         args.max_worker_mb * 2**20)
+    progress = None if args.no_progress else ProgressReporter()
+    try:
+        if args.profile:
+            with profile_to(args.profile):
+                summary = runner.run(inputs, collect_garbage=args.gc, progress=progress,
+                                     exclude=args.exclude)
+        else:
+            summary = runner.run(inputs, collect_garbage=args.gc, progress=progress,
+                                 exclude=args.exclude)
+    except KeyboardInterrupt:
+        print("\nПакет прерван пользователем", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        runner.close()
+
+    _print_summary(summary, args.summary)
+    return EXIT_FAILURES if summary['failed'] else EXIT_OK
+
+
+def command_watch(args) -> int:
+    """Непрерывная обработка новых файлов в папке"""
+    from watcher import DirectoryWatcher
+
+    recipe = _load_recipe(args.recipe)
+    if recipe is None:
+        return EXIT_USAGE
+    try:
+        watcher = DirectoryWatcher(args.input_dir, recipe, output_dir=args.output,
+                                   workers=args.workers, poll_interval=args.interval,
+                                   settle_time=args.settle, memory_budget=_memory_budget(args))
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        counters = watcher.run()
+    except KeyboardInterrupt:
+        print("\nНаблюдение остановлено пользователем", file=sys.stderr)
+        return EXIT_OK
+    return EXIT_FAILURES if counters['failed'] else EXIT_OK
+
+
+def _print_summary(summary: dict, path: str = None):
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    print(text)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+def command_coordinate(args) -> int:
+    """Постановка пакета в общую очередь и ожидание, пока рабочие узлы его выполнят"""
+    from work_queue import Coordinator, start_local_workers
+
+    inputs = list(args.inputs) + list(args.inputs_option or [])
+    if not inputs:
+        print("Не указаны входные файлы или папки", file=sys.stderr)
+        return EXIT_USAGE
+    recipe = _load_recipe(args.recipe)
+    if recipe is None:
+        return EXIT_USAGE
+
+    coordinator = Coordinator(args.queue, args.lease, args.max_attempts)
+    workers = []
+    try:
+        batch_id = coordinator.submit(recipe, inputs, args.output, args.shard_size)
+        workers = start_local_workers(args.queue, args.local_workers, args.lease,
+                                      args.max_attempts, args.log_mode)
+
+        def progress(status):
+            if not args.no_progress:
+                print(f"[{status['processed'] + status['failed']}/{status['total']}] "
+                      f"ошибок: {status['failed']}, в работе: {status['leased']}, "
+                      f"{status['images_per_sec']:.1f} изобр/с", file=sys.stderr)
+
+        summary = coordinator.wait(batch_id, args.poll, progress, args.timeout)
+        if not summary['finished']:
+            # Локальные рабочие не ждутся: их задачи вернутся в очередь по истечении аренды
+            for process in workers:
+                process.terminate()
+    except KeyboardInterrupt:
+        print("\nОжидание прервано; задачи остаются в очереди", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        for process in workers:
+            process.join()
+        coordinator.close()
+
+    _print_summary(summary, args.summary)
+    if not summary['finished']:
+        print(f"Пакет {batch_id} не завершён за {args.timeout} с; задачи остаются в очереди",
+              file=sys.stderr)
+        return EXIT_TIMEOUT
+    return EXIT_FAILURES if summary['failed'] else EXIT_OK
+
+
+def command_work(args) -> int:
+    """Рабочий узла: выполнение задач из общей очереди"""
+    from work_queue import QueueWorker
+
+    worker = QueueWorker(args.queue, args.worker_id, args.lease, args.max_attempts,
+                         args.shard_tasks, memory_budget=_memory_budget(args))
+    try:
+        counters = worker.run(exit_when_idle=not args.keep_running)
+    except KeyboardInterrupt:
+        print("\nРабочий остановлен; незавершённые задачи вернутся в очередь после аренды",
+              file=sys.stderr)
+        return EXIT_INTERRUPTED
+    print(json.dumps(counters, ensure_ascii=False))
+    return EXIT_FAILURES if counters['failed'] else EXIT_OK
+
+
+def _add_queue_arguments(parser):
+    parser.add_argument('--queue', required=True, help="Файл очереди SQLite (локальный диск этого узла)")
+    parser.add_argument('--lease', type=float, default=60.0,
+                        help="Срок аренды задачи, с; по истечении задача отдаётся другому рабочему")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Попыток на задачу")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from logging_config import add_logging_arguments
+
+    parser = argparse.ArgumentParser(prog='python -m image_processor',
+                                     description="Обработка изображений из командной строки")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Пакетная обработка файлов и папок по рецепту")
+    run.add_argument('inputs', nargs='*', help="Файлы и папки с изображениями")
+    run.add_argument('--inputs', dest='inputs_option', nargs='+', metavar='PATH',
+                     help="Файлы и папки с изображениями (альтернатива позиционным)")
+    run.add_argument('--recipe', required=True, help="JSON-файл рецепта")
+    run.add_argument('--output', default='output', help="Папка для результатов")
+    run.add_argument('--manifest', default=None, help="Путь к манифесту (SQLite)")
+    run.add_argument('--exclude', nargs='+', default=[], metavar='DIR',
+                     help="Папки, которые не считаются входами (например, processed и failed "
+                          "наблюдаемой папки); папка результатов исключается всегда")
+    run.add_argument('--jobs', type=int, default=4, help="Число потоков обработки")
+    run.add_argument('--processes', type=int, default=0,
+                     help="Число рабочих процессов (0 - обработка в потоках, см. --jobs)")
+    run.add_argument('--max-jobs-per-worker', type=int, default=500,
+                     help="Перезапуск рабочего процесса после стольких задач")
+    run.add_argument('--max-worker-mb', type=int, default=4096,
+                     help="Перезапуск рабочего процесса после выделения стольких МБ под изображения")
+    run.add_argument('--hash', action='store_true',
+                     help="Сверять содержимое по хешу, если изменился только mtime")
+    run.add_argument('--gc', action='store_true',
+                     help="Удалить результаты входов, которых больше нет")
+    run.add_argument('--memory-budget', type=int, default=None, metavar='MB',
+                     help="Предел памяти под изображения на один поток, МБ")
+    run.add_argument('--profile', metavar='PATH',
+                     help="Профилировать прогон: свёрнутые стеки и разбивка по фазам в PATH")
+    run.add_argument('--summary', metavar='PATH', help="Сохранить сводку JSON также в файл")
+    run.add_argument('--no-progress', action='store_true', help="Не выводить прогресс в stderr")
+    add_logging_arguments(run, default_mode='quiet')
+    run.set_defaults(handler=command_run)
+
+    watch = commands.add_parser('watch', help="Непрерывная обработка новых файлов в папке")
+    watch.add_argument('input_dir', help="Папка для наблюдения")
+    watch.add_argument('--recipe', required=True, help="JSON-файл рецепта")
+    watch.add_argument('--output', default='output', help="Папка для результатов")
+    watch.add_argument('--workers', type=int, default=4, help="Число потоков обработки")
+    watch.add_argument('--interval', type=float, default=1.0, help="Период опроса, с")
+    watch.add_argument('--settle', type=float, default=2.0,
+                       help="Сколько секунд файл должен не меняться перед обработкой")
+    watch.add_argument('--memory-budget', type=int, default=None, metavar='MB',
+                       help="Предел памяти под изображения на один поток, МБ")
+    add_logging_arguments(watch)
+    watch.set_defaults(handler=command_watch)
+
+    coordinate = commands.add_parser('coordinate',
+                                     help="Распределённый пакет: постановка в очередь и сводка")
+    coordinate.add_argument('inputs', nargs='*', help="Файлы и папки с изображениями")
+    coordinate.add_argument('--inputs', dest='inputs_option', nargs='+', metavar='PATH',
+                            help="Файлы и папки с изображениями (альтернатива позиционным)")
+    coordinate.add_argument('--recipe', required=True, help="JSON-файл рецепта")
+    coordinate.add_argument('--output', default='output', help="Папка для результатов")
+    coordinate.add_argument('--shard-size', type=int, default=50, help="Входов в шарде")
+    coordinate.add_argument('--local-workers', type=int, default=0,
+                            help="Сколько рабочих запустить на этом узле")
+    coordinate.add_argument('--poll', type=float, default=1.0, help="Период опроса очереди, с")
+    coordinate.add_argument('--timeout', type=float, default=None,
+                            help="Не ждать пакет дольше, с (код завершения 124)")
+    coordinate.add_argument('--summary', metavar='PATH', help="Сохранить сводку JSON также в файл")
+    coordinate.add_argument('--no-progress', action='store_true',
+                            help="Не выводить прогресс в stderr")
+    _add_queue_arguments(coordinate)
+    add_logging_arguments(coordinate, default_mode='quiet')
+    coordinate.set_defaults(handler=command_coordinate)
+
+    work = commands.add_parser('work', help="Рабочий узла: задачи из общей очереди")
+    work.add_argument('--worker-id', default=None, help="Имя рабочего (по умолчанию host:pid)")
+    work.add_argument('--shard-tasks', type=int, default=10, help="Задач за одну аренду")
+    work.add_argument('--keep-running', action='store_true',
+                      help="Ждать новые пакеты, а не выходить при пустой очереди")
+    work.add_argument('--memory-budget', type=int, default=None, metavar='MB',
+                      help="Предел памяти под изображения, МБ")
+    _add_queue_arguments(work)
+    add_logging_arguments(work, default_mode='quiet')
+    work.set_defaults(handler=command_work)
+    return parser
+
+
+def main(argv=None) -> int:
+    """Разбор аргументов и запуск команды; возвращает код завершения"""
+    from logging_config import configure_from_args
+
+    args = build_parser().parse_args(argv)
+    configure_from_args(args)
+    return args.handler(args)
@@ -0,0 +1,834 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from instrumentation import OperationStats, estimate_nbytes, image_nbytes, instrumented
+
+# Pillow, logging, resize_engine, renditions и logging_config импортируются внутри методов:
+# импорт модуля и создание процессора не тянут за собой тяжёлые зависимости
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Операция не помещается в бюджет памяти процессора"""
+    pass
+
+
+class ImageProcessor:
+    """
+    Модуль обработки и работы с изображениями для Проекта 5
+    Использует только PIL (Pillow) - стандартную библиотеку для работы с изображениями
+    """
+    
+    # Общий замок для журнала действий: экземпляры могут работать в разных потоках
+    _action_log_lock = threading.Lock()
+    
+    # Операции, которые process_array применяет к массиву
+    _ARRAY_OPERATIONS = ('remove_noise', 'convert_to_grayscale', 'resize_image')
+    
+    def __init__(self, memory_budget: int = None, executor=None):
+        """
+        memory_budget: предел памяти в байтах под изображения, которые держит процессор
+        (None - без ограничения). При нехватке исходное изображение заменяется ссылкой
+        на файл, затем отбрасывается история отмены, и только потом операция отклоняется
+        executor: shared_images.ParallelExecutor для параллельных remove_noise и resize_image
+        больших изображений (None - всё в текущем потоке)
+        """
+        self.current_image = None
+        self.previous_image = None
+        self._undo_patch = None   # (box, прежние пиксели области) - отмена операции над областью
+        self._original_image = None
+        self._original_patches = []   # (box, прежние пиксели) областей, изменённых в объекте исходного
+        self._original_source = None   # (путь, размер файла, mtime) для ленивой перезагрузки
+        self.memory_budget = memory_budget
+        self.executor = executor
+        self._peak_bytes = 0
+        self._stats = OperationStats()
+        self._stats_hooks = []
+        self._logger = None
+    
+    @property
+    def logger(self):
+        """Логгер процессора; логирование настраивается при первом обращении, а не в конструкторе"""
+        if self._logger is None:
+            self._setup_logging()
+        return self._logger
+    
+    @property
+    def previous_image(self):
+        """Снимок для отмены операции над всем изображением"""
+        return self._previous_image
+    
+    @previous_image.setter
+    def previous_image(self, image):
+        # Отмена одноуровневая: новый снимок заменяет и сохранённую область
+        self._previous_image = image
+        self._undo_patch = None
+    
+    @property
+    def _original_image(self):
+        """
+        Объект исходного изображения как есть: после операций над областью на месте
+        его пиксели в областях _original_patches уже изменены
+        """
+        return self._original_object
+    
+    @_original_image.setter
+    def _original_image(self, image):
+        # Заплатки относятся к прежнему объекту исходного
+        self._original_object = image
+        self._original_patches = []
+    
+    @property
+    def original_image(self):
+        """
+        Исходное изображение; если оно было выгружено из-за бюджета памяти - перечитывается с диска
+        Области, изменённые на месте, восстанавливаются из заплаток; пока объект исходного
+        делят текущее или снимок отмены, восстанавливается его копия
+        """
+        if self._original_image is None and self._original_source is not None:
+            self._original_image = self._reload_original()
+        if self._original_patches:
+            image = self._original_image
+            if image is self.current_image or image is self.previous_image:
+                image = image.copy()
+            for box, patch in reversed(self._original_patches):
+                image.paste(patch, box[:2])
+            self._original_image = image
+        return self._original_image
+    
+    @original_image.setter
+    def original_image(self, image):
+        self._original_image = image
+        self._original_source = None
+    
+    def _reload_original(self):
+        """Ленивая перезагрузка исходного изображения, если файл не изменился"""
+        path, size, mtime_ns = self._original_source
+        try:
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                raise ValueError(f"Файл изменился после загрузки: {path}")
+            from PIL import Image
+            with Image.open(path) as image:
+                image.load()
+                return image
+        except Exception as e:
+            self.logger.error(f"Не удалось перечитать исходное изображение: {str(e)}")
+            self._original_source = None
+            return None
+    
+    def _writable_current(self):
+        """
+        Текущее изображение, которое можно менять на месте (копирование при записи)
+        Снимок отмены и исходное держат ссылку на тот же объект, что и текущее,
+        поэтому перед изменением на месте общий объект копируется
+        """
+        if self.current_image is not None and (self.current_image is self.previous_image
+                                               or self.current_image is self._original_image):
+            self.current_image = self.current_image.copy()
+        return self.current_image
+    
+    def _region_box(self, region) -> tuple:
+        """
+        Область операции: (left, top, right, bottom) или маска - изображение режима '1' или 'L'
+        размером с текущее (меняются только пиксели под ненулевой маской)
+        Возвращает (box, маска в пределах box или None)
+        """
+        width, height = self.current_image.size
+        if hasattr(region, 'getbbox'):
+            if region.mode not in ('1', 'L') or region.size != (width, height):
+                raise ValueError("Маска области должна быть режима '1' или 'L' и размером с изображение")
+            box = region.getbbox()
+            if box is None:
+                raise ValueError("Маска области пуста")
+            return box, region.crop(box)
+        left, top, right, bottom = (int(value) for value in region)
+        if not (0 <= left < right <= width and 0 <= top < bottom <= height):
+            raise ValueError(f"Область {tuple(region)} вне изображения {width}x{height}")
+        return (left, top, right, bottom), None
+    
+    def _region_budget(self, operation: str, output_bytes: int, snapshot_bytes: int) -> bool:
+        """
+        Бюджет операции над областью: запись идёт на месте и стоит как область
+        Если текущее - исходное, прежние пиксели области нужны и для исходного (та же вырезка,
+        что и снимок отмены); когда снимок не помещается, исходное, загруженное из файла,
+        выгружается (перечитывается при сбросе) вместо заплатки
+        """
+        keep_snapshot = self._ensure_budget(operation, output_bytes, snapshot_bytes)
+        if not keep_snapshot and self.current_image is self._original_image \
+                and self._original_source is not None:
+            self._original_image = None
+            self.logger.warning("Бюджет памяти: исходное изображение выгружено, будет перечитано при сбросе")
+        return keep_snapshot
+    
+    def _apply_region(self, box: tuple, result, mask, keep_snapshot: bool):
+        """
+        Запись результата операции в область текущего изображения на месте
+        Для отмены сохраняются только прежние пиксели области; общее с исходным текущее
+        не копируется целиком - та же вырезка становится заплаткой исходного (см. original_image)
+        """
+        on_original = self.current_image is self._original_image
+        patch = self.current_image.crop(box) if keep_snapshot or on_original else None
+        self.previous_image = None
+        if on_original:
+            self._original_patches.append((box, patch))
+            self.current_image.paste(result, box[:2], mask)
+        else:
+            self._writable_current().paste(result, box[:2], mask)
+        self._undo_patch = (box, patch) if keep_snapshot else None
+    
+    def _held_images(self) -> tuple:
+        """Изображения, которые сейчас держит процессор (без ленивой перезагрузки)"""
+        patch = self._undo_patch[1] if self._undo_patch is not None else None
+        return (self.current_image, self.previous_image, self._original_image, patch) + tuple(
+            original_patch for _, original_patch in self._original_patches)
+    
+    def memory_usage(self) -> dict:
+        """Память под изображения процессора в байтах (общие объекты считаются один раз)"""
+        held = {}
+        for image in self._held_images():
+            if image is not None:
+                held[id(image)] = image_nbytes(image)
+        total = sum(held.values())
+        self._peak_bytes = max(self._peak_bytes, total)
+        return {
+            'current': image_nbytes(self.current_image),
+            'previous': image_nbytes(self.previous_image),
+            'undo_patch': image_nbytes(self._undo_patch[1]) if self._undo_patch is not None else 0,
+            'original': image_nbytes(self._original_image),
+            'original_unloaded': self._original_image is None and self._original_source is not None,
+            'total': total,
+            'peak': self._peak_bytes,
+            'budget': self.memory_budget,
+        }
+    
+    def _ensure_budget(self, operation: str, output_bytes: int, snapshot_bytes: int) -> bool:
+        """
+        Проверка, что операция помещается в бюджет памяти
+        output_bytes - размер результата, snapshot_bytes - снимок для отмены
+        Освобождает память по ступеням: исходное -> прежняя история отмены ->
+        операция без возможности отмены -> отказ с MemoryBudgetExceeded
+        Возвращает True, если снимок для отмены можно сохранить
+        """
+        def required(with_snapshot=True):
+            return (self.memory_usage()['total'] + output_bytes
+                    + (snapshot_bytes if with_snapshot else 0))
+        
+        def fits(with_snapshot=True):
+            need = required(with_snapshot)
+            if self.memory_budget is not None and need > self.memory_budget:
+                return False
+            self._peak_bytes = max(self._peak_bytes, need)
+            return True
+        
+        if fits():
+            return True
+        
+        if self._original_image is not None and self._original_source is not None \
+                and self._original_image is not self.current_image:
+            self._original_image = None
+            self.logger.warning("Бюджет памяти: исходное изображение выгружено, будет перечитано при сбросе")
+            if fits():
+                return True
+        
+        if self.previous_image is not None or self._undo_patch is not None:
+            self.previous_image = None
+            self.logger.warning("Бюджет памяти: история отмены очищена")
+            if fits():
+                return True
+        
+        if fits(with_snapshot=False):
+            self.logger.warning(f"Бюджет памяти: {operation} выполняется без возможности отмены")
+            return False
+        
+        raise MemoryBudgetExceeded(
+            f"{operation}: требуется ~{required(False) / 2**20:.1f} МБ, "
+            f"бюджет {self.memory_budget / 2**20:.1f} МБ")
+    
+    def _load_budget(self, decoded_bytes: int):
+        """
+        Освобождение памяти перед декодированием, если всё, что держит процессор,
+        вместе с новым изображением не помещается в бюджет
+        Сначала снимок отмены (после загрузки его всё равно заменит прежнее текущее)
+        и исходное из файла (перечитается, если загрузка не удастся); если не помещается
+        и прежнее текущее - оно тоже освобождается, и загрузку нельзя будет отменить
+        """
+        def fits():
+            return self.memory_usage()['total'] + decoded_bytes <= self.memory_budget
+        
+        if fits():
+            return
+        if self.previous_image is not None or self._undo_patch is not None:
+            self.previous_image = None
+            self.logger.warning("Бюджет памяти: история отмены очищена")
+        if not fits() and self._original_source is not None and self._original_image is not None \
+                and self._original_image is not self.current_image:
+            self._original_image = None
+            self.logger.warning("Бюджет памяти: исходное изображение выгружено, будет перечитано при сбросе")
+        if not fits() and self.current_image is not None:
+            if self._original_image is self.current_image and self._original_source is not None:
+                self._original_image = None
+            self.current_image = None
+            self.logger.warning("Бюджет памяти: load_image выполняется без возможности отмены")
+    
+    def _setup_logging(self):
+        """Настройка логирования"""
+        import logging
+        import logging_config
+        # Режим (verbose / quiet) выбирается через logging_config.configure_logging
+        logging_config.ensure_logging()
+        self._logger = logging.getLogger(__package__)
+    
+    def _log_operation(self, operation: str, message: str, *args):
+        """
+        Информационная строка об операции: форматируется лениво, только если будет выведена
+        В режиме quiet такие строки сводятся в периодические сводки
+        """
+        self.logger.info(message, *args, extra={'operation': operation})
+    
+    @instrumented('load_image', uses_input=False)
+    def load_image(self, image_path: str) -> bool:
+        """Загрузка изображения с проверкой формата"""
+        try:
+            if not os.path.exists(image_path):
+                raise FileNotFoundError(f"Файл не найден: {image_path}")
+            
+            # Проверка поддерживаемых форматов
+            supported_formats = ('.png', '.jpg', '.jpeg', '.bmp')
+            if not image_path.lower().endswith(supported_formats):
+                raise ValueError(f"Неподдерживаемый формат: {image_path}")
+            
+            from PIL import Image
+            image = Image.open(image_path)
+            decoded_bytes = image_nbytes(image)   # размер известен из заголовка, до декодирования
+            if self.memory_budget is not None:
+                if decoded_bytes > self.memory_budget:
+                    image.close()
+                    raise MemoryBudgetExceeded(
+                        f"load_image: изображение {image.width}x{image.height} занимает "
+                        f"~{decoded_bytes / 2**20:.1f} МБ, бюджет {self.memory_budget / 2**20:.1f} МБ")
+                self._load_budget(decoded_bytes)
+            # Во время декодирования живы все изображения процессора и новое - это пик загрузки
+            self._ensure_budget("load_image", decoded_bytes, 0)
+            
+            previous = self.current_image
+            image.load()
+            self.previous_image = previous
+            self.current_image = image
+            # Исходное и текущее - один объект: операции не меняют изображение на месте,
+            # а создают новое, поэтому отдельная копия не нужна
+            self._original_image = image
+            stat = os.stat(image_path)
+            self._original_source = (image_path, stat.st_size, stat.st_mtime_ns)
+            
+            self._log_operation("load_image", "Изображение загружено: %s", image_path)
+            self._log_user_action("load_image", {"path": image_path})
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка загрузки: {str(e)}")
+            return False
+    
+    @instrumented('load_from_array', uses_input=False)
+    def load_from_array(self, pixels, copy: bool = False) -> bool:
+        """
+        Загрузка изображения из массива numpy (h, w), (h, w, 3) или (h, w, 4)
+        Для uint8 в подходящем размещении копии нет: изображение читает пиксели массива
+        (см. arrays.from_array), изменения массива видны процессору;
+        float (0..1) и uint16 с каналами переводятся в uint8 копией;
+        copy=True - процессор получает собственную копию
+        """
+        try:
+            import arrays
+            image = arrays.from_array(pixels, copy)
+            original = self._original_image, self._original_source
+            if self.memory_budget is not None:
+                # Прежнее исходное после загрузки не нужно и не учитывается в бюджете
+                self._original_image = None
+                self._original_source = None
+            try:
+                keep_snapshot = self._ensure_budget("load_from_array", image_nbytes(image), 0)
+            except MemoryBudgetExceeded:
+                self._original_image, self._original_source = original
+                raise
+            self.previous_image = self.current_image if keep_snapshot else None
+            self.current_image = image
+            self.original_image = image
+    
+            self._log_operation("load_from_array", "Изображение загружено из массива: %dx%d %s",
+                                image.width, image.height, image.mode)
+            self._log_user_action("load_from_array", {"size": list(image.size), "mode": image.mode,
+                                                      "copy": copy})
+            return True
+    
+        except Exception as e:
+            self.logger.error(f"Ошибка загрузки из массива: {str(e)}")
+            return False
+    
+    def to_array(self, writable: bool = False):
+        """
+        Текущее изображение как массив numpy без копирования, если изображение уже
+        отображено на массив (load_from_array или прежний вызов to_array); иначе пиксели
+        один раз копируются в новый массив, и текущим становится изображение поверх него
+        writable=False - массив только для чтения; writable=True - массив, запись в который
+        меняет текущее изображение (если его делят история отмены или исходное - сначала копия)
+        Возвращает None при ошибке
+        """
+        try:
+            if self.current_image is None:
+                raise ValueError("Изображение не загружено")
+    
+            import arrays
+            image = self.current_image
+            shared_with_history = image is self.previous_image or image is self._original_image
+            pixels = arrays.shared_array(image)
+            if arrays.can_share(image.mode) and (pixels is None or (writable and shared_with_history)
+                                                      or (writable and not pixels.flags.writeable)):
+                self._ensure_budget("to_array", image_nbytes(image), 0)
+                self.current_image = arrays.share(image)
+                pixels = arrays.shared_array(self.current_image)
+            elif pixels is None:
+                pixels = arrays.to_array(image)   # режим без общего размещения - отдельная копия
+            if not writable:
+                pixels = pixels.view()
+                pixels.flags.writeable = False
+            return pixels
+    
+        except Exception as e:
+            self.logger.error(f"Ошибка преобразования в массив: {str(e)}")
+            return None
+    
+    def process_array(self, pixels, operations: list, copy: bool = False):
+        """
+        Цепочка операций над массивом: загрузка без копирования, шаги в формате рецепта
+        ([{"op": "remove_noise", "strength": 3}, ...]) и результат как массив (to_array)
+        Входной массив не изменяется; возвращает None при ошибке любого шага
+        """
+        if not self.load_from_array(pixels, copy):
+            return None
+        for step in operations:
+            params = {key: value for key, value in step.items() if key != 'op'}
+            if step['op'] not in self._ARRAY_OPERATIONS:
+                self.logger.error(f"Ошибка обработки массива: неизвестная операция {step['op']}")
+                return None
+            if not getattr(self, step['op'])(**params):
+                return None
+        return self.to_array()
+    
+    def process_stack(self, frames, operations: list):
+        """
+        Одна цепочка операций над пачкой кадров одного размера: массив (N, H, W, C)
+        или список изображений. Операции (convert_to_grayscale, resize_image) выполняются
+        над всей пачкой сразу (см. frame_stack), одна строка лога на пачку
+        Текущее изображение и история отмены не изменяются
+        Возвращает пачку результатов (N, H, W[, C]) или None при ошибке
+        """
+        try:
+            import frame_stack
+            start_time = time.perf_counter()
+            result = frame_stack.process_stack(frames, operations)
+            total_ms = (time.perf_counter() - start_time) * 1000
+    
+            self._log_operation("process_stack", "Обработана пачка: %d кадров %dx%d за %.1f ms",
+                                result.shape[0], result.shape[2], result.shape[1], total_ms)
+            self._log_user_action("process_stack", {
+                "frames": int(result.shape[0]),
+                "operations": [step['op'] for step in operations],
+                "total_ms": round(total_ms, 2)
+            })
+            return result
+    
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки пачки: {str(e)}")
+            return None
+    
+    @instrumented('remove_noise')
+    def remove_noise(self, strength: int = 3, mode: str = 'uniform', method: str = 'median',
+                     quality: str = None, region=None) -> bool:
+        """
+        Удаление шумов
+        strength: интенсивность шумоподавления (1-7)
+        mode: для медианного фильтра - 'uniform' (всё изображение) или
+              'adaptive' (только пиксели с импульсным шумом, см. denoise.adaptive_median)
+        method: 'median', 'box', 'fast_gaussian', 'gaussian', 'bilateral', 'nlm'
+                (последние три - на numpy, см. denoise)
+        quality: 'draft', 'fast', 'balanced', 'high', 'best' - выбор метода по качеству
+                 вместо method
+        region: (left, top, right, bottom) или маска ('1' / 'L') - обработать только область;
+                фильтр считается по области с полями, для отмены хранится только область
+        Палитровое изображение сначала переводится в RGB (с прозрачностью - в RGBA):
+        фильтр по индексам палитры не имеет смысла
+        """
+        try:
+            if self.current_image is None:
+                raise ValueError("Изображение не загружено")
+            
+            if mode not in ('uniform', 'adaptive'):
+                raise ValueError(f"Неизвестный режим шумоподавления: {mode}")
+            if quality is not None or method != 'median':
+                import denoise
+                method = denoise.method_for_quality(quality) if quality is not None else method
+                if method not in denoise.available_methods():
+                    raise ValueError(f"Метод шумоподавления недоступен: {method}")
+            if mode == 'adaptive' and method != 'median':
+                raise ValueError("Адаптивный режим поддерживается только медианным фильтром")
+            
+            # Размер медианного фильтра должен быть нечетным
+            filter_size = max(1, min(7, strength))  # Ограничение 1-7
+            if method == 'median' and filter_size % 2 == 0:
+                filter_size += 1
+            
+            image = self.current_image
+            palette = image.mode in ('P', 'PA')
+            if region is None:
+                filter_mode = image.mode
+                if palette:
+                    filter_mode = 'RGBA' if image.mode == 'PA' or 'transparency' in image.info else 'RGB'
+                # Снимок для отмены - ссылка на прежний объект, копия не нужна;
+                # для палитры - ещё изображение в цветах
+                output_bytes = estimate_nbytes(image.size, filter_mode) * (2 if palette else 1)
+                keep_snapshot = self._ensure_budget("remove_noise", output_bytes, 0)
+                if palette:
+                    image = image.convert(filter_mode)
+                self.previous_image = self.current_image if keep_snapshot else None
+                self.current_image = self._filter_noise(image, filter_size, mode, method)
+            else:
+                if palette:
+                    raise ValueError(f"Для области режим {image.mode} не поддерживается: "
+                                     f"сначала преобразуйте изображение в RGB")
+                import denoise
+                box, mask = self._region_box(region)
+                # Поля вокруг области: соседи, которые фильтр читает на её краях
+                margin = denoise.context_radius(method, filter_size, mode)
+                width, height = self.current_image.size
+                outer = (max(0, box[0] - margin), max(0, box[1] - margin),
+                         min(width, box[2] + margin), min(height, box[3] + margin))
+                region_size = (box[2] - box[0], box[3] - box[1])
+                outer_bytes = estimate_nbytes((outer[2] - outer[0], outer[3] - outer[1]), self.current_image.mode)
+                keep_snapshot = self._region_budget("remove_noise", 2 * outer_bytes,
+                                                    estimate_nbytes(region_size, self.current_image.mode))
+                filtered = self._filter_noise(self.current_image.crop(outer), filter_size, mode, method)
+                inner = (box[0] - outer[0], box[1] - outer[1], box[2] - outer[0], box[3] - outer[1])
+                self._apply_region(box, filtered.crop(inner), mask, keep_snapshot)
+            
+            self._log_operation("remove_noise", "Шумоподавление применено: strength=%d, mode=%s, method=%s",
+                                filter_size, mode, method)
+            parameters = {"strength": filter_size, "mode": mode, "method": method}
+            if region is not None:
+                parameters["region"] = list(box)
+            self._log_user_action("remove_noise", parameters)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка шумоподавления: {str(e)}")
+            return False
+    
+    def _filter_noise(self, image, filter_size: int, mode: str, method: str):
+        """Шумоподавление изображения (всего или вырезанной области) уже проверенными параметрами"""
+        if method != 'median':
+            import denoise
+            return denoise.denoise(image, method, filter_size)
+        # Медиана окна 1x1 не меняет изображение (а Pillow падает на таком окне)
+        if filter_size <= 1:
+            return image
+        if mode == 'adaptive':
+            import denoise
+            return denoise.adaptive_median(image, filter_size)[0]
+        if self.executor is not None and self.executor.supports(image):
+            return self.executor.median_filter(image, filter_size)
+        from PIL import ImageFilter
+        return image.filter(ImageFilter.MedianFilter(size=filter_size))
+    
+    @instrumented('convert_to_grayscale')
+    def convert_to_grayscale(self, method: str = 'bt601', output_mode: str = 'RGB', region=None) -> bool:
+        """
+        Перевод в оттенки серого
+        method: коэффициенты яркости - 'bt601', 'bt709', 'average' или 'lightness' (см. color)
+        output_mode: 'RGB' (по умолчанию, для единообразия) или 'L' - вчетверо меньше памяти
+        region: (left, top, right, bottom) или маска ('1' / 'L') - только область;
+                режим изображения не меняется, для отмены хранится только область
+        """
+        try:
+            if self.current_image is None:
+                raise ValueError("Изображение не загружено")
+            
+            import color
+            if method not in color.GRAYSCALE_METHODS:
+                raise ValueError(f"Неизвестный способ перевода в оттенки серого: {method}")
+            if region is None:
+                width, height = self.current_image.size
+                # Канал яркости L (1 байт на пиксель) и итоговое изображение
+                output_bytes = estimate_nbytes((width, height), 'L')
+                if output_mode != 'L':
+                    output_bytes += estimate_nbytes((width, height), output_mode)
+                keep_snapshot = self._ensure_budget("convert_to_grayscale", output_bytes, 0)
+                result = color.grayscale(self.current_image, method, output_mode)
+                self.previous_image = self.current_image if keep_snapshot else None
+                self.current_image = result
+            else:
+                image_mode = self.current_image.mode
+                if output_mode == 'L' and image_mode != 'L':
+                    raise ValueError("Для области режим изображения не меняется: output_mode='L' недоступен")
+                box, mask = self._region_box(region)
+                region_bytes = estimate_nbytes((box[2] - box[0], box[3] - box[1]), image_mode)
+                keep_snapshot = self._region_budget("convert_to_grayscale", 2 * region_bytes, region_bytes)
+                self._apply_region(box, color.grayscale_like(self.current_image.crop(box), method),
+                                   mask, keep_snapshot)
+            
+            self._log_operation("convert_to_grayscale", "Изображение преобразовано в оттенки серого: %s",
+                                method)
+            parameters = {"method": method, "output_mode": output_mode}
+            if region is not None:
+                parameters["region"] = list(box)
+            self._log_user_action("convert_to_grayscale", parameters)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка конвертации: {str(e)}")
+            return False
+    
+    @instrumented('resize_image')
+    def resize_image(self, width: int, height: int, mode: str = 'stretch', quality: str = 'best',
+                     region=None) -> bool:
+        """
+        Изменение разрешения изображения
+        mode: 'stretch' - точный размер, 'fit' - вписать, 'fill' - заполнить с обрезкой
+        quality: 'best' (один проход LANCZOS, как прежде), 'high', 'balanced', 'fast', 'draft'
+                 (см. resize_engine)
+        region: (left, top, right, bottom) или маска (берётся её рамка) - кадрирование
+                и изменение размера за один проход, читаются только пиксели области
+        """
+        try:
+            if self.current_image is None:
+                raise ValueError("Изображение не загружено")
+            
+            if width <= 0 or height <= 0:
+                raise ValueError("Размеры должны быть положительными")
+            
+            import resize_engine
+            box = self._region_box(region)[0] if region is not None else (0, 0) + self.current_image.size
+            target_size, _ = resize_engine.compute_geometry((box[2] - box[0], box[3] - box[1]),
+                                                            (width, height), mode)
+            output_bytes = estimate_nbytes(target_size, self.current_image.mode)
+            keep_snapshot = self._ensure_budget("resize_image", output_bytes, 0)
+            resized = resize_engine.resize(self.current_image, width, height, mode, quality,
+                                           self.executor, box if region is not None else None)
+            self.previous_image = self.current_image if keep_snapshot else None
+            self.current_image = resized
+            
+            new_width, new_height = self.current_image.size
+            self._log_operation("resize_image", "Размер изменен: %dx%d (mode=%s, quality=%s)",
+                                new_width, new_height, mode, quality)
+            parameters = {"width": new_width, "height": new_height, "mode": mode, "quality": quality}
+            if region is not None:
+                parameters["region"] = list(box)
+            self._log_user_action("resize_image", parameters)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка изменения размера: {str(e)}")
+            return False
+    
+    def get_image_info(self) -> dict:
+        """Получение информации об изображении"""
+        try:
+            if self.current_image is None:
+                return {}
+            
+            width, height = self.current_image.size
+            
+            info = {
+                'width': width,
+                'height': height,
+                'format': self.current_image.format or 'Unknown',
+                'mode': self.current_image.mode,
+                'size': f"{width}x{height}"
+            }
+            
+            return info
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка получения информации: {str(e)}")
+            return {}
+    
+    def estimate_cost(self, operations: list, size: tuple = None, mode: str = None,
+                      output_format: str = None, model=None) -> dict:
+        """
+        Оценка времени и памяти цепочки операций до её выполнения
+        operations: шаги в формате рецепта, например
+        [{"op": "remove_noise", "strength": 7}, {"op": "resize_image", "width": 800, "height": 600}]
+        size / mode: по умолчанию - текущего изображения
+        model: cost_model.CostModel (по умолчанию - откалиброванная из config/cost_model.json)
+        Возвращает словарь time_ms, peak_bytes, size, mode, steps ({} при ошибке)
+        """
+        try:
+            if size is None:
+                if self.current_image is None:
+                    raise ValueError("Изображение не загружено и размер не указан")
+                size = self.current_image.size
+                mode = mode or self.current_image.mode
+            import cost_model
+            model = model or cost_model.default_model()
+            return model.estimate(size, operations, mode or 'RGB', output_format=output_format)
+
+        except Exception as e:
+            self.logger.error(f"Ошибка оценки стоимости: {str(e)}")
+            return {}
+
+    @instrumented('save_image')
+    def save_image(self, output_path: str) -> bool:
+        """Сохранение изображения в другом формате"""
+        try:
+            if self.current_image is None:
+                raise ValueError("Нет изображения для сохранения")
+            
+            # Определяем формат из расширения файла
+            format_map = {
+                '.jpg': 'JPEG',
+                '.jpeg': 'JPEG', 
+                '.png': 'PNG',
+                '.bmp': 'BMP'
+            }
+            ext = os.path.splitext(output_path)[1].lower()
+            format_name = format_map.get(ext, 'JPEG')
+            
+            self.current_image.save(output_path, format=format_name)
+            self._log_operation("save_image", "Изображение сохранено: %s (%s)", output_path, format_name)
+            self._log_user_action("save_image", {"path": output_path, "format": format_name})
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения: {str(e)}")
+            return False
+    
+    def generate_renditions(self, specs: list, output_dir: str = 'output',
+                            base_name: str = 'image', max_workers: int = None) -> list:
+        """
+        Построение нескольких рендишнов текущего изображения за одно декодирование
+        specs: список (width, height[, format]) или словарей (см. renditions.normalize_spec)
+        Текущее изображение и история отмены не изменяются
+        Возвращает список словарей с путями и временем, при ошибке - пустой список
+        """
+        try:
+            if self.current_image is None:
+                raise ValueError("Изображение не загружено")
+            
+            import renditions
+            start_time = time.perf_counter()
+            results = renditions.generate_renditions(self.current_image, specs, output_dir,
+                                                     base_name, max_workers)
+            total_ms = (time.perf_counter() - start_time) * 1000
+            
+            self._log_operation("generate_renditions", "Создано рендишнов: %d за %.1f ms",
+                                len(results), total_ms)
+            self._log_user_action("generate_renditions", {
+                "paths": [item['path'] for item in results],
+                "total_ms": round(total_ms, 2)
+            })
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка создания рендишнов: {str(e)}")
+            return []
+    
+    def undo(self) -> bool:
+        """Отмена последнего действия"""
+        if self._undo_patch is not None:
+            # Операция над областью: на место возвращаются только прежние пиксели области
+            box, patch = self._undo_patch
+            self._undo_patch = None
+            if self._original_patches and self._original_patches[-1][1] is patch \
+                    and self.current_image is self._original_image:
+                # Область исходного возвращается на место - заплатка больше не нужна
+                self._original_patches.pop()
+                self.current_image.paste(patch, box[:2])
+            else:
+                self._writable_current().paste(patch, box[:2])
+            self._log_operation("undo", "Отмена последнего действия")
+            self._log_user_action("undo", {"region": list(box)})
+            return True
+        if self.previous_image is not None:
+            self.current_image = self.previous_image
+            self.previous_image = None
+            self._log_operation("undo", "Отмена последнего действия")
+            self._log_user_action("undo", {})
+            return True
+        return False
+    
+    def reset_to_original(self) -> bool:
+        """Сброс к исходному изображению"""
+        if self.original_image is not None:
+            self.current_image = self.original_image
+            self.previous_image = None
+            self._log_operation("reset_to_original", "Сброс к исходному изображению")
+            self._log_user_action("reset_to_original", {})
+            return True
+        return False
+    
+    def release(self):
+        """
+        Освобождение изображений между задачами: текущее, история отмены и исходное
+        Статистика и настройки процессора сохраняются, процессор готов к следующей загрузке
+        """
+        self.current_image = None
+        self.previous_image = None
+        self._original_image = None
+        self._original_source = None
+    
+    def stats(self) -> dict:
+        """
+        Статистика операций с момента создания (или сброса):
+        для каждой операции - число вызовов и ошибок и гистограммы
+        wall_ms, cpu_ms, input_pixels, output_pixels, allocated_bytes
+        """
+        return self._stats.snapshot()
+    
+    def reset_stats(self):
+        """Сброс накопленной статистики операций"""
+        self._stats.reset()
+    
+    def add_stats_hook(self, hook):
+        """
+        Подключение экспорта статистики: hook(sample) вызывается после каждой
+        инструментированной операции со словарём замеров этого вызова
+        """
+        self._stats_hooks.append(hook)
+    
+    def remove_stats_hook(self, hook):
+        """Отключение экспорта статистики"""
+        if hook in self._stats_hooks:
+            self._stats_hooks.remove(hook)
+    
+    def _log_user_action(self, operation: str, parameters: dict):
+        """Логирование действий пользователя в JSON файл (отключается в режиме quiet)"""
+        import logging_config
+        if not logging_config.action_log_enabled():
+            return
+        os.makedirs('logs', exist_ok=True)
+        
+        action_log = {
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "parameters": parameters
+        }
+        
+        log_file = "logs/user_actions.json"
+        
+        with self._action_log_lock:
+            logs = []
+            
+            # Чтение существующих логов
+            if os.path.exists(log_file):
+                try:
+                    with open(log_file, 'r', encoding='utf-8') as f:
+                        logs = json.load(f)
+                except:
+                    logs = []
+            
+            # Добавление новой записи
+            logs.append(action_log)
+            
+            # Сохранение
+            with open(log_file, 'w', encoding='utf-8') as f:
+                json.dump(logs, f, ensure_ascii=False, indent=2)
\ No newline at end of file
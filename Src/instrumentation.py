@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from functools import wraps
+
+# Сколько байт на пиксель занимает изображение в памяти Pillow
+# (трёхканальные режимы хранятся по 4 байта на пиксель)
+_PIXEL_BYTES = {'1': 1, 'L': 1, 'P': 1, 'I;16': 2, 'I;16L': 2, 'I;16B': 2}
+
+# Метрики, которые записываются для каждого вызова операции
+METRICS = ('wall_ms', 'cpu_ms', 'input_pixels', 'output_pixels', 'allocated_bytes')
+
+
+def estimate_nbytes(size: tuple, mode: str) -> int:
+    """Объём пиксельных данных изображения заданного размера и режима в байтах"""
+    return size[0] * size[1] * _PIXEL_BYTES.get(mode, 4)
+
+
+def image_nbytes(image) -> int:
+    """Объём пиксельных данных изображения в байтах"""
+    if image is None:
+        return 0
+    return estimate_nbytes(image.size, image.mode)
+
+
+def _pixels(image) -> int:
+    return image.width * image.height if image is not None else 0
+
+
+class Histogram:
+    """
+    Дешёвая гистограмма с логарифмическими корзинами (степени двойки)
+    Хранит count/sum/min/max точно, перцентили - с точностью до корзины
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        bucket = math.ceil(math.log2(value)) if value > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(float(2 ** bucket), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'p50': self.percentile(0.50),
+            'p90': self.percentile(0.90),
+            'p99': self.percentile(0.99),
+        }
+
+
+class OperationStats:
+    """Статистика вызовов операций: счётчики и гистограммы по каждой метрике"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def record(self, operation: str, sample: dict):
+        with self._lock:
+            entry = self._operations.get(operation)
+            if entry is None:
+                entry = {'calls': 0, 'errors': 0}
+                entry.update({metric: Histogram() for metric in METRICS})
+                self._operations[operation] = entry
+            entry['calls'] += 1
+            if not sample['success']:
+                entry['errors'] += 1
+            for metric in METRICS:
+                entry[metric].add(sample[metric])
+
+    def snapshot(self) -> dict:
+        """Копия статистики в виде словаря"""
+        with self._lock:
+            return {
+                operation: {
+                    key: value.to_dict() if isinstance(value, Histogram) else value
+                    for key, value in entry.items()
+                }
+                for operation, entry in self._operations.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+
+
+def instrumented(operation: str, uses_input: bool = True):
+    """
+    Декоратор метода ImageProcessor: измеряет время (настенное и процессорное),
+    пиксели на входе и выходе и байты новых изображений, которые удерживает процессор
+    uses_input: False для операций, не читающих текущее изображение (загрузка)
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            before = self._held_images()
+            input_pixels = _pixels(self.current_image) if uses_input else 0
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+
+            result = method(self, *args, **kwargs)
+
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            known = {id(image) for image in before if image is not None}
+            allocated = 0
+            for image in {id(image): image for image in self._held_images()
+                          if image is not None}.values():
+                if id(image) not in known:
+                    allocated += image_nbytes(image)
+
+            sample = {
+                'operation': operation,
+                'success': bool(result),
+                'wall_ms': wall_ms,
+                'cpu_ms': cpu_ms,
+                'input_pixels': input_pixels,
+                'output_pixels': _pixels(self.current_image),
+                'allocated_bytes': allocated,
+            }
+            self._stats.record(operation, sample)
+            for hook in self._stats_hooks:
+                try:
+                    hook(sample)
+                except Exception as e:
+                    self.logger.error(f"Ошибка экспорта статистики: {str(e)}")
+            return result
+        return wrapper
+    return decorator
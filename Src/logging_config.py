@@ -0,0 +1,214 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+# verbose - каждая операция пишется сразу в консоль и в файл, ведётся журнал действий
+# quiet - запись через очередь в фоновом потоке, строки операций сводятся
+#         в периодические сводки, файл и журнал действий отключены
+LOG_MODES = ('verbose', 'quiet')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_LOG_FILE = os.path.join('logs', 'processor.log')
+
+_lock = threading.Lock()
+_state = {
+    'configured': False,
+    'handlers': [],
+    'listener': None,
+    'summary': None,
+    'action_log': True,
+    'atexit': False,
+}
+
+
+class OperationSummaryFilter(logging.Filter):
+    """
+    Агрегация информационных строк операций (записи с extra={'operation': ...})
+    Вместо каждой строки раз в interval секунд выводится сводка счётчиков по операциям -
+    фоновым таймером, даже если новых операций нет
+    sample_every: пропускать как образец первую и каждую N-ю строку операции (0 - ни одной)
+    Один фильтр ставится на все обработчики handlers: запись считается один раз,
+    решение для неё общее; предупреждения, ошибки и прочие записи проходят без изменений
+    """
+
+    def __init__(self, handlers: list, interval: float = 10.0, sample_every: int = 0):
+        super().__init__()
+        self.handlers = handlers
+        self.interval = interval
+        self.sample_every = sample_every
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._stopped = threading.Event()
+        self._timer = None
+
+    def start(self):
+        """Запуск таймера сводок"""
+        self._timer = threading.Thread(target=self._run, name='log-summary', daemon=True)
+        self._timer.start()
+
+    def stop(self):
+        """Остановка таймера и вывод последней сводки"""
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def filter(self, record) -> bool:
+        operation = getattr(record, 'operation', None)
+        if operation is None or record.levelno > logging.INFO:
+            return True
+        decision = getattr(record, 'summary_sampled', None)
+        if decision is not None:   # запись уже учтена другим обработчиком
+            return decision
+        with self._lock:
+            count = self.counts.get(operation, 0) + 1
+            self.counts[operation] = count
+            # Запасной путь без таймера (например, в процессе, порождённом fork)
+            due = time.monotonic() - self._window_start >= self.interval
+        if due:
+            self.flush()
+        record.summary_sampled = bool(self.sample_every) and (count - 1) % self.sample_every == 0
+        return record.summary_sampled
+
+    def flush(self):
+        """Вывод сводки за текущее окно и начало нового"""
+        with self._lock:
+            counts, self.counts = self.counts, {}
+            now = time.monotonic()
+            elapsed, self._window_start = now - self._window_start, now
+        if not counts:
+            return
+        record = logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.INFO,
+            'levelname': 'INFO',
+            'msg': "Сводка операций за %.1f с: %s",
+            'args': (elapsed, ', '.join(f"{name}={count}" for name, count in sorted(counts.items()))),
+        })
+        for handler in self.handlers:
+            handler.handle(record)
+
+
+def _queue_handler_class():
+    """
+    QueueHandler без форматирования в вызывающем потоке: очередь внутрипроцессная,
+    поэтому запись передаётся как есть и форматируется фоновым потоком
+    (logging.handlers импортируется только для режима с очередью)
+    """
+    from logging.handlers import QueueHandler
+
+    class DeferredQueueHandler(QueueHandler):
+        def prepare(self, record):
+            return record
+
+    return DeferredQueueHandler
+
+
+def configure_logging(mode: str = 'verbose', level: int = logging.INFO, file_logging: bool = None,
+                      log_file: str = DEFAULT_LOG_FILE, use_queue: bool = None,
+                      summary_interval: float = 10.0, sample_every: int = 0,
+                      action_log: bool = None, stream=None):
+    """
+    Настройка логирования процесса (повторный вызов заменяет прежнюю настройку)
+    Параметры со значением None берутся из режима mode (см. LOG_MODES)
+    file_logging=False полностью отключает файл логов, action_log=False - журнал действий
+    """
+    if mode not in LOG_MODES:
+        raise ValueError(f"Неизвестный режим логирования: {mode}")
+    quiet = mode == 'quiet'
+    if file_logging is None:
+        file_logging = not quiet
+    if use_queue is None:
+        use_queue = quiet
+    if action_log is None:
+        action_log = not quiet
+
+    shutdown_logging()
+    formatter = logging.Formatter(LOG_FORMAT)
+    targets = [logging.StreamHandler(stream)]
+    if file_logging:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        targets.append(logging.FileHandler(log_file))
+    for handler in targets:
+        handler.setFormatter(formatter)
+
+    listener = None
+    if use_queue:
+        # Вызывающий поток только кладёт запись в очередь, форматирование и запись - в фоне
+        from logging.handlers import QueueListener
+        handlers = [_queue_handler_class()(queue.SimpleQueue())]
+        listener = QueueListener(handlers[0].queue, *targets, respect_handler_level=True)
+        listener.start()
+    else:
+        handlers = targets
+
+    summary = None
+    if quiet:
+        # Фильтр логгера не видит записи дочерних логгеров - он ставится на каждый обработчик
+        summary = OperationSummaryFilter(handlers, summary_interval, sample_every)
+        for handler in handlers:
+            handler.addFilter(summary)
+        summary.start()
+
+    root = logging.getLogger()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+    with _lock:
+        _state.update(configured=True, handlers=handlers, listener=listener,
+                      summary=summary, action_log=action_log)
+        if not _state['atexit']:
+            atexit.register(shutdown_logging)
+            _state['atexit'] = True
+
+
+def ensure_logging():
+    """
+    Настройка по умолчанию (verbose), если логирование ещё никто не настроил
+    Как logging.basicConfig: чужие обработчики корневого логгера не трогаются
+    """
+    if not _state['configured'] and not logging.getLogger().handlers:
+        configure_logging()
+
+
+def shutdown_logging():
+    """Вывод последней сводки, остановка фонового потока и снятие установленных обработчиков"""
+    with _lock:
+        handlers, listener, summary = _state['handlers'], _state['listener'], _state['summary']
+        _state.update(configured=False, handlers=[], listener=None, summary=None, action_log=True)
+    if summary is not None:
+        summary.stop()
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    root = logging.getLogger()
+    for handler in handlers:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def action_log_enabled() -> bool:
+    """Ведётся ли JSON-журнал действий пользователя"""
+    return _state['action_log']
+
+
+def add_logging_arguments(parser, default_mode: str = 'verbose'):
+    """Общие параметры логирования для командной строки"""
+    parser.add_argument('--log-mode', choices=LOG_MODES, default=default_mode,
+                        help="quiet - фоновая запись, сводки вместо строк по операциям, без файла")
+    parser.add_argument('--no-log-file', action='store_true', help="Не писать logs/processor.log")
+
+
+def configure_from_args(args):
+    """Настройка логирования по параметрам add_logging_arguments"""
+    configure_logging(args.log_mode, file_logging=False if args.no_log_file else None)
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import json
-from PIL import Image, ImageTk
 from image_processor import ImageProcessor
 
 class ImageProcessorUI:
@@ -185,22 +184,37 @@ class ImageProcessorUI:
         else:
             messagebox.showerror("Ошибка", "Не удалось загрузить изображение!\nПроверьте формат файла.")
     
+    @staticmethod
+    def _preview(image, max_size=(400, 300)):
+        """
+        Превью для показа: уменьшенная копия без полного копирования исходника
+        Изображение, которое уже помещается в окно, показывается как есть
+        """
+        if image.width <= max_size[0] and image.height <= max_size[1]:
+            return image
+        import resize_engine
+        return resize_engine.resize(image, max_size[0], max_size[1], 'fit', 'balanced')
+    
+    @staticmethod
+    def _photo_image(image):
+        """Изображение для Tk; ImageTk загружается при первом показе, а не при запуске"""
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(image)
+    
     def display_images(self):
         """Отображение исходного и обработанного изображений"""
         # Отображение исходного изображения
         if self.processor.original_image is not None:
-            img = self.processor.original_image.copy()
-            img.thumbnail((400, 300))
-            img_tk = ImageTk.PhotoImage(img)
+            img = self._preview(self.processor.original_image)
+            img_tk = self._photo_image(img)
             
             self.original_label.configure(image=img_tk, text="")
             self.original_label.image = img_tk
         
         # Отображение обработанного изображения
         if self.processor.current_image is not None:
-            img = self.processor.current_image.copy()
-            img.thumbnail((400, 300))
-            img_tk = ImageTk.PhotoImage(img)
+            img = self._preview(self.processor.current_image)
+            img_tk = self._photo_image(img)
             
             self.processed_label.configure(image=img_tk, text="")
             self.processed_label.image = img_tk
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Хеш содержимого файла (blake2b)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Манифест уже обработанных входных файлов (SQLite)
+    Для каждого входа хранится размер, mtime, хеш содержимого (опционально),
+    хеш рецепта и путь результата
+    """
+
+    def __init__(self, path: str, use_hash: bool = False):
+        self.path = path
+        self.use_hash = use_hash
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS inputs (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT,
+                recipe_hash TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                processed_at REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+        self._entries = None
+
+    def entries(self) -> dict:
+        """Все записи манифеста одним запросом: путь -> кортеж полей"""
+        if self._entries is None:
+            cursor = self.connection.execute(
+                "SELECT path, size, mtime_ns, content_hash, recipe_hash, output_path FROM inputs")
+            self._entries = {row[0]: row[1:] for row in cursor}
+        return self._entries
+
+    def is_current(self, path: str, size: int, mtime_ns: int, recipe_hash: str) -> bool:
+        """Проверка, что вход уже обработан этим рецептом и с тех пор не менялся"""
+        entry = self.entries().get(path)
+        if entry is None:
+            return False
+        known_size, known_mtime, known_hash, known_recipe, output_path = entry
+        if known_recipe != recipe_hash or known_size != size:
+            return False
+        if not os.path.exists(output_path):
+            return False
+        if known_mtime == mtime_ns:
+            return True
+        # mtime изменился (например, после копирования) - сверяем содержимое
+        if self.use_hash and known_hash is not None and file_digest(path) == known_hash:
+            self.record(path, size, mtime_ns, recipe_hash, output_path, known_hash)
+            return True
+        return False
+
+    def record(self, path: str, size: int, mtime_ns: int, recipe_hash: str,
+               output_path: str, content_hash: str = None):
+        """Запись (или обновление) информации об обработанном входе"""
+        if content_hash is None and self.use_hash:
+            content_hash = file_digest(path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO inputs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, content_hash, recipe_hash, output_path, time.time()))
+        self.entries()[path] = (size, mtime_ns, content_hash, recipe_hash, output_path)
+
+    def collect_garbage(self, remove_outputs: bool = True) -> int:
+        """
+        Удаление записей (и результатов) для входов, которых больше нет на диске
+        Результат удаляется, только если на него не ссылается ни одна оставшаяся запись
+        """
+        removed = 0
+        orphaned = set()
+        for path, entry in list(self.entries().items()):
+            if os.path.exists(path):
+                continue
+            orphaned.add(entry[4])
+            self.connection.execute("DELETE FROM inputs WHERE path = ?", (path,))
+            del self._entries[path]
+            removed += 1
+        if remove_outputs:
+            referenced = {entry[4] for entry in self._entries.values()}
+            for output_path in orphaned - referenced:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+        self.commit()
+        return removed
+
+    def commit(self):
+        """Фиксация накопленных изменений"""
+        self.connection.commit()
+
+    def close(self):
+        """Закрытие базы манифеста"""
+        self.connection.commit()
+        self.connection.close()
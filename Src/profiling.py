@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Фазы, по которым раскладывается время
+PHASES = ('decode', 'filter', 'encode', 'log_io', 'copy', 'other', 'idle')
+
+# Модули, вся работа которых - обработка пикселей: модули Pillow и операции проекта
+_FILTER_MODULES = {'ImageFilter', 'ImageOps', 'ImageChops',
+                   'resize_engine', 'denoise', 'color', 'frame_stack', 'arrays'}
+
+# Функции потоков, ожидающих работу (пулы, очереди, события)
+_IDLE_FUNCTIONS = {'wait', 'get', '_worker', 'select', 'poll', 'sleep', 'acquire'}
+
+
+def _frame_label(frame) -> str:
+    """Подпись кадра стека в формате module:function"""
+    module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def classify_phase(stack: tuple) -> str:
+    """
+    Определение фазы по стеку (от корня к листу)
+    Решает ближайший к листу кадр, который относится к известной фазе
+    """
+    for label in reversed(stack):
+        module, _, function = label.partition(':')
+        if function == '_log_user_action' or module in ('__init__', 'handlers') and function in (
+                'emit', 'flush', 'handle', 'callHandlers'):
+            return 'log_io'
+        if module in ('ImageFile', 'JpegImagePlugin', 'PngImagePlugin', 'BmpImagePlugin') \
+                and function in ('load', 'load_prepare', 'load_end', 'draft', 'open', '_open'):
+            return 'decode'
+        if module == 'Image' and function == 'open':
+            return 'decode'
+        if (module == 'Image' and function == 'save') or function == '_save':
+            return 'encode'
+        if module == 'Image' and function == 'copy':
+            return 'copy'
+        if module in _FILTER_MODULES or (
+                module == 'Image' and function in ('filter', 'resize', 'reduce', 'convert',
+                                                   'point', 'merge', 'paste', 'crop')):
+            return 'filter'
+    if stack and stack[-1].partition(':')[2] in _IDLE_FUNCTIONS:
+        return 'idle'
+    return 'other'
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профилировщик: с заданным интервалом снимает стеки всех потоков
+    Результат - свёрнутые стеки (collapsed stacks) для flame graph
+    и разбивка по фазам decode / filter / encode / log_io / copy
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self.phases = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+
+    def start(self):
+        self._stop.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._start_time
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                phase = classify_phase(stack)
+                self.stacks[stack] += 1
+                self.phases[phase] += 1
+            self.samples += 1
+
+    def collapsed(self) -> list:
+        """Строки в формате 'кадр;кадр;кадр число' для flamegraph.pl / speedscope"""
+        return [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+
+    def phase_breakdown(self) -> dict:
+        """Доля и оценка времени каждой фазы (без ожидающих потоков)"""
+        busy = sum(count for phase, count in self.phases.items() if phase != 'idle')
+        breakdown = {}
+        for phase in PHASES:
+            count = self.phases.get(phase, 0)
+            share = count / busy if busy and phase != 'idle' else 0.0
+            breakdown[phase] = {
+                'samples': count,
+                'share': share,
+                'estimated_ms': share * self.elapsed * 1000,
+            }
+        return breakdown
+
+    def print_breakdown(self):
+        print("\n🔬 РАЗБИВКА ПО ФАЗАМ (сэмплирование):")
+        for phase, item in self.phase_breakdown().items():
+            if phase == 'idle':
+                continue
+            print(f"   {phase:8} {item['share'] * 100:6.1f} %  ~{item['estimated_ms']:9.1f} ms "
+                  f"({item['samples']} сэмплов)")
+
+
+@contextmanager
+def profile_to(path: str, interval: float = 0.001):
+    """
+    Профилирование блока кода: свёрнутые стеки пишутся в path,
+    разбивка по фазам - в path + '.phases.json' и на экран
+    """
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.write_collapsed(path)
+        with open(path + '.phases.json', 'w', encoding='utf-8') as f:
+            json.dump(profiler.phase_breakdown(), f, ensure_ascii=False, indent=2)
+        profiler.print_breakdown()
+        print(f"💾 Свёрнутые стеки сохранены в '{path}'")
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+
+# Операции ImageProcessor, которые можно использовать в рецепте
+SUPPORTED_OPERATIONS = ('remove_noise', 'convert_to_grayscale', 'resize_image')
+
+
+class Recipe:
+    """
+    Рецепт пакетной обработки - последовательность операций ImageProcessor
+    Формат JSON:
+    {"operations": [{"op": "remove_noise", "strength": 3},
+                    {"op": "resize_image", "width": 800, "height": 600, "mode": "fit"}],
+     "format": "jpg", "suffix": "_processed", "keep_extension": false}
+    keep_extension - оставлять расширение входа в имени результата (a.jpg -> a.jpg.png)
+    """
+
+    def __init__(self, operations: list, output_format: str = 'jpg', suffix: str = '',
+                 keep_extension: bool = False):
+        self.operations = []
+        for step in operations:
+            step = dict(step)
+            if step.get('op') not in SUPPORTED_OPERATIONS:
+                raise ValueError(f"Неподдерживаемая операция в рецепте: {step.get('op')}")
+            self.operations.append(step)
+        self.output_format = output_format.lower().lstrip('.')
+        self.suffix = suffix
+        self.keep_extension = keep_extension
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Recipe':
+        """Создание рецепта из словаря"""
+        return cls(data.get('operations', []), data.get('format', 'jpg'), data.get('suffix', ''),
+                   data.get('keep_extension', False))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Recipe':
+        """Загрузка рецепта из JSON-файла"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        """Преобразование рецепта в словарь"""
+        return {
+            'operations': self.operations,
+            'format': self.output_format,
+            'suffix': self.suffix,
+            'keep_extension': self.keep_extension
+        }
+
+    def digest(self) -> str:
+        """Хеш рецепта - меняется при любом изменении операций или параметров"""
+        canonical = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def output_path(self, input_path: str, output_dir: str, root: str = None,
+                    keep_extension: bool = None) -> str:
+        """
+        Путь результата для входного файла: a.jpg -> a.png, с keep_extension - a.jpg.png
+        (по умолчанию - как задано в рецепте). Путь относительно root (папки, переданной
+        на вход) повторяется в output_dir - одноимённые файлы из разных папок не совпадают
+        """
+        if keep_extension is None:
+            keep_extension = self.keep_extension
+        stem, extension = os.path.splitext(os.path.basename(input_path))
+        name = f"{stem}{self.suffix}{extension if keep_extension else ''}.{self.output_format}"
+        if root is not None:
+            relative = os.path.relpath(os.path.dirname(os.path.abspath(input_path)), os.path.abspath(root))
+            if relative != os.curdir:
+                return os.path.join(output_dir, relative, name)
+        return os.path.join(output_dir, name)
+
+    def apply(self, processor, input_path: str, output_path: str) -> bool:
+        """Выполнение рецепта: загрузка, операции по порядку, сохранение"""
+        if not processor.load_image(input_path):
+            return False
+        for step in self.operations:
+            params = {key: value for key, value in step.items() if key != 'op'}
+            if not getattr(processor, step['op'])(**params):
+                return False
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)   # подпапки входа повторяются в папке результатов
+        return processor.save_image(output_path)
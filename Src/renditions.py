@@ -0,0 +1,133 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import resize_engine
+
+FORMAT_MAP = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.bmp': 'BMP'
+}
+
+# Режимы, которые JPEG умеет сохранять без преобразования
+_JPEG_MODES = {'L', 'RGB', 'CMYK'}
+
+# Ранг уровня качества resize_engine: чем выше, тем точнее (best > high > ... > draft)
+QUALITY_RANK = {quality: rank for rank, quality in enumerate(reversed(list(resize_engine.QUALITY_PRESETS)))}
+
+
+def normalize_spec(spec) -> dict:
+    """
+    Приведение описания рендишна к словарю
+    Допускается кортеж (width, height[, format]) или словарь с ключами
+    width, height, format ('jpg', 'png', 'bmp'), mode, quality, name
+    """
+    if isinstance(spec, (tuple, list)):
+        spec = dict(zip(('width', 'height', 'format'), spec))
+    spec = dict(spec)
+    if spec.get('width', 0) <= 0 or spec.get('height', 0) <= 0:
+        raise ValueError(f"Некорректный размер рендишна: {spec}")
+    spec.setdefault('format', 'jpg')
+    spec['format'] = spec['format'].lower().lstrip('.')
+    if '.' + spec['format'] not in FORMAT_MAP:
+        raise ValueError(f"Неподдерживаемый формат рендишна: {spec['format']}")
+    spec.setdefault('mode', 'fit')
+    spec.setdefault('quality', 'high')
+    if spec['quality'] not in QUALITY_RANK:
+        raise ValueError(f"Неизвестный уровень качества рендишна: {spec['quality']}")
+    return spec
+
+
+def _is_full_frame(size: tuple, source_size: tuple) -> bool:
+    """Изображение покрывает весь кадр без искажения пропорций (с точностью до пикселя)"""
+    expected_height = size[0] * source_size[1] / source_size[0]
+    return abs(expected_height - size[1]) <= 1
+
+
+def build_renditions(image: Image.Image, specs: list) -> list:
+    """
+    Каскадное построение рендишнов: от крупных к мелким,
+    каждый строится из ближайшего большего уже готового результата
+    не худшего уровня качества (иначе потери промежуточного результата переходят в рендишн)
+    Возвращает список (spec, image, resize_ms, source_size) в исходном порядке specs
+    """
+    specs = [normalize_spec(spec) for spec in specs]
+    source_size = image.size
+    order = sorted(range(len(specs)), reverse=True,
+                   key=lambda i: (specs[i]['width'] * specs[i]['height'], QUALITY_RANK[specs[i]['quality']]))
+
+    # Источники для каскада: полнокадровые результаты без искажения пропорций и их уровень качества;
+    # исходное подходит для любого уровня
+    sources = [(image, max(QUALITY_RANK.values()))]
+    results = [None] * len(specs)
+    for index in order:
+        spec = specs[index]
+        target_size, _ = resize_engine.compute_geometry(
+            source_size, (spec['width'], spec['height']), spec['mode'])
+        rank = QUALITY_RANK[spec['quality']]
+        candidates = [src for src, src_rank in sources
+                      if src.width >= target_size[0] and src.height >= target_size[1] and src_rank >= rank]
+        source = min(candidates, key=lambda src: src.width * src.height) if candidates else image
+
+        start_time = time.perf_counter()
+        rendition = resize_engine.resize(source, spec['width'], spec['height'],
+                                         spec['mode'], spec['quality'])
+        resize_ms = (time.perf_counter() - start_time) * 1000
+
+        if _is_full_frame(rendition.size, source_size):
+            sources.append((rendition, rank))
+        results[index] = (spec, rendition, resize_ms, source.size)
+
+    return results
+
+
+def _encode(image: Image.Image, path: str, format_name: str) -> float:
+    """Сохранение одного рендишна, возвращает время кодирования в ms"""
+    start_time = time.perf_counter()
+    if format_name == 'JPEG' and image.mode not in _JPEG_MODES:
+        image = image.convert('RGB')
+    image.save(path, format=format_name)
+    return (time.perf_counter() - start_time) * 1000
+
+
+def generate_renditions(image: Image.Image, specs: list, output_dir: str = 'output',
+                        base_name: str = 'image', max_workers: int = None) -> list:
+    """
+    Построение и параллельное сохранение рендишнов одного изображения
+    Возвращает список словарей: path, width, height, format, source, resize_ms, encode_ms
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    built = build_renditions(image, specs)
+
+    # Имя по умолчанию - base_name_ШxВ; если так совпадают несколько рендишнов
+    # (тот же размер и формат при другом режиме или качестве), к имени добавляются режим и качество
+    names = [spec.get('name') or f"{base_name}_{rendition.width}x{rendition.height}"
+             for spec, rendition, _, _ in built]
+    paths = [f"{name}.{spec['format']}" for name, (spec, *_) in zip(names, built)]
+    jobs = []
+    for (spec, rendition, resize_ms, source_size), name, path in zip(built, names, paths):
+        if not spec.get('name') and paths.count(path) > 1:
+            name = f"{name}_{spec['mode']}_{spec['quality']}"
+        path = os.path.join(output_dir, f"{name}.{spec['format']}")
+        jobs.append((spec, rendition, resize_ms, source_size, path))
+
+    # Кодировщики Pillow отпускают GIL, поэтому потоков достаточно
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_encode, rendition, path, FORMAT_MAP['.' + spec['format']])
+                   for spec, rendition, _, _, path in jobs]
+        encode_times = [future.result() for future in futures]
+
+    results = []
+    for (spec, rendition, resize_ms, source_size, path), encode_ms in zip(jobs, encode_times):
+        results.append({
+            'path': path,
+            'width': rendition.width,
+            'height': rendition.height,
+            'format': FORMAT_MAP['.' + spec['format']],
+            'source': f"{source_size[0]}x{source_size[1]}",
+            'resize_ms': resize_ms,
+            'encode_ms': encode_ms
+        })
+    return results
@@ -0,0 +1,86 @@
+from PIL import Image
+
+# Уровни качества: фильтр финального прохода и reducing_gap для Image.resize.
+# Чем меньше запас, тем раньше Pillow включает целочисленное уменьшение reduce()
+# и тем короче (и дешевле) финальный проход.
+QUALITY_PRESETS = {
+    'best': (Image.Resampling.LANCZOS, None),      # один проход LANCZOS (прежнее поведение, по умолчанию)
+    'high': (Image.Resampling.LANCZOS, 3.0),
+    'balanced': (Image.Resampling.BICUBIC, 2.0),
+    'fast': (Image.Resampling.BILINEAR, 1.5),
+    'draft': (Image.Resampling.BOX, 1.0),
+}
+
+RESIZE_MODES = ('stretch', 'fit', 'fill')
+
+
+def compute_geometry(source_size: tuple, target_size: tuple, mode: str = 'stretch') -> tuple:
+    """
+    Расчёт итогового размера и области исходного изображения
+    mode: 'stretch' - ровно target_size без сохранения пропорций,
+          'fit' - вписать в target_size с сохранением пропорций,
+          'fill' - заполнить target_size целиком, лишнее обрезается по центру
+    Возвращает (итоговый размер, box в координатах исходного изображения)
+    """
+    if mode not in RESIZE_MODES:
+        raise ValueError(f"Неизвестный режим изменения размера: {mode}")
+
+    src_w, src_h = source_size
+    dst_w, dst_h = target_size
+    box = (0, 0, src_w, src_h)
+
+    if mode == 'fit':
+        scale = min(dst_w / src_w, dst_h / src_h)
+        size = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+        return size, box
+
+    if mode == 'fill':
+        scale = max(dst_w / src_w, dst_h / src_h)
+        crop_w = dst_w / scale
+        crop_h = dst_h / scale
+        left = (src_w - crop_w) / 2
+        top = (src_h - crop_h) / 2
+        box = (left, top, left + crop_w, top + crop_h)
+
+    return (dst_w, dst_h), box
+
+
+def choose_strategy(source_size: tuple, target_size: tuple, quality: str = 'best') -> dict:
+    """
+    Выбор стратегии по коэффициенту масштабирования
+    Возвращает фильтр финального прохода, reducing_gap для Image.resize и reduces -
+    уменьшит ли Pillow изображение reduce() перед финальным проходом (в gap раз по оси - хотя бы вдвое)
+    """
+    if quality not in QUALITY_PRESETS:
+        raise ValueError(f"Неизвестный уровень качества: {quality}")
+
+    resample, gap = QUALITY_PRESETS[quality]
+    reduces = gap is not None and (source_size[0] / target_size[0] >= 2 * gap
+                                   or source_size[1] / target_size[1] >= 2 * gap)
+    return {'resample': resample, 'reducing_gap': gap, 'reduces': reduces}
+
+
+def resize(image: Image.Image, width: int, height: int,
+           mode: str = 'stretch', quality: str = 'best', executor=None,
+           region: tuple = None) -> Image.Image:
+    """
+    Изменение размера с выбором стратегии: Image.resize с reducing_gap уровня качества
+    (reduce() Pillow + короткий проход фильтром)
+    executor: shared_images.ParallelExecutor - проход фильтром полосами в нескольких процессах;
+    когда Pillow сначала уменьшает изображение reduce(), проход и так короткий, и полосы
+    разошлись бы с целым изображением на границах блоков reduce - тогда в одном процессе
+    region: (left, top, right, bottom) - изменить размер только этой области (кадрирование
+    и изменение размера за один проход: фильтр читает пиксели области, а не всего изображения)
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError("Размеры должны быть положительными")
+
+    left, top, right, bottom = region or (0, 0) + image.size
+    size, box = compute_geometry((right - left, bottom - top), (width, height), mode)
+    box = (box[0] + left, box[1] + top, box[2] + left, box[3] + top)
+    box_size = (box[2] - box[0], box[3] - box[1])
+    strategy = choose_strategy(box_size, size, quality)
+
+    if executor is not None and executor.supports(image) and not strategy['reduces']:
+        return executor.resize(image, size, strategy['resample'], box)
+    return image.resize(size, strategy['resample'], box=box, reducing_gap=strategy['reducing_gap'])
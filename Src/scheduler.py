@@ -0,0 +1,240 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from cost_model import CostModel, default_model
+from instrumentation import Histogram
+from recipe import Recipe
+
+# Классы приоритета: меньше - важнее
+PRIORITY_CLASSES = {'interactive': 0, 'bulk': 1}
+POLICIES = ('priority', 'fifo')
+
+
+def image_header(path: str) -> tuple:
+    """Размер, режим и формат по заголовку файла (без декодирования)"""
+    from PIL import Image
+    with Image.open(path) as image:
+        return image.size, image.mode, image.format or path
+
+
+def estimate_steps_ms(model: CostModel, recipe: Recipe, size: tuple, mode: str = 'RGB',
+                      input_format: str = 'jpg') -> list:
+    """Оценка времени каждого шага рецепта (загрузка, операции, сохранение) в ms"""
+    estimate = model.estimate(size, recipe.operations, mode, input_format=input_format,
+                              output_format=recipe.output_format)
+    return [step['time_ms'] for step in estimate['steps']]
+
+
+class Job:
+    """Задача планировщика: рецепт для одного файла, выполняемый по шагам"""
+
+    def __init__(self, seq: int, recipe: Recipe, input_path: str, output_path: str,
+                 priority: str, deadline: float, step_costs: list):
+        self.seq = seq
+        self.recipe = recipe
+        self.input_path = input_path
+        self.output_path = output_path
+        self.priority = priority
+        self.rank = PRIORITY_CLASSES[priority]
+        self.deadline = deadline
+        self.step_costs = step_costs
+        self.submitted = time.perf_counter()
+        self.future = Future()
+        self.step = 0
+        self.processor = None
+        self.preemptions = 0
+
+    @property
+    def remaining_ms(self) -> float:
+        return sum(self.step_costs[self.step:])
+
+    def sort_key(self, policy: str) -> tuple:
+        if policy == 'fifo':
+            return (self.seq,)
+        # Внутри класса - сначала ближайший срок, при равных сроках - более короткая задача
+        return (self.rank, self.deadline, self.remaining_ms, self.seq)
+
+    def run_step(self) -> bool:
+        """Выполнение очередного шага на процессоре задачи"""
+        processor = self.processor
+        last = len(self.step_costs) - 1
+        if self.step == 0:
+            ok = processor.load_image(self.input_path)
+        elif self.step == last:
+            ok = processor.save_image(self.output_path)
+        else:
+            params = dict(self.recipe.operations[self.step - 1])
+            ok = getattr(processor, params.pop('op'))(**params)
+        self.step += 1
+        return ok
+
+
+class Scheduler:
+    """
+    Планировщик смешанной нагрузки вокруг ImageProcessor
+    Очередь упорядочена по классу приоритета, затем по сроку (EDF) и оценке стоимости.
+    Задачи выполняются по шагам рецепта; между шагами bulk-задача уступает поток
+    ожидающей interactive-задаче (вытеснение на границе операции) и возвращается
+    в очередь со своим процессором и промежуточным изображением
+    Стоимость шагов оценивается по cost_model (откалиброванные кривые, если они есть)
+    policy='fifo' - без приоритетов и вытеснения (для сравнения)
+    """
+
+    def __init__(self, workers: int = 2, policy: str = 'priority', memory_budget: int = None,
+                 default_deadline: dict = None, cost_model: CostModel = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика планирования: {policy}")
+        self.workers = workers
+        self.policy = policy
+        self.memory_budget = memory_budget
+        self.cost_model = cost_model or default_model()
+        # Срок по умолчанию (с от постановки) для каждого класса
+        self.default_deadline = default_deadline or {'interactive': 1.0, 'bulk': 300.0}
+        self.logger = logging.getLogger(__name__)
+        self._condition = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._idle_workers = 0
+        self._processors = []
+        self._shutdown = False
+        self._stats = {name: {'latency_ms': Histogram(), 'completed': 0, 'failed': 0,
+                              'deadline_missed': 0, 'preemptions': 0}
+                       for name in PRIORITY_CLASSES}
+        self._threads = [threading.Thread(target=self._worker, name=f'scheduler-{index}', daemon=True)
+                         for index in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, recipe: Recipe, input_path: str, output_path: str,
+               priority: str = 'bulk', deadline: float = None, size: tuple = None,
+               mode: str = 'RGB') -> Future:
+        """
+        Постановка задачи; deadline - секунды от текущего момента
+        size / mode - размер и режим входа, если известны (иначе читаются из заголовка файла)
+        Future возвращает словарь ok / latency_ms / deadline_met / preemptions;
+        future.cancel() снимает задачу, если она ещё не начата
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Неизвестный класс приоритета: {priority}")
+        input_format = input_path
+        if size is None:
+            try:
+                size, mode, input_format = image_header(input_path)
+            except Exception:
+                size = (0, 0)   # ошибка проявится при загрузке
+        step_costs = estimate_steps_ms(self.cost_model, recipe, size, mode, input_format)
+        if deadline is None:
+            deadline = self.default_deadline[priority]
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Планировщик остановлен")
+            seq = next(self._seq)
+            job = Job(seq, recipe, input_path, output_path, priority,
+                      time.perf_counter() + deadline, step_costs)
+            self._push(job)
+        return job.future
+
+    def _push(self, job: Job):
+        heapq.heappush(self._queue, (job.sort_key(self.policy), job))
+        self._condition.notify()
+
+    def _next_job(self):
+        with self._condition:
+            self._idle_workers += 1
+            while not self._queue and not self._shutdown:
+                self._condition.wait()
+            self._idle_workers -= 1
+            while self._queue:
+                job = heapq.heappop(self._queue)[1]
+                # Отменённые до начала выполнения задачи пропускаются
+                if job.step or job.future.set_running_or_notify_cancel():
+                    return job
+            return None
+
+    def _should_yield(self, job: Job) -> bool:
+        """Уступить ли поток: ждёт более важная задача, свободных потоков нет, и она короче остатка"""
+        if self.policy == 'fifo':
+            return False
+        with self._condition:
+            if not self._queue or self._idle_workers:
+                return False
+            waiting = self._queue[0][1]
+            return waiting.rank < job.rank and waiting.remaining_ms < job.remaining_ms
+
+    def _acquire_processor(self):
+        from image_processor import ImageProcessor
+        with self._condition:
+            if self._processors:
+                return self._processors.pop()
+        return ImageProcessor(memory_budget=self.memory_budget)
+
+    def _release_processor(self, processor):
+        processor.release()
+        with self._condition:
+            self._processors.append(processor)
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.processor is None:
+                job.processor = self._acquire_processor()
+            ok = True
+            try:
+                while job.step < len(job.step_costs):
+                    ok = job.run_step()
+                    if not ok:
+                        break
+                    if job.step < len(job.step_costs) and self._should_yield(job):
+                        job.preemptions += 1
+                        with self._condition:
+                            self._stats[job.priority]['preemptions'] += 1
+                            self._push(job)
+                        job = None
+                        break
+            except Exception as e:
+                self.logger.error(f"Ошибка задачи {job.input_path}: {str(e)}")
+                ok = False
+            if job is not None:
+                self._finish(job, ok)
+
+    def _finish(self, job: Job, ok: bool):
+        now = time.perf_counter()
+        latency_ms = (now - job.submitted) * 1000
+        deadline_met = now <= job.deadline
+        self._release_processor(job.processor)
+        job.processor = None
+        with self._condition:
+            stats = self._stats[job.priority]
+            stats['latency_ms'].add(latency_ms)
+            stats['completed' if ok else 'failed'] += 1
+            if not deadline_met:
+                stats['deadline_missed'] += 1
+        job.future.set_result({'ok': ok, 'latency_ms': latency_ms, 'deadline_met': deadline_met,
+                               'preemptions': job.preemptions, 'priority': job.priority})
+
+    def stats(self) -> dict:
+        """Статистика по классам: задержка (гистограмма), выполнено, ошибки, пропуски сроков, вытеснения"""
+        with self._condition:
+            return {name: {key: value.to_dict() if isinstance(value, Histogram) else value
+                           for key, value in entry.items()}
+                    for name, entry in self._stats.items()}
+
+    def shutdown(self, wait: bool = True):
+        """Остановка после выполнения уже поставленных задач"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
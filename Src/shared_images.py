@@ -0,0 +1,284 @@
+import inspect
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from PIL import Image
+
+# Режим изображения -> (raw-режим в разделяемой памяти, байт на пиксель)
+# Pillow отображает буфер без копирования только для этих raw-режимов
+SHARED_MODES = {'L': ('L', 1), 'RGB': ('RGBX', 4), 'RGBA': ('RGBA', 4)}
+
+# Ссылка на изображение в разделяемой памяти: передаётся в процесс вместо пикселей
+SharedImageRef = namedtuple('SharedImageRef', ['name', 'mode', 'size'])
+
+# Сколько подключённых сегментов держит рабочий процесс
+_MAX_ATTACHED = 8
+_attached = OrderedDict()
+
+# Python 3.13+: подключение к сегменту без регистрации в resource_tracker (SharedMemory(track=False))
+_TRACK_PARAMETER = 'track' in inspect.signature(shared_memory.SharedMemory).parameters
+# До 3.13 регистрация отключается подменой resource_tracker.register - подмена и создание
+# сегментов в этом модуле идут под одной блокировкой, чтобы не пропустить чужую регистрацию
+_tracker_lock = threading.Lock()
+
+
+def _segment_size(nbytes: int) -> int:
+    """Размер сегмента с округлением до степени двойки (не меньше 64 КБ) для повторного использования"""
+    return max(1 << 16, 1 << (max(1, nbytes) - 1).bit_length())
+
+
+class SharedBuffer:
+    """Сегмент разделяемой памяти со счётчиком ссылок; при обнулении возвращается в пул"""
+
+    def __init__(self, pool, shm):
+        self.pool = pool
+        self.shm = shm
+        self.refs = 1
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+    def retain(self):
+        with self.pool._lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        self.pool._release(self)
+
+
+class SharedImagePool:
+    """
+    Пул сегментов разделяемой памяти для передачи изображений между процессами
+    Освобождённые сегменты (refs == 0) переиспользуются для запросов того же размера;
+    max_cached_bytes ограничивает объём свободных сегментов, остальные удаляются
+    """
+
+    def __init__(self, max_cached_bytes: int = 512 * 2**20):
+        self.max_cached_bytes = max_cached_bytes
+        self.allocated = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._free = {}   # размер сегмента -> список свободных SharedBuffer
+        self._cached_bytes = 0
+        self._buffers = set()
+
+    def acquire(self, nbytes: int) -> SharedBuffer:
+        """Сегмент не меньше nbytes с одной ссылкой"""
+        size = _segment_size(nbytes)
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                buffer = free.pop()
+                buffer.refs = 1
+                self._cached_bytes -= size
+                self.reused += 1
+                return buffer
+            self.allocated += 1
+        with _tracker_lock:
+            segment = shared_memory.SharedMemory(create=True, size=size)
+        buffer = SharedBuffer(self, segment)
+        with self._lock:
+            self._buffers.add(buffer)
+        return buffer
+
+    def _release(self, buffer: SharedBuffer):
+        with self._lock:
+            buffer.refs -= 1
+            if buffer.refs > 0:
+                return
+            if self._cached_bytes + buffer.size <= self.max_cached_bytes:
+                self._free.setdefault(buffer.size, []).append(buffer)
+                self._cached_bytes += buffer.size
+                return
+            self._buffers.discard(buffer)
+        _destroy(buffer.shm)
+
+    def close(self):
+        """Удаление всех сегментов пула"""
+        with self._lock:
+            buffers, self._buffers = self._buffers, set()
+            self._free = {}
+            self._cached_bytes = 0
+        for buffer in buffers:
+            _destroy(buffer.shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _destroy(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass   # буфер ещё отображён изображением; память освободится вместе с ним
+    shm.unlink()
+
+
+def map_image(buf, ref: SharedImageRef, writable: bool = False) -> Image.Image:
+    """
+    Изображение поверх буфера разделяемой памяти без копирования
+    RGB хранится как RGBX (так же, как внутри Pillow); writable=True разрешает запись на месте
+    """
+    rawmode, _ = SHARED_MODES[ref.mode]
+    image = Image.frombuffer(rawmode, ref.size, buf, 'raw', rawmode, 0, 1)
+    if writable:
+        image.readonly = 0
+    return image
+
+
+def export_image(image: Image.Image, pool: SharedImagePool) -> tuple:
+    """Копирование пикселей в сегмент пула; возвращает (SharedBuffer, SharedImageRef)"""
+    _, pixel_bytes = SHARED_MODES[image.mode]
+    buffer = pool.acquire(image.width * image.height * pixel_bytes)
+    ref = SharedImageRef(buffer.name, image.mode, image.size)
+    target = map_image(buffer.shm.buf, ref, writable=True)
+    target.paste(image)
+    del target
+    return buffer, ref
+
+
+def import_image(buffer: SharedBuffer, ref: SharedImageRef) -> Image.Image:
+    """Собственная копия изображения из сегмента (сегмент после этого можно освободить)"""
+    mapped = map_image(buffer.shm.buf, ref)
+    image = mapped.convert(ref.mode) if mapped.mode != ref.mode else mapped.copy()
+    del mapped
+    return image
+
+
+def _open_untracked(name: str):
+    """
+    Подключение к чужому сегменту без регистрации в resource_tracker:
+    удалением сегмента управляет создавший его процесс (SharedImagePool)
+    """
+    if _TRACK_PARAMETER:
+        return shared_memory.SharedMemory(name=name, track=False)
+    # До 3.13 подключение тоже регистрируется, и трекер рабочего процесса
+    # удалил бы сегмент при своём завершении
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _attach(name: str):
+    """Подключение к сегменту в рабочем процессе (с кэшем: пул переиспользует сегменты)"""
+    shm = _attached.get(name)
+    if shm is not None:
+        _attached.move_to_end(name)
+        return shm
+    shm = _open_untracked(name)
+    _attached[name] = shm
+    while len(_attached) > _MAX_ATTACHED:
+        _, old = _attached.popitem(last=False)
+        try:
+            old.close()
+        except BufferError:
+            pass
+    return shm
+
+
+def _median_stripe(src: SharedImageRef, dst: SharedImageRef, top: int, bottom: int, size: int):
+    """Медианный фильтр полосы [top, bottom) с запасом строк сверху и снизу"""
+    from PIL import ImageFilter
+    halo = size // 2
+    source = map_image(_attach(src.name).buf, src)
+    start = max(0, top - halo)
+    stripe = source.crop((0, start, source.width, min(source.height, bottom + halo)))
+    filtered = stripe.filter(ImageFilter.MedianFilter(size))
+    target = map_image(_attach(dst.name).buf, dst, writable=True)
+    target.paste(filtered.crop((0, top - start, filtered.width, bottom - start)), (0, top))
+
+
+def _resize_stripe(src: SharedImageRef, dst: SharedImageRef, top: int, bottom: int,
+                   box: tuple, resample: int):
+    """
+    Строки [top, bottom) результата resize: полоса той же области box, что и у целого
+    изображения, поэтому фильтр берёт те же исходные строки, что и однопроцессный resize
+    """
+    source = map_image(_attach(src.name).buf, src)
+    left, upper, right, lower = box
+    scale = (lower - upper) / dst.size[1]
+    stripe_box = (left, upper + top * scale, right, upper + bottom * scale)
+    resized = source.resize((dst.size[0], bottom - top), resample, box=stripe_box)
+    target = map_image(_attach(dst.name).buf, dst, writable=True)
+    target.paste(resized, (0, top))
+
+
+class ParallelExecutor:
+    """
+    Параллельные remove_noise / resize по горизонтальным полосам в пуле процессов
+    Изображения передаются через разделяемую память (SharedImagePool), в процессы
+    уходят только ссылки SharedImageRef, а не пиксели
+    min_pixels: меньшие изображения выгоднее обрабатывать в одном процессе
+    """
+
+    def __init__(self, workers: int = None, min_pixels: int = 1_000_000,
+                 pool: SharedImagePool = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_pixels = min_pixels
+        self.pool = pool or SharedImagePool()
+        self._owns_pool = pool is None
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def supports(self, image: Image.Image) -> bool:
+        """Выгодна ли параллельная обработка этого изображения"""
+        return (image.mode in SHARED_MODES and image.width * image.height >= self.min_pixels
+                and image.height >= 2 * self.workers)
+
+    def _stripes(self, height: int) -> list:
+        count = max(1, min(self.workers * 2, height // 16))
+        bounds = [height * index // count for index in range(count + 1)]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _run(self, image: Image.Image, output_size: tuple, task, *args) -> Image.Image:
+        src_buffer, src = export_image(image, self.pool)
+        _, pixel_bytes = SHARED_MODES[image.mode]
+        dst_buffer = self.pool.acquire(output_size[0] * output_size[1] * pixel_bytes)
+        dst = SharedImageRef(dst_buffer.name, image.mode, output_size)
+        try:
+            futures = [self._executor.submit(task, src, dst, top, bottom, *args)
+                       for top, bottom in self._stripes(output_size[1])]
+            for future in futures:
+                future.result()
+            return import_image(dst_buffer, dst)
+        finally:
+            src_buffer.release()
+            dst_buffer.release()
+
+    def median_filter(self, image: Image.Image, size: int) -> Image.Image:
+        """Медианный фильтр size x size, результат совпадает с image.filter(MedianFilter(size))"""
+        return self._run(image, image.size, _median_stripe, size)
+
+    def resize(self, image: Image.Image, size: tuple, resample: int, box: tuple = None) -> Image.Image:
+        """
+        Изменение размера как image.resize(size, resample, box=box)
+        Результат совпадает с точностью до округления (не более 1 на канал):
+        центры фильтра в полосах считаются от своего начала
+        """
+        box = box or (0, 0, image.width, image.height)
+        return self._run(image, size, _resize_stripe, tuple(box), resample)
+
+    def close(self):
+        self._executor.shutdown()
+        if self._owns_pool:
+            self.pool.close()
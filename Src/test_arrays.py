@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+from PIL import Image
+import arrays
+from image_processor import ImageProcessor
+
+
+@unittest.skipIf(arrays.np is None, "нужен numpy")
+class TestArrays(unittest.TestCase):
+    """Тесты обмена изображениями с numpy без копирования"""
+
+    def setUp(self):
+        self.np = arrays.np
+        self.pixels = self.np.random.default_rng(0).integers(0, 256, (6, 8, 3), dtype=self.np.uint8)
+
+    def test_round_trip_shares_memory(self):
+        image = arrays.from_array(self.pixels)
+        self.assertEqual((image.mode, image.size), ('RGB', (8, 6)))
+        self.assertTrue(self.np.array_equal(self.np.asarray(image), self.pixels))
+        view = arrays.to_array(image)
+        self.assertEqual(view.shape, (6, 8, 3))
+        # Срез [..., :3] буфера (h, w, 4) снова отображается без копирования
+        again = arrays.from_array(view)
+        self.assertTrue(self.np.shares_memory(arrays.to_array(again), view))
+        view[0, 0] = (1, 2, 3)
+        self.assertEqual(again.getpixel((0, 0)), (1, 2, 3))
+
+    def test_layouts(self):
+        gray = self.np.zeros((4, 5), dtype=self.np.uint8)
+        image = arrays.from_array(gray)
+        self.assertIs(arrays.to_array(image), gray)
+        gray[1, 2] = 77
+        self.assertEqual(image.getpixel((2, 1)), 77)
+        rgba = self.np.zeros((4, 5, 4), dtype=self.np.uint8)
+        self.assertIs(arrays.to_array(arrays.from_array(rgba)), rgba)
+        # Копия: массив и изображение независимы
+        copied = arrays.from_array(gray, copy=True)
+        gray[0, 0] = 5
+        self.assertEqual(copied.getpixel((0, 0)), 0)
+        self.assertEqual(arrays.from_array(self.np.ones((3, 3), dtype=self.np.float32)).mode, 'F')
+        self.assertEqual(arrays.to_array(Image.new('P', (3, 2))).shape, (2, 3))
+
+    def test_non_uint8_channels(self):
+        # float - диапазон 0..1, uint16 - 0..65535; результат - uint8 RGB/RGBA
+        floats = self.pixels.astype(self.np.float32) / 255
+        image = arrays.from_array(floats)
+        self.assertEqual(image.mode, 'RGB')
+        self.assertTrue(self.np.array_equal(self.np.asarray(image), self.pixels))
+        self.assertEqual(arrays.from_array(self.np.full((2, 2, 4), 1.5, dtype=self.np.float32))
+                         .getpixel((0, 0)), (255, 255, 255, 255))
+        wide = self.pixels.astype(self.np.uint16) * 257
+        image = arrays.from_array(wide)
+        self.assertTrue(self.np.array_equal(self.np.asarray(image), self.pixels))
+        processor = ImageProcessor()
+        self.assertTrue(processor.load_from_array(floats))
+        self.assertEqual(processor.current_image.mode, 'RGB')
+        with self.assertRaises(ValueError):
+            arrays.from_array(self.np.zeros((2, 2, 3), dtype=self.np.complex64))
+        self.assertFalse(processor.load_from_array(self.np.zeros((2, 2, 3), dtype=self.np.complex64)))
+
+    def test_pillow_does_not_write_into_array(self):
+        image = arrays.from_array(self.pixels)
+        image.paste((0, 0, 0), (0, 0, 8, 6))
+        self.assertIsNone(arrays.shared_array(image))
+        self.assertTrue(self.pixels.any())
+
+    def test_rgb_fallback_copies(self):
+        # Без внутреннего отображения RGB Pillow пиксели копируются, остальное работает как прежде
+        with mock.patch.object(arrays, '_RGB_MAPPING', False):
+            self.assertFalse(arrays.can_share('RGB'))
+            image = arrays.from_array(self.pixels)
+            self.assertIsNone(arrays.shared_array(image))
+            self.assertTrue(self.np.array_equal(arrays.to_array(image), self.pixels))
+            with self.assertRaises(ValueError):
+                arrays.share(image)
+            processor = ImageProcessor()
+            self.assertTrue(processor.load_from_array(self.pixels))
+            self.assertTrue(self.np.array_equal(processor.to_array(), self.pixels))
+            self.assertIsNotNone(arrays.shared_array(arrays.share(image.convert('RGBA'))))
+
+    def test_processor(self):
+        processor = ImageProcessor()
+        buffer = self.np.full((6, 8, 4), 255, dtype=self.np.uint8)
+        buffer[..., :3] = self.pixels
+        source = buffer[..., :3]
+        self.assertTrue(processor.load_from_array(source))
+        view = processor.to_array()
+        self.assertTrue(self.np.shares_memory(view, source))
+        self.assertFalse(view.flags.writeable)
+        # Запись: текущее изображение делит объект с исходным - сначала копия
+        writable = processor.to_array(writable=True)
+        writable[...] = 0
+        self.assertEqual(processor.current_image.getpixel((0, 0)), (0, 0, 0))
+        self.assertTrue(self.np.array_equal(source, self.pixels))
+        self.assertTrue(processor.reset_to_original())
+        self.assertTrue(self.np.array_equal(processor.to_array(), self.pixels))
+
+        result = processor.process_array(self.pixels, [{"op": "convert_to_grayscale", "output_mode": "L"},
+                                                       {"op": "resize_image", "width": 4, "height": 3}])
+        self.assertEqual(result.shape, (3, 4))
+        self.assertIs(processor.to_array().base, result.base)
+        self.assertIsNone(processor.process_array(self.pixels, [{"op": "save_image", "output_path": "x.png"}]))
+
+    def test_failed_load_keeps_original(self):
+        processor = ImageProcessor(memory_budget=90000)
+        self.assertTrue(processor.load_from_array(self.pixels, copy=True))
+        original = processor.original_image
+        # Неподдерживаемый массив и массив сверх бюджета: исходное остаётся прежним
+        self.assertFalse(processor.load_from_array(self.np.zeros((6, 8, 5), dtype=self.np.uint8)))
+        self.assertFalse(processor.load_from_array(self.np.zeros((200, 200, 3), dtype=self.np.uint8)))
+        self.assertIs(processor.original_image, original)
+        self.assertTrue(processor.reset_to_original())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from PIL import Image
+import logging_config
+from batch import BatchRunner
+from image_processor import cli
+from recipe import Recipe
+
+
+class TestIncrementalBatch(unittest.TestCase):
+    """Тесты инкрементальной пакетной обработки"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, 'input')
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        os.makedirs(self.input_dir)
+        for name in ('a.jpg', 'b.jpg', 'c.png'):
+            Image.new('RGB', (40, 30), color='red').save(os.path.join(self.input_dir, name))
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def run_batch(self, recipe, collect_garbage=False):
+        runner = BatchRunner(recipe, self.output_dir, jobs=2)
+        try:
+            return runner.run([self.input_dir], collect_garbage=collect_garbage)
+        finally:
+            runner.close()
+    
+    def test_rerun_skips_unchanged_inputs(self):
+        recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        first = self.run_batch(recipe)
+        self.assertEqual((first['processed'], first['skipped']), (3, 0))
+        
+        second = self.run_batch(recipe)
+        self.assertEqual((second['processed'], second['skipped']), (0, 3))
+        
+        Image.new('RGB', (50, 30), color='blue').save(os.path.join(self.input_dir, 'a.jpg'))
+        third = self.run_batch(recipe)
+        self.assertEqual((third['processed'], third['skipped']), (1, 2))
+    
+    def test_recipe_change_and_garbage_collection(self):
+        self.run_batch(Recipe([{"op": "convert_to_grayscale"}], 'png'))
+        changed = Recipe([{"op": "remove_noise", "strength": 3}], 'png')
+        self.assertEqual(self.run_batch(changed)['processed'], 3)
+        
+        os.remove(os.path.join(self.input_dir, 'b.jpg'))
+        summary = self.run_batch(changed, collect_garbage=True)
+        self.assertEqual(summary['removed'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'b.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'a.png')))
+    
+    def test_manifest_committed_during_run(self):
+        recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        runner = BatchRunner(recipe, self.output_dir, jobs=1, commit_every=1)
+        seen = []
+        
+        def progress(done, total, path, ok):
+            # Другое подключение видит только зафиксированные записи
+            with sqlite3.connect(runner.manifest.path) as connection:
+                seen.append(connection.execute("SELECT COUNT(*) FROM inputs").fetchone()[0])
+        
+        try:
+            runner.run([self.input_dir], progress=progress)
+        finally:
+            runner.close()
+        self.assertEqual(seen, [0, 1, 2])
+    
+    def test_same_names_do_not_collide(self):
+        # a.jpg рядом с a.png и a.jpg в подпапке - три разных результата:
+        # расширение остаётся в имени только у совпавших
+        subdir = os.path.join(self.input_dir, 'sub')
+        os.makedirs(subdir)
+        Image.new('RGB', (40, 30), color='green').save(os.path.join(self.input_dir, 'a.png'))
+        Image.new('RGB', (40, 30), color='blue').save(os.path.join(subdir, 'a.jpg'))
+        recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        self.assertEqual(self.run_batch(recipe)['processed'], 5)
+        for name in ('a.jpg.png', 'a.png.png', 'b.png', os.path.join('sub', 'a.png')):
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, name)), name)
+    
+    def test_keep_extension_option(self):
+        recipe = Recipe.from_dict({"operations": [], "format": "png", "keep_extension": True})
+        self.assertEqual(recipe.output_path('in/a.jpg', 'out'), os.path.join('out', 'a.jpg.png'))
+        self.assertEqual(Recipe([], 'png').output_path('in/a.jpg', 'out'), os.path.join('out', 'a.png'))
+        self.assertNotEqual(recipe.digest(), Recipe([], 'png').digest())
+    
+    def test_output_inside_input_is_not_ingested(self):
+        # Результаты внутри входной папки и исключённые папки на следующем запуске не читаются
+        self.output_dir = os.path.join(self.input_dir, 'output')
+        failed_dir = os.path.join(self.input_dir, 'failed')
+        os.makedirs(failed_dir)
+        Image.new('RGB', (40, 30), color='red').save(os.path.join(failed_dir, 'd.jpg'))
+        recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        runner = BatchRunner(recipe, self.output_dir, jobs=2)
+        try:
+            first = runner.run([self.input_dir], exclude=[failed_dir])
+            second = runner.run([self.input_dir], exclude=[failed_dir])
+        finally:
+            runner.close()
+        self.assertEqual((first['total'], first['processed']), (3, 3))
+        self.assertEqual((second['total'], second['skipped']), (3, 3))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'output')))
+    
+    def test_garbage_collection_keeps_shared_output(self):
+        recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        self.run_batch(recipe)
+        runner = BatchRunner(recipe, self.output_dir)
+        try:
+            # Старая запись, чей результат теперь принадлежит другому входу
+            shared = runner.manifest.entries()[os.path.join(self.input_dir, 'a.jpg')][4]
+            runner.manifest.record(os.path.join(self.input_dir, 'gone.jpg'), 1, 1, 'old', shared)
+            self.assertEqual(runner.manifest.collect_garbage(), 1)
+        finally:
+            runner.close()
+        self.assertTrue(os.path.exists(shared))
+
+    
+    def write_recipe(self):
+        path = os.path.join(self.temp_dir.name, 'recipe.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"operations": [{"op": "convert_to_grayscale"}], "format": "png"}, f)
+        return path
+    
+    def test_cli_runs_headless(self):
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run(
+            [sys.executable, '-m', 'image_processor', 'run', '--recipe', self.write_recipe(), '--inputs', self.input_dir,
+             '--output', self.output_dir, '--jobs', '2'],
+            cwd=src_dir, capture_output=True, text=True)
+        self.assertEqual(result.returncode, cli.EXIT_OK, result.stderr)
+        self.assertEqual(json.loads(result.stdout)['processed'], 3)
+        self.assertIn("[3/3]", result.stderr)
+    
+    def run_cli(self, *argv):
+        stdout = io.StringIO()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+                code = cli.main(list(argv))
+        finally:
+            logging_config.shutdown_logging()
+        return code, stdout.getvalue()
+    
+    def test_cli_exit_codes(self):
+        with open(os.path.join(self.input_dir, 'broken.jpg'), 'wb') as f:
+            f.write(b'not an image')
+        code, output = self.run_cli('run', self.input_dir, '--recipe', self.write_recipe(),
+                                    '--output', self.output_dir, '--no-progress')
+        self.assertEqual(code, cli.EXIT_FAILURES)
+        self.assertEqual(json.loads(output)['failed'], 1)
+        
+        missing = os.path.join(self.temp_dir.name, 'missing.json')
+        code, _ = self.run_cli('run', self.input_dir, '--recipe', missing, '--output', self.output_dir)
+        self.assertEqual(code, cli.EXIT_USAGE)
+        self.assertNotIn('tkinter', sys.modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
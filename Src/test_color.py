@@ -0,0 +1,80 @@
+import unittest
+from PIL import Image, ImageOps
+import color
+
+
+class TestColor(unittest.TestCase):
+    """Тесты перевода в оттенки серого"""
+
+    def setUp(self):
+        self.image = Image.merge('RGB', (Image.linear_gradient('L'),
+                                         Image.linear_gradient('L').rotate(90),
+                                         Image.new('L', (256, 256), 200)))
+
+    def assertClose(self, first, second, tolerance=1):
+        self.assertEqual(first.size, second.size)
+        difference = max(abs(a - b) for a, b in zip(first.tobytes(), second.tobytes()))
+        self.assertLessEqual(difference, tolerance)
+
+    def test_bt601_matches_previous_path(self):
+        expected = ImageOps.grayscale(self.image).convert('RGB')
+        result = color.grayscale(self.image)
+        self.assertEqual(result.mode, 'RGB')
+        self.assertEqual(result.tobytes(), expected.tobytes())
+
+    def test_weights(self):
+        pixel = Image.new('RGB', (1, 1), (200, 100, 50))
+        self.assertEqual(color.to_luma(pixel, 'bt601').getpixel((0, 0)), 124)
+        self.assertEqual(color.to_luma(pixel, 'bt709').getpixel((0, 0)), 118)
+        self.assertEqual(color.to_luma(pixel, 'average').getpixel((0, 0)), 117)
+        self.assertEqual(color.to_luma(pixel, 'lightness').getpixel((0, 0)), 125)
+        # Половина округляется вверх во всех путях: изображение, палитра, массив
+        odd = Image.new('RGB', (1, 1), (10, 11, 0))
+        self.assertEqual(color.to_luma(odd, 'lightness').getpixel((0, 0)), 6)
+        self.assertEqual(color.to_luma(odd.quantize(2), 'lightness').getpixel((0, 0)), 6)
+        with self.assertRaises(ValueError):
+            color.to_luma(pixel, 'bt2020')
+
+    def test_other_modes(self):
+        for method in color.GRAYSCALE_METHODS:
+            expected = color.to_luma(self.image, method)
+            with self.subTest(method=method):
+                self.assertClose(color.to_luma(self.image.convert('RGBA'), method), expected)
+                self.assertClose(color.to_luma(self.image.convert('CMYK'), method), expected)
+        # Палитра: яркость каждого цвета палитры
+        palette = self.image.quantize(64)
+        self.assertClose(color.to_luma(palette, 'bt709'), color.to_luma(palette.convert('RGB'), 'bt709'))
+        self.assertEqual(color.grayscale(self.image.convert('L'), output_mode='L').mode, 'L')
+
+    def test_grayscale_like_keeps_alpha(self):
+        alpha = Image.linear_gradient('L').rotate(45)
+        luminance = self.image.convert('L')
+        result = color.grayscale_like(Image.merge('LA', (luminance, alpha)))
+        self.assertEqual(result.mode, 'LA')
+        self.assertEqual(result.getchannel('A').tobytes(), alpha.tobytes())
+        self.assertEqual(result.getchannel('L').tobytes(), luminance.tobytes())
+        # Индексы новой палитры не подходят к палитре изображения - область на 'P' отклоняется
+        with self.assertRaises(ValueError):
+            color.grayscale_like(self.image.quantize(64))
+
+    @unittest.skipIf(color.np is None, "нужен numpy")
+    def test_arrays_in_place(self):
+        np = color.np
+        frames = np.stack([np.asarray(self.image.convert('RGBA'))] * 2)
+        for method in color.GRAYSCALE_METHODS:
+            with self.subTest(method=method):
+                luma = color.luma_array(frames, method)
+                self.assertEqual(luma.shape, (2, 256, 256))
+                expected = np.asarray(color.to_luma(self.image, method)).astype(int)
+                # Матричный convert Pillow и фиксированная точка расходятся не больше чем на 1;
+                # lightness считается одинаково - совпадение точное
+                tolerance = 0 if method == 'lightness' else 1
+                self.assertLessEqual(np.abs(luma[1].astype(int) - expected).max(), tolerance)
+        buffer = frames.copy()
+        self.assertIs(color.grayscale_array(buffer, 'bt709'), buffer)
+        self.assertTrue((buffer[..., 0] == buffer[..., 2]).all())
+        self.assertTrue((buffer[..., 3] == 255).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
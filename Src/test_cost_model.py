@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from PIL import Image
+import denoise
+from cost_model import DEFAULT_CURVES, CostModel, calibrate, fit_curve, operation_key
+from image_processor import ImageProcessor
+
+
+class TestCostModel(unittest.TestCase):
+    """Тесты модели стоимости операций"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_fit_curve(self):
+        intercept, slope = fit_curve([(1.0, 12.0), (2.0, 22.0), (4.0, 42.0)])
+        self.assertAlmostEqual(intercept, 2.0)
+        self.assertAlmostEqual(slope, 10.0)
+        # Отрицательная постоянная часть не допускается
+        intercept, slope = fit_curve([(1.0, 1.0), (2.0, 10.0)])
+        self.assertEqual(intercept, 0.0)
+        self.assertGreater(slope, 0.0)
+
+    def test_estimate_chain(self):
+        model = CostModel({'remove_noise:7|RGB': (1.0, 100.0)})
+        operations = [{"op": "remove_noise", "strength": 7},
+                      {"op": "resize_image", "width": 500, "height": 500, "mode": "fit"},
+                      {"op": "convert_to_grayscale", "output_mode": "L"}]
+        estimate = model.estimate((1000, 500), operations, 'RGB')
+
+        self.assertEqual(estimate['size'], (500, 250))
+        self.assertEqual(estimate['mode'], 'L')
+        noise, resize, gray = estimate['steps']
+        self.assertAlmostEqual(noise['time_ms'], 1.0 + 100.0 * 1.0)
+        intercept, slope = DEFAULT_CURVES['resize_image:best']
+        self.assertAlmostEqual(resize['time_ms'], intercept + slope * 0.625)
+        self.assertAlmostEqual(estimate['time_ms'], noise['time_ms'] + resize['time_ms'] + gray['time_ms'])
+        # Пик: исходное + снимок (вход шага) + результат на шаге resize
+        self.assertEqual(estimate['peak_bytes'], 2_000_000 + 2_000_000 + 500_000)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.temp_dir.name, 'config', 'cost_model.json')
+        self.assertFalse(CostModel.load(path).calibrated)
+        CostModel({'convert_to_grayscale|RGB': (0.5, 3.0)}, {'pillow': 'x'}).save(path)
+        model = CostModel.load(path)
+        self.assertEqual(model.curve('convert_to_grayscale', 'RGB'), (0.5, 3.0))
+        self.assertEqual(model.curve('convert_to_grayscale', 'L'), DEFAULT_CURVES['convert_to_grayscale'])
+
+    def test_calibrate(self):
+        model = calibrate(sizes=((32, 24), (64, 48)), repeats=1, modes=('L',), formats=('png',),
+                          workdir=self.temp_dir.name)
+        for key in ('remove_noise:7|L', 'resize_image:draft|L', 'save_image:png|L', 'load_image:png|L'):
+            self.assertIn(key, model.curves)
+        # Каждая сила каждого метода попадает на откалиброванную кривую (окно 1 - пустая операция)
+        for method in denoise.available_methods():
+            for mode in ('uniform', 'adaptive') if method == 'median' else ('uniform',):
+                for strength in range(2, 8):
+                    key = operation_key({'op': 'remove_noise', 'method': method, 'mode': mode,
+                                         'strength': strength})
+                    self.assertIn(f"{key}|L", model.curves)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_processor_estimate(self):
+        processor = ImageProcessor()
+        self.assertEqual(processor.estimate_cost([{"op": "convert_to_grayscale"}]), {})
+        processor.current_image = Image.new('RGB', (200, 100))
+        estimate = processor.estimate_cost([{"op": "remove_noise", "strength": 7}], output_format='png')
+        self.assertEqual(estimate['size'], (200, 100))
+        self.assertEqual([step['op'] for step in estimate['steps']], ['remove_noise', 'save_image'])
+        self.assertGreater(estimate['time_ms'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import random
+import unittest
+from PIL import Image, ImageChops, ImageFilter
+import denoise
+
+
+def with_impulses(image: Image.Image, count: int, seed: int = 0) -> Image.Image:
+    """Копия изображения с импульсным шумом (соль и перец) в count случайных пикселях"""
+    rng = random.Random(seed)
+    noisy = image.copy()
+    for _ in range(count):
+        value = 255 if rng.random() < 0.5 else 0
+        position = (rng.randrange(image.width), rng.randrange(image.height))
+        noisy.putpixel(position, (value,) * len(image.getbands()) if image.mode != 'L' else value)
+    return noisy
+
+
+class TestAdaptiveMedian(unittest.TestCase):
+    """Тесты адаптивного шумоподавления"""
+
+    def setUp(self):
+        # Плавный градиент с резким краем: край не должен считаться шумом
+        self.clean = Image.linear_gradient('L').resize((192, 128)).convert('RGB')
+        self.clean.paste((200, 30, 30), (96, 0, 192, 128))
+        self.noisy = with_impulses(self.clean, 60)
+
+    def test_impulse_mask_ignores_edges(self):
+        self.assertIsNone(denoise.impulse_mask(self.clean).getbbox())
+        mask = denoise.impulse_mask(self.noisy)
+        flagged = mask.histogram()[255]
+        self.assertGreater(flagged, 40)
+        self.assertLessEqual(flagged, 60)
+
+    def test_only_flagged_pixels_change(self):
+        result, fraction = denoise.adaptive_median(self.noisy, 3)
+        self.assertAlmostEqual(fraction, denoise.impulse_mask(self.noisy).histogram()[255] / (192 * 128))
+        changed = ImageChops.difference(result, self.noisy).convert('L').point(lambda v: 255 if v else 0)
+        self.assertLessEqual(changed.histogram()[255], 60)
+        # Точнее полного медианного фильтра: чистые участки и края не размываются
+        error = ImageChops.difference(result, self.clean).convert('L').histogram()
+        full_error = ImageChops.difference(self.noisy.filter(ImageFilter.MedianFilter(3)),
+                                           self.clean).convert('L').histogram()
+        self.assertLess(sum(error[1:]), sum(full_error[1:]))
+
+    def test_paths_agree(self):
+        expected, _ = denoise.adaptive_median(self.noisy, 3)
+        saved = denoise.np, denoise._PIXELWISE_FRACTION
+        try:
+            denoise.np = None
+            pixelwise, _ = denoise.adaptive_median(self.noisy, 3)
+            denoise._PIXELWISE_FRACTION = 0
+            tiled, _ = denoise.adaptive_median(self.noisy, 3)
+        finally:
+            denoise.np, denoise._PIXELWISE_FRACTION = saved
+        self.assertIsNone(ImageChops.difference(pixelwise, tiled).getbbox())
+        if denoise.np is not None:
+            self.assertIsNone(ImageChops.difference(expected, pixelwise).getbbox())
+
+    @unittest.skipIf(denoise.np is None, "нужен numpy")
+    def test_numpy_path_in_chunks(self):
+        expected, _ = denoise.adaptive_median(self.noisy, 5)
+        saved = denoise._NUMPY_WINDOW_BYTES
+        try:
+            denoise._NUMPY_WINDOW_BYTES = 25 * 3 * 7   # по 7 пикселей за порцию
+            chunked, _ = denoise.adaptive_median(self.noisy, 5)
+        finally:
+            denoise._NUMPY_WINDOW_BYTES = saved
+        self.assertIsNone(ImageChops.difference(expected, chunked).getbbox())
+
+    def test_dense_noise_uses_full_pass(self):
+        noisy = Image.frombytes('RGB', (64, 48), random.Random(1).randbytes(64 * 48 * 3))
+        mask = denoise.impulse_mask(noisy)
+        result, fraction = denoise.adaptive_median(noisy, 3)
+        self.assertGreater(fraction, denoise._FULL_PASS_FRACTION)
+        expected = noisy.copy()
+        expected.paste(noisy.filter(ImageFilter.MedianFilter(3)), (0, 0), mask)
+        self.assertIsNone(ImageChops.difference(result, expected).getbbox())
+
+    def test_grayscale_and_clean_input(self):
+        gray = self.noisy.convert('L')
+        result, fraction = denoise.adaptive_median(gray, 5)
+        self.assertEqual(result.mode, 'L')
+        self.assertGreater(fraction, 0)
+        clean, fraction = denoise.adaptive_median(self.clean, 3)
+        self.assertEqual(fraction, 0.0)
+        self.assertIsNone(ImageChops.difference(clean, self.clean).getbbox())
+
+    def test_alpha_kept_and_palette_rejected(self):
+        alpha = Image.linear_gradient('L').resize(self.noisy.size)
+        noisy = self.noisy.copy()
+        noisy.putalpha(alpha)
+        result, fraction = denoise.adaptive_median(noisy, 3)
+        self.assertEqual(result.mode, 'RGBA')
+        self.assertEqual(result.getchannel('A').tobytes(), alpha.tobytes())
+        expected, expected_fraction = denoise.adaptive_median(self.noisy, 3)
+        self.assertEqual(result.convert('RGB').tobytes(), expected.tobytes())
+        self.assertEqual(fraction, expected_fraction)
+        with self.assertRaises(ValueError):
+            denoise.adaptive_median(self.noisy.quantize(64), 3)
+
+
+class TestDenoiseMethods(unittest.TestCase):
+    """Тесты подключаемых методов шумоподавления"""
+
+    def setUp(self):
+        self.clean = Image.linear_gradient('L').resize((96, 64)).convert('RGB')
+        noise = Image.effect_noise((96, 64), 20).convert('RGB')
+        self.noisy = ImageChops.add(self.clean, noise, 1.0, -128)
+
+    def error(self, image) -> int:
+        return sum(count * index for index, count in
+                   enumerate(ImageChops.difference(image, self.clean).convert('L').histogram()))
+
+    def test_every_method_reduces_noise(self):
+        for method in denoise.available_methods():
+            with self.subTest(method=method):
+                result = denoise.denoise(self.noisy, method, 3)
+                self.assertEqual((result.size, result.mode), (self.noisy.size, 'RGB'))
+                self.assertLess(self.error(result), self.error(self.noisy))
+        gray = denoise.denoise(self.noisy.convert('L'), denoise.method_for_quality('best'), 5)
+        self.assertEqual(gray.mode, 'L')
+
+    def test_context_radius_covers_filter(self):
+        box = (30, 20, 60, 44)
+        for method in denoise.available_methods():
+            for strength in (1, 4, 7):
+                with self.subTest(method=method, strength=strength):
+                    margin = denoise.context_radius(method, strength)
+                    outer = (box[0] - margin, box[1] - margin, box[2] + margin, box[3] + margin)
+                    part = denoise.denoise(self.noisy.crop(outer), method, strength)
+                    full = denoise.denoise(self.noisy, method, strength)
+                    self.assertEqual(part.crop((margin, margin, margin + 30, margin + 24)).tobytes(),
+                                     full.crop(box).tobytes())
+
+    def test_quality_selector_and_missing_numpy(self):
+        self.assertEqual(denoise.method_for_quality('draft'), 'box')
+        with self.assertRaises(ValueError):
+            denoise.method_for_quality('ultra')
+        with self.assertRaises(ValueError):
+            denoise.denoise(self.noisy, 'wavelet')
+        saved = denoise.np
+        try:
+            denoise.np = None
+            self.assertNotIn('nlm', denoise.available_methods())
+            self.assertEqual(denoise.method_for_quality('best'), 'fast_gaussian')
+            with self.assertRaises(ValueError):
+                denoise.denoise(self.noisy, 'nlm')
+        finally:
+            denoise.np = saved
+
+    def test_register_method(self):
+        denoise.register_method('identity', lambda image, strength: image.copy())
+        try:
+            self.assertIn('identity', denoise.available_methods())
+            self.assertIsNone(ImageChops.difference(denoise.denoise(self.noisy, 'identity'),
+                                                    self.noisy).getbbox())
+        finally:
+            del denoise._METHODS['identity']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from PIL import Image, ImageDraw
+import frame_stack
+import resize_engine
+from image_processor import ImageProcessor
+
+
+def make_frame(seed: int) -> Image.Image:
+    image = Image.new('RGB', (48, 32), (seed * 40 % 256, 90, 200))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((seed, 4, 30 + seed, 28), fill=(250, seed * 60 % 256, 10))
+    draw.line((0, 31, 47, 0), fill=(0, 0, 0), width=3)
+    return image
+
+
+@unittest.skipIf(frame_stack.np is None, "нужен numpy")
+class TestFrameStack(unittest.TestCase):
+    """Тесты обработки пачки кадров"""
+
+    def setUp(self):
+        self.np = frame_stack.np
+        self.frames = [make_frame(seed) for seed in range(3)]
+        self.stack = frame_stack.as_stack(self.frames)
+
+    def assertClose(self, first, second, tolerance=2):
+        self.assertEqual(first.shape, second.shape)
+        self.assertLessEqual(self.np.abs(first.astype(int) - second).max(), tolerance)
+
+    def test_resize_matches_pillow(self):
+        for quality in resize_engine.QUALITY_PRESETS:
+            for mode, (width, height) in (('stretch', (20, 15)), ('fill', (30, 30)), ('fit', (96, 50))):
+                with self.subTest(quality=quality, mode=mode):
+                    result = frame_stack.resize_stack(self.stack, width, height, mode, quality)
+                    expected = self.np.stack([self.np.asarray(resize_engine.resize(frame, width, height,
+                                                                                   mode, quality))
+                                              for frame in self.frames])
+                    self.assertClose(result, expected)
+
+    def test_resize_matches_engine_with_reduce(self):
+        # Сильное уменьшение шумных кадров: Pillow сначала уменьшает reduce(), пачка - так же
+        rng = self.np.random.default_rng(0)
+        noisy = [Image.fromarray(rng.integers(0, 256, (256, 240, 3), dtype=self.np.uint8)) for _ in range(2)]
+        stack = frame_stack.as_stack(noisy)
+        for quality in resize_engine.QUALITY_PRESETS:
+            for mode, (width, height) in (('stretch', (32, 32)), ('fill', (32, 20))):
+                with self.subTest(quality=quality, mode=mode):
+                    result = frame_stack.resize_stack(stack, width, height, mode, quality)
+                    expected = self.np.stack([self.np.asarray(resize_engine.resize(frame, width, height,
+                                                                                   mode, quality))
+                                              for frame in noisy])
+                    self.assertClose(result, expected, 1)
+
+    def test_chain(self):
+        result = frame_stack.process_stack(self.stack, [
+            {"op": "convert_to_grayscale", "method": "bt709", "output_mode": "L"},
+            {"op": "resize_image", "width": 24, "height": 16}])
+        self.assertEqual(result.shape, (3, 16, 24))
+        expected = self.np.stack([self.np.asarray(frame.convert('L', (0.2126, 0.7152, 0.0722, 0))
+                                                   .resize((24, 16), Image.Resampling.LANCZOS))
+                                  for frame in self.frames])
+        self.assertClose(result, expected, 3)
+        self.assertEqual(frame_stack.grayscale_stack(self.stack).shape, (3, 32, 48, 3))
+        self.assertEqual(self.stack.shape, (3, 32, 48, 3))   # вход не изменён
+        # Пачка уже в оттенках серого: результат - копия, а не массив вызывающего
+        gray = result.copy()
+        same = frame_stack.process_stack(gray, [{"op": "convert_to_grayscale", "output_mode": "L"}])
+        self.assertFalse(self.np.shares_memory(same, gray))
+        self.assertTrue(self.np.array_equal(same, gray))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            frame_stack.as_stack([make_frame(0), make_frame(0).resize((10, 10))])
+        with self.assertRaises(ValueError):
+            frame_stack.process_stack(self.stack, [{"op": "remove_noise"}])
+        processor = ImageProcessor()
+        self.assertIsNone(processor.process_stack(self.stack, [{"op": "resize_image", "width": 0, "height": 5}]))
+        result = processor.process_stack(self.frames, [{"op": "resize_image", "width": 12, "height": 8}])
+        self.assertEqual(result.shape, (3, 8, 12, 3))
+        self.assertIsNone(processor.current_image)
+
+
+if __name__ == '__main__':
+    unittest.main()
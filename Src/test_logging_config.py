@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from PIL import Image
+import logging_config
+from image_processor import ImageProcessor
+
+
+class TestLoggingConfig(unittest.TestCase):
+    """Тесты режимов логирования"""
+
+    def tearDown(self):
+        logging_config.shutdown_logging()
+
+    def _action_log_size(self):
+        path = os.path.join('logs', 'user_actions.json')
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def test_quiet_mode_aggregates_operations(self):
+        stream = io.StringIO()
+        logging_config.configure_logging('quiet', stream=stream, summary_interval=3600)
+        self.assertFalse(logging_config.action_log_enabled())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'input.png')
+            Image.new('RGB', (50, 40), 'blue').save(path)
+            action_log_size = self._action_log_size()
+            processor = ImageProcessor()
+            for _ in range(3):
+                processor.load_image(path)
+                processor.remove_noise(3)
+            processor.load_image(os.path.join(temp_dir, 'missing.png'))
+            self.assertEqual(self._action_log_size(), action_log_size)
+
+        logging_config.shutdown_logging()
+        output = stream.getvalue()
+        self.assertNotIn("Изображение загружено", output)
+        self.assertIn("load_image=3, remove_noise=3", output)
+        # Ошибки выводятся сразу, без агрегации
+        self.assertIn("Ошибка загрузки", output)
+        self.assertTrue(logging_config.action_log_enabled())
+
+    def test_quiet_mode_samples_lines(self):
+        stream = io.StringIO()
+        logging_config.configure_logging('quiet', stream=stream, summary_interval=3600,
+                                         sample_every=2)
+        processor = ImageProcessor()
+        processor.current_image = Image.new('RGB', (10, 10))
+        for _ in range(3):
+            processor.convert_to_grayscale()
+        logging_config.shutdown_logging()
+        self.assertEqual(stream.getvalue().count("оттенки серого"), 2)
+
+    def test_quiet_mode_without_queue_summarizes_every_target(self):
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, 'processor.log')
+            logging_config.configure_logging('quiet', stream=stream, use_queue=False, file_logging=True,
+                                             log_file=log_file, summary_interval=3600)
+            processor = ImageProcessor()
+            processor.current_image = Image.new('RGB', (10, 10))
+            for _ in range(3):
+                processor.convert_to_grayscale()
+            logging_config.shutdown_logging()
+            with open(log_file, encoding='utf-8') as f:
+                file_output = f.read()
+        for output in (stream.getvalue(), file_output):
+            self.assertNotIn("оттенки серого", output)
+            self.assertEqual(output.count("convert_to_grayscale=3"), 1)
+
+    def test_summary_timer_without_new_operations(self):
+        stream = io.StringIO()
+        logging_config.configure_logging('quiet', stream=stream, use_queue=False, summary_interval=0.05)
+        processor = ImageProcessor()
+        processor.current_image = Image.new('RGB', (10, 10))
+        processor.convert_to_grayscale()
+        deadline = time.monotonic() + 5
+        while "convert_to_grayscale=1" not in stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIn("convert_to_grayscale=1", stream.getvalue())
+
+    def test_verbose_mode_without_file(self):
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, 'processor.log')
+            logging_config.configure_logging('verbose', stream=stream, file_logging=False,
+                                             log_file=log_file)
+            processor = ImageProcessor()
+            processor.current_image = Image.new('RGB', (10, 10))
+            processor.convert_to_grayscale()
+            self.assertIn("оттенки серого", stream.getvalue())
+            self.assertFalse(os.path.exists(log_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
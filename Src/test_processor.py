@@ -1,5 +1,7 @@
+import io
 import unittest
 import os
+import tempfile
 from PIL import Image
 from image_processor import ImageProcessor
 
@@ -27,10 +29,53 @@ class TestImageProcessor(unittest.TestCase):
         result = self.processor.remove_noise(3)
         self.assertTrue(result)
     
+    def test_remove_noise_palette(self):
+        self.processor.current_image = Image.new('RGB', (40, 30), 'red').quantize(16)
+        self.assertTrue(self.processor.remove_noise(3))
+        self.assertEqual(self.processor.current_image.mode, 'RGB')
+        self.assertEqual(self.processor.current_image.getpixel((5, 5)), (255, 0, 0))
+        self.assertEqual(self.processor.previous_image.mode, 'P')
+        
+        transparent = Image.new('RGB', (40, 30), 'red').quantize(16)
+        transparent.info['transparency'] = 0
+        self.processor.current_image = transparent
+        self.assertTrue(self.processor.remove_noise(3, mode='adaptive'))
+        self.assertEqual(self.processor.current_image.mode, 'RGBA')
+        self.processor.current_image = transparent
+        self.assertFalse(self.processor.remove_noise(3, region=(0, 0, 10, 10)))
+    
+    def test_remove_noise_adaptive(self):
+        self.processor.current_image = Image.linear_gradient('L').convert('RGB')
+        self.processor.current_image.putpixel((40, 40), (255, 255, 255))
+        self.assertTrue(self.processor.remove_noise(3, mode='adaptive'))
+        # Заменён только импульсный пиксель, отмена возвращает исходное
+        result = self.processor.current_image
+        self.assertLessEqual(abs(result.getpixel((40, 40))[0] - result.getpixel((40, 39))[0]), 2)
+        self.assertEqual(result.getpixel((10, 10)), self.processor.previous_image.getpixel((10, 10)))
+        self.assertFalse(self.processor.remove_noise(3, mode='strong'))
+    
+    def test_remove_noise_methods(self):
+        self.processor.load_image('test_image.jpg')
+        self.assertTrue(self.processor.remove_noise(3, method='box'))
+        self.assertTrue(self.processor.remove_noise(5, quality='fast'))
+        self.assertEqual(self.processor.current_image.size, (100, 100))
+        before = self.processor.current_image
+        self.assertFalse(self.processor.remove_noise(3, method='wavelet'))
+        self.assertFalse(self.processor.remove_noise(3, mode='adaptive', method='box'))
+        self.assertIs(self.processor.current_image, before)
+    
     def test_convert_to_grayscale(self):
         self.processor.load_image('test_image.jpg')
         result = self.processor.convert_to_grayscale()
         self.assertTrue(result)
+        self.assertEqual(self.processor.current_image.mode, 'RGB')
+    
+    def test_convert_to_grayscale_methods(self):
+        self.processor.load_image('test_image.jpg')
+        self.assertTrue(self.processor.convert_to_grayscale('bt709', output_mode='L'))
+        self.assertEqual(self.processor.current_image.mode, 'L')
+        self.assertFalse(self.processor.convert_to_grayscale('sepia'))
+        self.assertFalse(self.processor.convert_to_grayscale(output_mode='CMYK'))
     
     def test_resize_image(self):
         self.processor.load_image('test_image.jpg')
@@ -39,6 +84,246 @@ class TestImageProcessor(unittest.TestCase):
         info = self.processor.get_image_info()
         self.assertEqual(info['width'], 50)
     
+    def test_resize_fit_keeps_aspect(self):
+        Image.new('RGB', (400, 200), color='blue').save('test_image.jpg')
+        self.processor.load_image('test_image.jpg')
+        result = self.processor.resize_image(100, 100, mode='fit')
+        self.assertTrue(result)
+        self.assertEqual(self.processor.current_image.size, (100, 50))
+    
+    def test_resize_fill_and_quality(self):
+        Image.new('RGB', (400, 200), color='blue').save('test_image.jpg')
+        self.processor.load_image('test_image.jpg')
+        for quality in ('best', 'high', 'balanced', 'fast', 'draft'):
+            self.assertTrue(self.processor.resize_image(60, 60, mode='fill', quality=quality))
+            self.assertEqual(self.processor.current_image.size, (60, 60))
+            self.processor.reset_to_original()
+        self.assertFalse(self.processor.resize_image(60, 60, quality='ultra'))
+    
+    def test_resize_quality_uses_reducing_gap(self):
+        image = Image.effect_noise((400, 300), 60).convert('RGB')
+        self.processor.current_image = image
+        # По умолчанию - прежний один проход LANCZOS
+        self.assertTrue(self.processor.resize_image(50, 40))
+        self.assertEqual(self.processor.current_image.tobytes(),
+                         image.resize((50, 40), Image.Resampling.LANCZOS).tobytes())
+        import resize_engine
+        for quality, (resample, gap) in resize_engine.QUALITY_PRESETS.items():
+            self.processor.current_image = image
+            self.assertTrue(self.processor.resize_image(50, 40, quality=quality))
+            self.assertEqual(self.processor.current_image.tobytes(),
+                             image.resize((50, 40), resample, reducing_gap=gap).tobytes())
+    
+    def test_generate_renditions(self):
+        Image.new('RGB', (800, 400), color='green').save('test_image.jpg')
+        self.processor.load_image('test_image.jpg')
+        specs = [(100, 100, 'png'), (400, 400), {'width': 200, 'height': 200, 'mode': 'fill'}]
+        with tempfile.TemporaryDirectory() as output_dir:
+            results = self.processor.generate_renditions(specs, output_dir, base_name='thumb')
+            self.assertEqual(len(results), 3)
+            for item in results:
+                self.assertTrue(os.path.exists(item['path']))
+            self.assertEqual((results[0]['width'], results[0]['height']), (100, 50))
+            self.assertEqual(results[0]['source'], '400x200')
+            self.assertEqual((results[2]['width'], results[2]['height']), (200, 200))
+        self.assertEqual(self.processor.current_image.size, (800, 400))
+    
+    def test_renditions_cascade_by_quality(self):
+        Image.new('RGB', (800, 400), color='green').save('test_image.jpg')
+        self.processor.load_image('test_image.jpg')
+        specs = [{'width': 400, 'height': 400, 'quality': 'draft'},
+                 {'width': 100, 'height': 100},
+                 {'width': 100, 'height': 100, 'quality': 'draft'}]
+        with tempfile.TemporaryDirectory() as output_dir:
+            results = self.processor.generate_renditions(specs, output_dir, base_name='thumb')
+            # Промежуточный результат уровня draft не служит источником для high
+            self.assertEqual(results[1]['source'], '800x400')
+            # ... а результат high подходит для draft того же размера
+            self.assertEqual(results[2]['source'], '100x50')
+            # Одинаковый размер и формат при разном качестве - разные файлы
+            self.assertEqual(len({item['path'] for item in results}), 3)
+            for item in results:
+                self.assertTrue(os.path.exists(item['path']))
+    
+    def test_operation_stats(self):
+        samples = []
+        self.processor.add_stats_hook(samples.append)
+        self.processor.load_image('test_image.jpg')
+        self.processor.remove_noise(3)
+        self.processor.resize_image(50, 50)
+        self.processor.resize_image(0, 50)
+        
+        stats = self.processor.stats()
+        self.assertEqual(stats['load_image']['calls'], 1)
+        self.assertEqual(stats['resize_image']['calls'], 2)
+        self.assertEqual(stats['resize_image']['errors'], 1)
+        self.assertEqual(stats['remove_noise']['input_pixels']['sum'], 100 * 100)
+        self.assertGreater(stats['remove_noise']['allocated_bytes']['sum'], 0)
+        self.assertEqual(len(samples), 4)
+        self.assertEqual(samples[2]['output_pixels'], 50 * 50)
+    
+    def test_memory_budget_degrades_gracefully(self):
+        # 100x100 RGB занимает в памяти 40000 байт
+        processor = ImageProcessor(memory_budget=90000)
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertFalse(processor.memory_usage()['original_unloaded'])
+        
+        # Снимок для отмены - ссылка на прежнее изображение, дополнительной памяти не требует
+        self.assertTrue(processor.remove_noise(3))
+        self.assertIsNotNone(processor.previous_image)
+        self.assertFalse(processor.memory_usage()['original_unloaded'])
+        
+        # Дальше выгружается исходное и старая история отмены
+        self.assertTrue(processor.remove_noise(3))
+        self.assertTrue(processor.memory_usage()['original_unloaded'])
+        self.assertLessEqual(processor.memory_usage()['peak'], 90000)
+        
+        # Исходное перечитывается с диска
+        self.assertTrue(processor.reset_to_original())
+        self.assertEqual(processor.current_image.size, (100, 100))
+    
+    def test_load_counts_held_images(self):
+        processor = ImageProcessor(memory_budget=90000)
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertTrue(processor.remove_noise(3))
+        edited = processor.current_image
+        # Текущее, снимок отмены (он же исходное) и новое не помещаются вместе:
+        # снимок освобождается до декодирования, прежнее текущее остаётся для отмены
+        with self.assertLogs('image_processor', 'WARNING'):
+            self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertIs(processor.previous_image, edited)
+        self.assertLessEqual(processor.memory_usage()['peak'], 90000)
+        
+        # Без бюджета пик учитывает всё, что было живо во время декодирования
+        self.processor.load_image('test_image.jpg')
+        self.processor.remove_noise(3)
+        self.processor.load_image('test_image.jpg')
+        self.assertEqual(self.processor.memory_usage()['peak'], 120000)
+        
+        # Не помещается и прежнее текущее: загрузка без возможности отмены
+        processor = ImageProcessor(memory_budget=50000)
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertIsNone(processor.previous_image)
+        self.assertLessEqual(processor.memory_usage()['peak'], 50000)
+    
+    def test_failed_load_keeps_original(self):
+        processor = ImageProcessor(memory_budget=90000)
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        original = processor.original_image
+        # Заголовок читается, но данные обрезаны: ошибка уже при декодировании
+        buffer = io.BytesIO()
+        Image.effect_noise((100, 100), 50).convert('RGB').save(buffer, 'PNG')
+        try:
+            with open('test_truncated.png', 'wb') as f:
+                f.write(buffer.getvalue()[:buffer.tell() * 3 // 4])
+            self.assertFalse(processor.load_image('test_truncated.png'))
+        finally:
+            os.remove('test_truncated.png')
+        self.assertIs(processor.original_image, original)
+        self.assertTrue(processor.reset_to_original())
+    
+    def test_history_shares_images_without_copies(self):
+        self.processor.load_image('test_image.jpg')
+        self.assertIs(self.processor.original_image, self.processor.current_image)
+        
+        loaded = self.processor.current_image
+        pixel = loaded.getpixel((0, 0))
+        self.processor.convert_to_grayscale()
+        self.assertIs(self.processor.previous_image, loaded)
+        self.assertEqual(loaded.getpixel((0, 0)), pixel)
+        
+        self.processor.reset_to_original()
+        self.assertIs(self.processor.current_image, loaded)
+        
+        # Изменение на месте не затрагивает исходное
+        writable = self.processor._writable_current()
+        self.assertIsNot(writable, loaded)
+        writable.putpixel((0, 0), (0, 0, 0))
+        self.assertEqual(self.processor.original_image.getpixel((0, 0)), pixel)
+    
+    def test_memory_budget_refuses_oversized(self):
+        processor = ImageProcessor(memory_budget=30000)
+        self.assertFalse(processor.load_image('test_image.jpg'))
+        self.assertIsNone(processor.current_image)
+        
+        processor = ImageProcessor(memory_budget=50000)
+        self.assertTrue(processor.load_image('test_image.jpg'))
+        self.assertFalse(processor.resize_image(200, 200))
+        self.assertEqual(processor.current_image.size, (100, 100))
+    
+    def test_region_operations(self):
+        image = Image.linear_gradient('L').resize((120, 80)).convert('RGB')
+        image.putpixel((30, 30), (255, 255, 255))
+        source = image.copy()
+        for method in ('median', 'box'):
+            full = self.processor._filter_noise(image, 5, 'uniform', method)
+            self.processor.current_image = image
+            self.assertTrue(self.processor.remove_noise(5, method=method, region=(20, 20, 50, 45)))
+            # Внутри области - как фильтр всего кадра, снаружи - без изменений
+            result = self.processor.current_image
+            self.assertEqual(result.crop((20, 20, 50, 45)).tobytes(), full.crop((20, 20, 50, 45)).tobytes())
+            self.assertEqual(result.getpixel((60, 60)), image.getpixel((60, 60)))
+            self.assertIsNone(self.processor.previous_image)
+            self.assertEqual(self.processor.memory_usage()['undo_patch'], 30 * 25 * 4)
+            self.assertTrue(self.processor.undo())
+            self.assertEqual(self.processor.current_image.tobytes(), source.tobytes())
+        
+        mask = Image.new('1', image.size)
+        mask.paste(1, (0, 0, 10, 10))
+        self.assertTrue(self.processor.convert_to_grayscale('bt709', region=mask))
+        self.assertEqual(self.processor.current_image.mode, 'RGB')
+        self.assertFalse(self.processor.convert_to_grayscale(output_mode='L', region=(0, 0, 5, 5)))
+        self.assertFalse(self.processor.remove_noise(3, region=(100, 0, 130, 10)))
+        
+        self.processor.current_image = image.quantize(16)
+        self.assertFalse(self.processor.convert_to_grayscale(region=(0, 0, 5, 5)))
+        self.processor.current_image = Image.merge('LA', (image.convert('L'), Image.new('L', image.size, 77)))
+        self.assertTrue(self.processor.convert_to_grayscale(region=(0, 0, 5, 5)))
+        self.assertEqual(self.processor.current_image.getpixel((2, 2))[1], 77)
+        self.processor.current_image = source.copy()
+        
+        self.assertTrue(self.processor.resize_image(20, 10, region=(40, 0, 80, 20)))
+        expected = self.processor.previous_image.crop((40, 0, 80, 20)).resize((20, 10), Image.Resampling.LANCZOS)
+        self.assertEqual(self.processor.current_image.tobytes(), expected.tobytes())
+    
+    def test_region_keeps_original(self):
+        self.processor.load_image('test_image.jpg')
+        loaded = self.processor.current_image
+        pixel = loaded.getpixel((5, 5))
+        usage = self.processor.memory_usage()['total']
+        self.assertTrue(self.processor.convert_to_grayscale(region=(0, 0, 10, 10)))
+        # Кадр не копируется: запись на месте, исходное - заплатка области (она же снимок отмены)
+        self.assertIs(self.processor.current_image, loaded)
+        self.assertEqual(self.processor.memory_usage()['total'] - usage, 400)
+        self.assertTrue(self.processor.convert_to_grayscale(region=(0, 0, 10, 10)))
+        self.assertFalse(self.processor.memory_usage()['original_unloaded'])
+        self.assertEqual(self.processor.original_image.getpixel((5, 5)), pixel)
+        self.assertIsNot(self.processor.original_image, loaded)
+        Image.new('RGB', (100, 100), color='blue').save('test_image.jpg')
+        self.assertTrue(self.processor.reset_to_original())
+        self.assertEqual(self.processor.current_image.getpixel((5, 5)), pixel)
+        
+        # Отмена возвращает область исходного на место без копии кадра
+        processor = ImageProcessor()
+        processor.load_image('test_image.jpg')
+        loaded = processor.current_image
+        pixel = loaded.getpixel((5, 5))
+        self.assertTrue(processor.convert_to_grayscale(region=(0, 0, 10, 10)))
+        self.assertTrue(processor.undo())
+        self.assertIs(processor.current_image, loaded)
+        self.assertEqual(processor.memory_usage()['total'], 40000)
+        self.assertIs(processor.original_image, loaded)
+        self.assertEqual(loaded.getpixel((5, 5)), pixel)
+        
+        # Снимок не помещается в бюджет: исходное выгружается вместо заплатки
+        processor = ImageProcessor(memory_budget=41000)
+        processor.load_image('test_image.jpg')
+        self.assertTrue(processor.convert_to_grayscale(region=(0, 0, 10, 10)))
+        self.assertTrue(processor.memory_usage()['original_unloaded'])
+        self.assertTrue(processor.reset_to_original())
+        self.assertEqual(processor.current_image.getpixel((5, 5)), pixel)
+    
     def test_save_image(self):
         self.processor.load_image('test_image.jpg')
         result = self.processor.save_image('test_output.jpg')
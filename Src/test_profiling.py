@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from PIL import Image
+from image_processor import ImageProcessor
+from profiling import SamplingProfiler, classify_phase
+
+
+class TestProfiling(unittest.TestCase):
+    """Тесты режима профилирования"""
+    
+    def test_classify_phase(self):
+        base = ('main:<module>', 'image_processor:wrapper')
+        self.assertEqual(classify_phase(base + ('image_processor:remove_noise', 'Image:filter')), 'filter')
+        self.assertEqual(classify_phase(base + ('image_processor:load_image', 'Image:copy',
+                                                'ImageFile:load')), 'decode')
+        self.assertEqual(classify_phase(base + ('image_processor:save_image', 'Image:save',
+                                                'JpegImagePlugin:_save')), 'encode')
+        self.assertEqual(classify_phase(base + ('image_processor:_log_user_action', 'json:dump')), 'log_io')
+        self.assertEqual(classify_phase(base + ('image_processor:remove_noise', 'Image:copy')), 'copy')
+        self.assertEqual(classify_phase(('threading:_bootstrap', 'threading:wait')), 'idle')
+        # Пиксельная работа модулей проекта на numpy - тоже фильтрация
+        for leaf in ('denoise:_median_at_numpy', 'color:luma_array', 'frame_stack:resize_stack',
+                     'arrays:_to_uint8'):
+            self.assertEqual(classify_phase(base + ('processor:remove_noise', leaf, 'fromnumeric:partition')),
+                             'filter')
+    
+    def test_profiler_collects_stacks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'input.png')
+            Image.effect_noise((600, 400), 30).convert('RGB').save(path)
+            processor = ImageProcessor()
+            with SamplingProfiler(interval=0.0005) as profiler:
+                for _ in range(3):
+                    processor.load_image(path)
+                    processor.remove_noise(5)
+        
+        self.assertGreater(profiler.samples, 0)
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in profiler.collapsed()))
+        self.assertGreater(profiler.phase_breakdown()['filter']['samples'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
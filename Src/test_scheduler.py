@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import unittest
+from PIL import Image
+from recipe import Recipe
+from cost_model import CostModel
+from scheduler import Scheduler, estimate_steps_ms
+
+
+class TestScheduler(unittest.TestCase):
+    """Тесты планировщика смешанной нагрузки"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.large_path = os.path.join(self.temp_dir.name, 'large.png')
+        self.small_path = os.path.join(self.temp_dir.name, 'small.png')
+        Image.effect_noise((800, 600), 64).convert('RGB').save(self.large_path)
+        Image.new('RGB', (40, 30), color='red').save(self.small_path)
+        self.bulk = Recipe([{"op": "remove_noise", "strength": 5}] * 4, 'png')
+        self.interactive = Recipe([{"op": "convert_to_grayscale"}], 'png')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def output(self, name: str) -> str:
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_step_costs_cover_load_operations_and_save(self):
+        model = CostModel()
+        small = estimate_steps_ms(model, self.bulk, (320, 240))
+        large = estimate_steps_ms(model, self.bulk, (1000, 1000))
+        self.assertEqual(len(small), len(self.bulk.operations) + 2)
+        self.assertGreater(sum(large), sum(small))
+        light = estimate_steps_ms(model, Recipe([{"op": "remove_noise", "strength": 3}]), (1000, 1000))
+        self.assertGreater(large[1], light[1])
+
+    def test_interactive_preempts_bulk_between_operations(self):
+        with Scheduler(workers=1) as scheduler:
+            bulk = scheduler.submit(self.bulk, self.large_path, self.output('bulk.png'))
+            while not bulk.running():
+                time.sleep(0.001)
+            interactive = scheduler.submit(self.interactive, self.small_path,
+                                           self.output('interactive.png'), priority='interactive')
+            interactive_result = interactive.result(timeout=60)
+            bulk_result = bulk.result(timeout=60)
+
+        self.assertTrue(interactive_result['ok'])
+        self.assertTrue(bulk_result['ok'])
+        # Интерактивная задача не ждала всю bulk-задачу, а та продолжилась с того же шага
+        self.assertLess(interactive_result['latency_ms'], bulk_result['latency_ms'])
+        self.assertGreaterEqual(bulk_result['preemptions'], 1)
+        with Image.open(self.output('bulk.png')) as image:
+            self.assertEqual(image.size, (800, 600))
+        stats = scheduler.stats()
+        self.assertEqual(stats['interactive']['completed'], 1)
+        self.assertEqual(stats['bulk']['preemptions'], bulk_result['preemptions'])
+
+    def test_fifo_policy_does_not_preempt(self):
+        with Scheduler(workers=1, policy='fifo') as scheduler:
+            bulk = scheduler.submit(self.bulk, self.large_path, self.output('bulk.png'))
+            interactive = scheduler.submit(self.interactive, self.small_path,
+                                           self.output('interactive.png'), priority='interactive')
+            self.assertEqual(bulk.result(timeout=60)['preemptions'], 0)
+            self.assertGreater(interactive.result(timeout=60)['latency_ms'],
+                               bulk.result()['latency_ms'])
+
+    def test_queued_job_can_be_cancelled(self):
+        with Scheduler(workers=1) as scheduler:
+            first = scheduler.submit(self.bulk, self.large_path, self.output('first.png'))
+            second = scheduler.submit(self.bulk, self.large_path, self.output('second.png'))
+            self.assertTrue(second.cancel())
+            self.assertTrue(first.result(timeout=60)['ok'])
+        self.assertFalse(os.path.exists(self.output('second.png')))
+
+    def test_failures_and_validation(self):
+        with Scheduler(workers=1) as scheduler:
+            result = scheduler.submit(self.interactive, self.output('missing.png'),
+                                      self.output('out.png'), priority='interactive').result(timeout=30)
+            with self.assertRaises(ValueError):
+                scheduler.submit(self.interactive, self.small_path, self.output('out.png'),
+                                 priority='urgent')
+        self.assertFalse(result['ok'])
+        self.assertEqual(scheduler.stats()['interactive']['failed'], 1)
+        with self.assertRaises(RuntimeError):
+            scheduler.submit(self.interactive, self.small_path, self.output('out.png'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import unittest
+from multiprocessing import resource_tracker
+from PIL import Image, ImageChops, ImageFilter
+import shared_images
+from image_processor import ImageProcessor
+from shared_images import ParallelExecutor, SharedImagePool, export_image, import_image
+
+
+class TestSharedImages(unittest.TestCase):
+    """Тесты передачи изображений через разделяемую память"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ParallelExecutor(workers=2, min_pixels=0)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.close()
+    
+    def test_pool_reuses_released_segments(self):
+        with SharedImagePool() as pool:
+            image = Image.effect_noise((64, 48), 40).convert('RGB')
+            buffer, ref = export_image(image, pool)
+            self.assertEqual(import_image(buffer, ref).tobytes(), image.tobytes())
+            
+            buffer.retain()
+            buffer.release()
+            self.assertEqual(buffer.refs, 1)
+            buffer.release()
+            self.assertIs(pool.acquire(64 * 48 * 4), buffer)
+            self.assertEqual((pool.allocated, pool.reused), (1, 1))
+    
+    def test_untracked_attach_from_threads(self):
+        # Подмена resource_tracker.register (до 3.13) не должна теряться при одновременных подключениях
+        register = resource_tracker.register
+        with SharedImagePool() as pool:
+            buffers = [pool.acquire(4096) for _ in range(4)]
+            errors = []
+            
+            def attach(name):
+                try:
+                    for _ in range(50):
+                        shared_images._open_untracked(name).close()
+                except Exception as e:
+                    errors.append(e)
+            
+            threads = [threading.Thread(target=attach, args=(buffer.name,)) for buffer in buffers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertIs(resource_tracker.register, register)
+    
+    def test_parallel_median_matches_serial(self):
+        for mode in ('L', 'RGB', 'RGBA'):
+            image = Image.effect_noise((120, 90), 60).convert(mode)
+            parallel = self.executor.median_filter(image, 5)
+            serial = image.filter(ImageFilter.MedianFilter(5))
+            self.assertEqual(parallel.mode, mode)
+            self.assertEqual(parallel.tobytes(), serial.tobytes())
+    
+    def test_parallel_resize_matches_serial(self):
+        image = Image.effect_noise((150, 100), 60).convert('RGB')
+        for size in ((70, 40), (300, 220)):
+            parallel = self.executor.resize(image, size, Image.Resampling.BICUBIC)
+            serial = image.resize(size, Image.Resampling.BICUBIC)
+            self.assertEqual(parallel.size, size)
+            self.assertLessEqual(max(high for _, high in ImageChops.difference(parallel, serial).getextrema()), 1)
+    
+    def test_processor_uses_executor(self):
+        processor = ImageProcessor(executor=self.executor)
+        processor.current_image = Image.effect_noise((80, 60), 60).convert('RGB')
+        expected = processor.current_image.filter(ImageFilter.MedianFilter(3))
+        self.assertTrue(processor.remove_noise(3))
+        self.assertEqual(processor.current_image.tobytes(), expected.tobytes())
+        self.assertTrue(processor.resize_image(40, 30))
+        self.assertEqual(processor.current_image.size, (40, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from PIL import Image
+from recipe import Recipe
+from watcher import DirectoryWatcher
+
+
+class TestDirectoryWatcher(unittest.TestCase):
+    """Тесты режима наблюдения за папкой"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, 'input')
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        os.makedirs(self.input_dir)
+        self.recipe = Recipe([{"op": "resize_image", "width": 20, "height": 20}], 'png')
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def make_watcher(self):
+        return DirectoryWatcher(self.input_dir, self.recipe, output_dir=self.output_dir,
+                                workers=2, poll_interval=0.01, settle_time=0)
+    
+    def test_processes_new_files(self):
+        for name in ('a.jpg', 'b.png'):
+            Image.new('RGB', (60, 40), color='red').save(os.path.join(self.input_dir, name))
+        counters = self.make_watcher().run(max_idle_cycles=3)
+        self.assertEqual(counters, {'processed': 2, 'failed': 0})
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'a.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.input_dir, 'processed', 'b.png')))
+        self.assertFalse(os.path.exists(os.path.join(self.input_dir, 'a.jpg')))
+    
+    def test_resume_from_journal(self):
+        for name in ('done.jpg', 'started.jpg'):
+            Image.new('RGB', (60, 40), color='red').save(os.path.join(self.input_dir, name))
+        with open(os.path.join(self.input_dir, '.watcher_journal.jsonl'), 'w') as f:
+            f.write(json.dumps({"file": "done.jpg", "state": "done"}) + '\n')
+            f.write(json.dumps({"file": "started.jpg", "state": "started"}) + '\n')
+        
+        counters = self.make_watcher().run(max_idle_cycles=3)
+        self.assertEqual(counters['processed'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'done.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'started.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.input_dir, 'processed', 'done.jpg')))
+    
+    def test_output_inside_input_dir(self):
+        # Вложенная папка результатов не просматривается, совпадающая с входной - запрещена
+        Image.new('RGB', (60, 40), color='red').save(os.path.join(self.input_dir, 'a.jpg'))
+        self.output_dir = os.path.join(self.input_dir, 'output')
+        counters = self.make_watcher().run(max_idle_cycles=3)
+        self.assertEqual(counters, {'processed': 1, 'failed': 0})
+        self.assertEqual(os.listdir(self.output_dir), ['a.png'])
+        self.output_dir = self.input_dir
+        with self.assertRaises(ValueError):
+            self.make_watcher()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import time
+import unittest
+from PIL import Image
+from recipe import Recipe
+from work_queue import Coordinator, WorkQueue, start_local_workers
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Тесты распределённой очереди задач"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, 'input')
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        self.queue_path = os.path.join(self.temp_dir.name, 'queue.sqlite')
+        os.makedirs(self.input_dir)
+        self.inputs = []
+        for index in range(6):
+            path = os.path.join(self.input_dir, f'{index}.png')
+            Image.new('RGB', (40, 30), color='red').save(path)
+            self.inputs.append(path)
+        self.recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_expired_lease_is_retried(self):
+        queue = WorkQueue(self.queue_path, lease_seconds=0.2, max_attempts=2)
+        other = WorkQueue(self.queue_path, lease_seconds=0.2, max_attempts=2)
+        try:
+            queue.submit(self.recipe, self.inputs[:2], self.output_dir, shard_size=1)
+            first = queue.lease('a', limit=5)
+            # Один шард за аренду
+            self.assertEqual([task['input_path'] for task in first], [os.path.abspath(self.inputs[0])])
+
+            time.sleep(0.3)
+            retried = other.lease('b', limit=5)
+            self.assertEqual(retried[0]['id'], first[0]['id'])
+            self.assertEqual(retried[0]['attempts'], 2)
+
+            # Отчёт рабочего с истёкшей арендой не принимается
+            self.assertFalse(queue.complete(first[0]['id'], 'a', True, 1.0))
+            self.assertTrue(other.complete(retried[0]['id'], 'b', True, 1.0))
+
+            # Вторая задача исчерпывает попытки и становится неудачной
+            task = other.lease('b')[0]
+            self.assertTrue(other.complete(task['id'], 'b', False, 1.0, "ошибка"))
+            task = other.lease('b')[0]
+            self.assertTrue(other.complete(task['id'], 'b', False, 1.0, "ошибка"))
+            self.assertEqual(other.lease('b'), [])
+
+            status = other.status()
+            self.assertEqual((status['processed'], status['failed'], status['retried']), (1, 1, 2))
+            self.assertTrue(status['finished'])
+        finally:
+            queue.close()
+            other.close()
+
+    def test_lease_keeps_batches_apart(self):
+        queue = WorkQueue(self.queue_path)
+        try:
+            first = queue.submit(self.recipe, self.inputs[:3], self.output_dir, shard_size=2)
+            second = queue.submit(self.recipe, self.inputs[3:], self.output_dir, shard_size=2)
+            # Шард 0 есть в обоих пакетах: аренда не смешивает их, пакеты идут в порядке постановки
+            leases = [queue.lease('a', limit=5) for _ in range(4)]
+            self.assertEqual([[task['batch_id'] for task in tasks] for tasks in leases],
+                             [[first] * 2, [first], [second] * 2, [second]])
+            self.assertEqual([task['input_path'] for tasks in leases for task in tasks],
+                             [os.path.abspath(path) for path in self.inputs])
+        finally:
+            queue.close()
+
+    def test_expired_lease_fails_without_workers(self):
+        coordinator = Coordinator(self.queue_path, lease_seconds=0.1, max_attempts=1)
+        worker = WorkQueue(self.queue_path, lease_seconds=0.1, max_attempts=1)
+        try:
+            batch_id = coordinator.submit(self.recipe, self.inputs[:1], self.output_dir)
+            self.assertEqual(len(worker.lease('a')), 1)
+            # Рабочий пропал: аренду разбирает ожидание координатора, а не следующий рабочий
+            summary = coordinator.wait(batch_id, poll_interval=0.05, timeout=5)
+        finally:
+            worker.close()
+            coordinator.close()
+        self.assertTrue(summary['finished'])
+        self.assertEqual(summary['failed'], 1)
+
+    def test_local_workers_process_batch(self):
+        with open(os.path.join(self.input_dir, 'broken.png'), 'wb') as f:
+            f.write(b'not an image')
+        coordinator = Coordinator(self.queue_path, lease_seconds=5.0, max_attempts=2)
+        try:
+            batch_id = coordinator.submit(self.recipe, [self.input_dir], self.output_dir, shard_size=2)
+            workers = start_local_workers(self.queue_path, 3, lease_seconds=5.0, max_attempts=2)
+            summary = coordinator.wait(batch_id, poll_interval=0.1, timeout=60)
+            for process in workers:
+                process.join(timeout=30)
+        finally:
+            coordinator.close()
+
+        self.assertEqual((summary['total'], summary['processed'], summary['failed']), (7, 6, 1))
+        self.assertEqual(summary['failures'][0]['path'], os.path.abspath(
+            os.path.join(self.input_dir, 'broken.png')))
+        self.assertEqual(sum(worker['processed'] for worker in summary['workers'].values()), 6)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, '5.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from PIL import Image
+from batch import BatchRunner
+from recipe import Recipe
+from worker_pool import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Тесты пула прогретых рабочих процессов"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.temp_dir.name, 'input')
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        os.makedirs(self.input_dir)
+        os.makedirs(self.output_dir)
+        self.recipe = Recipe([{"op": "convert_to_grayscale"}], 'png')
+        for index in range(5):
+            Image.new('RGB', (40, 30), color='red').save(os.path.join(self.input_dir, f'{index}.png'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_workers_are_reused_and_recycled(self):
+        jobs = [(os.path.join(self.input_dir, f'{index}.png'),
+                 os.path.join(self.output_dir, f'{index}.png')) for index in range(5)]
+        jobs.append((os.path.join(self.input_dir, 'missing.png'),
+                     os.path.join(self.output_dir, 'missing.png')))
+        with WorkerPool(self.recipe, processes=1, max_jobs=2) as pool:
+            results = list(pool.run(jobs))
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(sum(result['ok'] for result in results), 5)
+        # Один процесс выполняет по две задачи, затем заменяется новым
+        workers = [result['worker'] for result in results]
+        self.assertEqual(len(set(workers)), 3)
+        self.assertEqual(workers[0], workers[1])
+        self.assertEqual(pool.recycled, 3)
+        self.assertEqual(pool.crashed, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, '4.png')))
+
+    def test_batch_runner_with_processes(self):
+        runner = BatchRunner(self.recipe, self.output_dir, processes=2)
+        try:
+            summary = runner.run([self.input_dir])
+        finally:
+            runner.close()
+        self.assertEqual((summary['processed'], summary['failed']), (5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
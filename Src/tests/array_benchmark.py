@@ -0,0 +1,93 @@
+# array_benchmark.py
+"""
+Бенчмарк обмена изображениями с numpy:
+прежняя передача (Image.fromarray / np.array(image)) против отображения без копирования
+(ImageProcessor.load_from_array / to_array) - время и скопированные байты на каждом шаге
+"""
+import argparse
+import os
+import sys
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PIL import Image
+import arrays
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+from image_processor import ImageProcessor
+from logging_config import configure_logging
+
+SIZES = {'1080p': (1920, 1080), '4K': (3840, 2160), '8K': (7680, 4320)}
+
+
+def measure(function, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start_time) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк обмена изображениями с numpy")
+    parser.add_argument('--sizes', default='1080p,4K,8K', help="Размеры через запятую")
+    parser.add_argument('--repeats', type=int, default=5, help="Повторов на замер")
+    parser.add_argument('--json', default='array_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    if arrays.np is None:
+        print("⚠️  numpy не установлен - бенчмарк пропущен")
+        return 0
+    np = arrays.np
+    configure_logging(mode='quiet')
+    report = BenchmarkResults('array_benchmark')
+    processor = ImageProcessor()
+
+    for label in args.sizes.split(','):
+        width, height = SIZES[label]
+        image = generate_image(width, height, 'photo', 'RGB', seed=1)
+        plain = np.array(image)                    # (h, w, 3) - обычный массив из конвейера
+        shared = arrays.to_array(arrays.share(image))   # (h, w, 3) поверх буфера (h, w, 4)
+        processor.load_from_array(shared)
+        cases = {
+            'Image.fromarray (h, w, 3)': (lambda: Image.fromarray(plain), plain.nbytes),
+            'load_from_array (h, w, 3)': (lambda: processor.load_from_array(plain), plain.nbytes),
+            'load_from_array (общий буфер)': (lambda: processor.load_from_array(shared), 0),
+            'np.array(image)': (lambda: np.array(image), plain.nbytes),
+            'np.asarray(image)': (lambda: np.asarray(image), plain.nbytes),
+            'to_array (после load)': (lambda: processor.to_array(), 0),
+        }
+
+        print(f"\n🔁 Обмен с numpy {label} ({width}x{height})")
+        print(f"   {'ШАГ':32} {'ms':>8} {'копия, МБ':>10}")
+        for name, (function, copied) in cases.items():
+            if name == 'to_array (после load)':
+                processor.load_from_array(shared)
+            samples = measure(function, args.repeats)
+            report.add('array_handoff', samples, f'{width}x{height}', 'RGB',
+                       params={'variant': name}, copied_bytes=copied)
+            print(f"   {name:32} {min(samples):8.2f} {copied / 2**20:10.1f}")
+
+        operations = [{"op": "convert_to_grayscale", "output_mode": "L"},
+                      {"op": "resize_image", "width": width // 2, "height": height // 2, "quality": "fast"}]
+
+        def through_images():
+            processor.current_image = Image.fromarray(plain)
+            processor.convert_to_grayscale(output_mode='L')
+            processor.resize_image(width // 2, height // 2, quality='fast')
+            return np.array(processor.current_image)
+
+        for name, function in (('цепочка: fromarray + np.array', through_images),
+                               ('цепочка: process_array', lambda: processor.process_array(shared, operations))):
+            samples = measure(function, args.repeats)
+            report.add('array_chain', samples, f'{width}x{height}', 'RGB', params={'variant': name})
+            print(f"   {name:32} {min(samples):8.2f}")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
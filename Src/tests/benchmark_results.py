@@ -0,0 +1,172 @@
+# benchmark_results.py
+"""
+Машиночитаемые результаты бенчмарков и сравнение двух прогонов
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+import PIL
+
+SCHEMA_VERSION = 1
+
+
+def percentile(sorted_samples: list, fraction: float) -> float:
+    """Перцентиль с линейной интерполяцией (samples должны быть отсортированы)"""
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_samples[lower]
+    weight = position - lower
+    return sorted_samples[lower] * (1 - weight) + sorted_samples[upper] * weight
+
+
+def summarize(samples_ms: list) -> dict:
+    """Статистика по выборке времени в миллисекундах"""
+    ordered = sorted(samples_ms)
+    return {
+        'count': len(ordered),
+        'min_ms': ordered[0] if ordered else 0.0,
+        'mean_ms': statistics.mean(ordered) if ordered else 0.0,
+        'stdev_ms': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'p50_ms': percentile(ordered, 0.50),
+        'p90_ms': percentile(ordered, 0.90),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'max_ms': ordered[-1] if ordered else 0.0,
+    }
+
+
+def environment_info() -> dict:
+    """Информация об окружении, в котором выполнялся бенчмарк"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'pillow': PIL.__version__,
+    }
+
+
+def case_key(case: dict) -> str:
+    """Уникальный ключ замера: операция x параметры x размер x режим x формат"""
+    parts = [case['operation']]
+    if case.get('params'):
+        parts.append(','.join(f"{k}={v}" for k, v in sorted(case['params'].items())))
+    parts.extend([case.get('size', ''), case.get('mode', ''), case.get('format', '')])
+    return '|'.join(str(part) for part in parts)
+
+
+class BenchmarkResults:
+    """Набор результатов одного прогона бенчмарка"""
+
+    def __init__(self, name: str = 'image_processor'):
+        self.name = name
+        self.created = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.environment = environment_info()
+        self.cases = []
+
+    def add(self, operation: str, samples_ms: list, size: str = '', mode: str = '',
+            format: str = '', params: dict = None, **extra) -> dict:
+        """Добавление замера"""
+        case = {
+            'operation': operation,
+            'size': size,
+            'mode': mode,
+            'format': format,
+            'params': params or {},
+            'samples_ms': list(samples_ms),
+        }
+        case.update(summarize(samples_ms))
+        case.update(extra)
+        self.cases.append(case)
+        return case
+
+    def to_dict(self) -> dict:
+        return {
+            'schema': SCHEMA_VERSION,
+            'name': self.name,
+            'created': self.created,
+            'environment': self.environment,
+            'cases': self.cases,
+        }
+
+    def save(self, path: str):
+        """Сохранение результатов в JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def load(path: str) -> dict:
+        """Загрузка результатов из JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float = 10.0,
+            metric: str = 'p50_ms') -> list:
+    """
+    Сравнение двух прогонов по выбранной метрике
+    Возвращает список строк сравнения; regression=True, если замедление больше порога
+    """
+    baseline_cases = {case_key(case): case for case in baseline.get('cases', [])}
+    rows = []
+    for case in current.get('cases', []):
+        key = case_key(case)
+        old = baseline_cases.get(key)
+        if old is None:
+            continue
+        old_value = old.get(metric, 0.0)
+        new_value = case.get(metric, 0.0)
+        change_pct = (new_value - old_value) / old_value * 100 if old_value > 0 else 0.0
+        rows.append({
+            'case': key,
+            'baseline': old_value,
+            'current': new_value,
+            'change_pct': change_pct,
+            'regression': change_pct > threshold_pct,
+        })
+    return rows
+
+
+def print_comparison(rows: list, metric: str, threshold_pct: float):
+    """Вывод таблицы сравнения"""
+    print(f"{'ЗАМЕР':60} {'БЫЛО':>10} {'СТАЛО':>10} {'Δ %':>8}")
+    print("-" * 92)
+    for row in rows:
+        flag = "  РЕГРЕССИЯ" if row['regression'] else ""
+        print(f"{row['case'][:60]:60} {row['baseline']:10.2f} {row['current']:10.2f} "
+              f"{row['change_pct']:+8.1f}{flag}")
+    regressions = sum(1 for row in rows if row['regression'])
+    print("-" * 92)
+    print(f"Метрика: {metric}, порог: {threshold_pct}%, регрессий: {regressions} из {len(rows)}")
+
+
+def compare_main(argv=None) -> int:
+    """Команда сравнения: код возврата 1, если есть регрессии"""
+    parser = argparse.ArgumentParser(description="Сравнение двух прогонов бенчмарка")
+    parser.add_argument('baseline', help="JSON с результатами базового прогона")
+    parser.add_argument('current', help="JSON с результатами нового прогона")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Допустимое замедление, %% (по умолчанию 10)")
+    parser.add_argument('--metric', default='p50_ms', help="Сравниваемая метрика")
+    args = parser.parse_args(argv)
+
+    rows = compare(BenchmarkResults.load(args.baseline), BenchmarkResults.load(args.current),
+                   args.threshold, args.metric)
+    print_comparison(rows, args.metric, args.threshold)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(compare_main())
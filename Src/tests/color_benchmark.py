@@ -0,0 +1,89 @@
+# color_benchmark.py
+"""
+Бенчмарк перевода в оттенки серого:
+прежний путь (ImageOps.grayscale + convert('RGB')) против color.grayscale
+для каждого набора весов, входных режимов RGBA/P/CMYK, результата в 'L'
+и операций на месте над массивами numpy (один кадр и пачка кадров)
+"""
+import argparse
+import os
+import sys
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PIL import ImageOps
+import color
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+
+SIZES = {'1080p': (1920, 1080), '4K': (3840, 2160), '8K': (7680, 4320)}
+STACK_FRAMES = 8
+
+
+def measure(function, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start_time) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк перевода в оттенки серого")
+    parser.add_argument('--sizes', default='1080p,4K,8K', help="Размеры через запятую")
+    parser.add_argument('--repeats', type=int, default=5, help="Повторов на замер")
+    parser.add_argument('--json', default='color_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    report = BenchmarkResults('color_benchmark')
+
+    for label in args.sizes.split(','):
+        width, height = SIZES[label]
+        image = generate_image(width, height, 'photo', 'RGB', seed=1)
+        inputs = {'RGBA': image.convert('RGBA'), 'P': image.quantize(256), 'CMYK': image.convert('CMYK')}
+        cases = {'прежний путь (RGB)': lambda: ImageOps.grayscale(image).convert('RGB')}
+        for method in color.GRAYSCALE_METHODS:
+            cases[f'{method} (RGB)'] = lambda method=method: color.grayscale(image, method)
+        cases['bt601 -> L'] = lambda: color.grayscale(image, output_mode='L')
+        for mode, source in inputs.items():
+            cases[f'прежний путь ({mode})'] = lambda source=source: ImageOps.grayscale(source).convert('RGB')
+            cases[f'bt709 ({mode})'] = lambda source=source: color.grayscale(source, 'bt709')
+
+        print(f"\n🌗 Оттенки серого {label} ({width}x{height})")
+        print(f"   {'ВАРИАНТ':26} {'ms':>8} {'Мпикс/с':>9}")
+        baselines = {}   # прежний путь для каждого входного режима
+        for name, function in cases.items():
+            samples = measure(function, args.repeats)
+            best = min(samples)
+            mode = name.rsplit('(', 1)[-1].rstrip(')') if '(' in name else 'RGB'
+            if name.startswith('прежний'):
+                baselines[mode] = best
+            report.add('convert_to_grayscale', samples, f'{width}x{height}', mode, params={'variant': name})
+            speedup = f" x{baselines[mode] / best:.2f}" if not name.startswith('прежний') else ''
+            print(f"   {name:26} {best:8.1f} {width * height / best / 1000:9.1f}{speedup}")
+
+        if color.np is None:
+            print("   ⚠️  numpy не установлен - операции над массивами пропущены")
+            continue
+        frame = color.np.asarray(image).copy()
+        stack = color.np.stack([frame] * STACK_FRAMES)
+        array_cases = {
+            'luma_array (кадр)': lambda: color.luma_array(frame),
+            'grayscale_array на месте': lambda: color.grayscale_array(frame),
+            f'luma_array ({STACK_FRAMES} кадров)': lambda: color.luma_array(stack),
+        }
+        for name, function in array_cases.items():
+            samples = measure(function, args.repeats)
+            frames = STACK_FRAMES if 'кадров' in name else 1
+            report.add('luma_array', samples, f'{width}x{height}', 'RGB', params={'variant': name, 'frames': frames})
+            best = min(samples)
+            print(f"   {name:26} {best:8.1f} {width * height * frames / best / 1000:9.1f}")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
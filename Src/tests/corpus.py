@@ -0,0 +1,172 @@
+# corpus.py
+"""
+Детерминированный генератор синтетического корпуса для бенчмарков
+Изображения содержат шум, градиенты, текстоподобные края и фотоподобные текстуры,
+поэтому кодирование JPEG/PNG и медианный фильтр работают как на реальных данных
+"""
+import argparse
+import os
+import random
+import string
+import sys
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont
+
+CONTENT_KINDS = ('noise', 'gradient', 'text', 'photo', 'mixed')
+COLOR_MODES = ('L', 'RGB', 'RGBA', 'P')
+ASPECT_RATIOS = ((4, 3), (16, 9), (3, 2), (1, 1), (9, 16), (21, 9))
+
+
+def _noise_band(rng: random.Random, size: tuple) -> Image.Image:
+    """Канал равномерного шума из генератора rng"""
+    return Image.frombytes('L', size, rng.randbytes(size[0] * size[1]))
+
+
+def _noise_rgb(rng: random.Random, size: tuple) -> Image.Image:
+    """Трёхканальный равномерный шум"""
+    return Image.merge('RGB', [_noise_band(rng, size) for _ in range(3)])
+
+
+def _gradient(rng: random.Random, size: tuple) -> Image.Image:
+    """Цветной градиент под случайным углом"""
+    bands = []
+    for _ in range(3):
+        band = Image.linear_gradient('L').rotate(rng.uniform(0, 360), resample=Image.Resampling.BILINEAR,
+                                                  expand=False, fillcolor=rng.randrange(256))
+        bands.append(band.resize(size, Image.Resampling.BILINEAR))
+    return Image.merge('RGB', bands)
+
+
+def _photo(rng: random.Random, size: tuple) -> Image.Image:
+    """
+    Фотоподобная текстура: крупные плавные пятна (шум низкого разрешения,
+    растянутый бикубически), средние детали и мелкое зерно
+    """
+    width, height = size
+    image = _gradient(rng, size)
+    for divisor, weight in ((64, 0.6), (8, 0.35)):
+        low = (max(2, width // divisor), max(2, height // divisor))
+        layer = _noise_rgb(rng, low).resize(size, Image.Resampling.BICUBIC)
+        image = Image.blend(image, layer, weight)
+    grain = _noise_band(rng, size).point(lambda v: 128 + (v - 128) // 8)
+    grain = Image.merge('RGB', (grain, grain, grain))
+    return ImageChops.add(image, grain, scale=1.0, offset=-128)
+
+
+def _text_edges(rng: random.Random, image: Image.Image, coverage: float = 0.5) -> Image.Image:
+    """Текстоподобные резкие края: строки случайных «слов», линии и рамки"""
+    image = image.copy()
+    draw = ImageDraw.Draw(image)
+    width, height = image.size
+    font_size = max(8, min(width, height) // 40)
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:   # Pillow < 10.1
+        font = ImageFont.load_default()
+
+    line_height = int(font_size * 1.4)
+    chars_per_line = max(1, width // max(1, font_size // 2))
+    lines = min(400, int(height * coverage) // line_height)
+    top = rng.randrange(max(1, height - lines * line_height))
+    alphabet = string.ascii_letters + string.digits + '      '
+    for index in range(lines):
+        text = ''.join(rng.choice(alphabet) for _ in range(chars_per_line))
+        color = tuple(rng.randrange(0, 80) for _ in range(3))
+        draw.text((rng.randrange(font_size), top + index * line_height), text, fill=color, font=font)
+
+    for _ in range(20):
+        x0, x1 = sorted(rng.randrange(width) for _ in range(2))
+        y0, y1 = sorted(rng.randrange(height) for _ in range(2))
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), outline=color, width=max(1, font_size // 6))
+        else:
+            draw.line((x0, y0, x1, y1), fill=color, width=max(1, font_size // 8))
+    return image
+
+
+def generate_image(width: int, height: int, kind: str = 'photo', mode: str = 'RGB',
+                   seed: int = 0) -> Image.Image:
+    """Одно синтетическое изображение; одинаковые аргументы дают одинаковые пиксели"""
+    if kind not in CONTENT_KINDS:
+        raise ValueError(f"Неизвестный тип содержимого: {kind}")
+    if mode not in COLOR_MODES:
+        raise ValueError(f"Неподдерживаемый режим: {mode}")
+
+    rng = random.Random(f"{seed}:{kind}:{width}x{height}:{mode}")
+    size = (width, height)
+    if kind == 'noise':
+        image = _noise_rgb(rng, size)
+    elif kind == 'gradient':
+        image = _gradient(rng, size)
+    elif kind == 'text':
+        image = _text_edges(rng, Image.new('RGB', size, (250, 250, 245)), coverage=0.8)
+    elif kind == 'photo':
+        image = _photo(rng, size)
+    else:
+        image = _text_edges(rng, _photo(rng, size), coverage=0.3)
+        image = image.filter(ImageFilter.SMOOTH)
+
+    if mode == 'L':
+        return image.convert('L')
+    if mode == 'RGBA':
+        alpha = _gradient(rng, size).getchannel(0)
+        image.putalpha(alpha)
+        return image
+    if mode == 'P':
+        return image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    return image
+
+
+def corpus_specs(count: int, megapixels: float = 2.0, seed: int = 0) -> list:
+    """Детерминированный список (width, height, kind, mode) с разными пропорциями и режимами"""
+    rng = random.Random(seed)
+    specs = []
+    for index in range(count):
+        ratio_w, ratio_h = ASPECT_RATIOS[index % len(ASPECT_RATIOS)]
+        pixels = megapixels * 1e6 * rng.uniform(0.5, 1.5)
+        unit = (pixels / (ratio_w * ratio_h)) ** 0.5
+        width, height = max(16, int(unit * ratio_w)), max(16, int(unit * ratio_h))
+        kind = CONTENT_KINDS[index % len(CONTENT_KINDS)]
+        mode = COLOR_MODES[rng.randrange(len(COLOR_MODES))]
+        specs.append((width, height, kind, mode))
+    return specs
+
+
+def generate_corpus(output_dir: str, count: int = 20, megapixels: float = 2.0,
+                    seed: int = 0) -> list:
+    """
+    Генерация корпуса на диск
+    RGB и L сохраняются в JPEG, RGBA и P - в PNG
+    Возвращает список словарей: path, width, height, kind, mode
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    corpus = []
+    for index, (width, height, kind, mode) in enumerate(corpus_specs(count, megapixels, seed)):
+        image = generate_image(width, height, kind, mode, seed + index)
+        ext = 'jpg' if mode in ('L', 'RGB') else 'png'
+        path = os.path.join(output_dir, f"corpus_{index:04d}_{kind}_{mode}_{width}x{height}.{ext}")
+        if ext == 'jpg':
+            image.save(path, quality=90)
+        else:
+            image.save(path)
+        corpus.append({'path': path, 'width': width, 'height': height, 'kind': kind, 'mode': mode})
+    return corpus
+
+
+def main(argv=None):
+    """Генерация корпуса из командной строки"""
+    parser = argparse.ArgumentParser(description="Генератор синтетического корпуса изображений")
+    parser.add_argument('output_dir', help="Папка для корпуса")
+    parser.add_argument('--count', type=int, default=20, help="Число изображений")
+    parser.add_argument('--megapixels', type=float, default=2.0, help="Средний размер, Мп")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.output_dir, args.count, args.megapixels, args.seed)
+    print(f"Создано изображений: {len(corpus)} в '{args.output_dir}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
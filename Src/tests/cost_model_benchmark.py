@@ -0,0 +1,86 @@
+# cost_model_benchmark.py
+"""
+Калибровка модели стоимости операций и проверка её точности
+Кривые подгоняются на нескольких размерах и сохраняются в config/cost_model.json;
+затем оценки сравниваются с замерами цепочек на размере, которого не было в калибровке
+"""
+import argparse
+import os
+import sys
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+from cost_model import DEFAULT_MODEL_PATH, calibrate
+from image_processor import ImageProcessor
+from logging_config import configure_logging
+
+CHAINS = {
+    'remove_noise(7) + resize': [{"op": "remove_noise", "strength": 7},
+                                 {"op": "resize_image", "width": 800, "height": 600, "mode": "fit"}],
+    'remove_noise(3) + grayscale': [{"op": "remove_noise", "strength": 3},
+                                    {"op": "convert_to_grayscale"}],
+    'resize(best) + grayscale': [{"op": "resize_image", "width": 1280, "height": 720, "quality": "best"},
+                                 {"op": "convert_to_grayscale"}],
+    'grayscale + resize(fast)': [{"op": "convert_to_grayscale"},
+                                 {"op": "resize_image", "width": 640, "height": 360, "quality": "fast"}],
+}
+
+
+def measure_chain(processor, image, operations: list, repeats: int) -> float:
+    """Лучшее из repeats время цепочки операций, ms"""
+    best = None
+    for _ in range(repeats):
+        processor.current_image = image
+        start_time = time.perf_counter()
+        for step in operations:
+            params = {key: value for key, value in step.items() if key != 'op'}
+            getattr(processor, step['op'])(**params)
+        elapsed = (time.perf_counter() - start_time) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Калибровка и проверка модели стоимости операций")
+    parser.add_argument('--repeats', type=int, default=3, help="Повторов на замер")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Куда сохранить модель")
+    parser.add_argument('--check-size', default='1920x1080', help="Размер для проверки точности")
+    parser.add_argument('--json', default='cost_model_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    configure_logging(mode='quiet')
+
+    print("\n📐 Калибровка кривых стоимости...")
+    start_time = time.perf_counter()
+    model = calibrate(repeats=args.repeats,
+                      image_factory=lambda width, height, mode:
+                      generate_image(width, height, 'photo', 'RGB', seed=1).convert(mode))
+    model.save(args.model)
+    print(f"   {len(model.curves)} кривых за {time.perf_counter() - start_time:.1f} с, "
+          f"сохранено в '{args.model}'")
+
+    width, height = (int(value) for value in args.check_size.split('x'))
+    image = generate_image(width, height, 'photo', 'RGB', seed=2)
+    processor = ImageProcessor()
+    report = BenchmarkResults('cost_model_benchmark')
+
+    print(f"\n🎯 Оценка против замера на {args.check_size}")
+    print(f"   {'ЦЕПОЧКА':30} {'оценка, ms':>11} {'замер, ms':>10} {'ошибка':>8} {'память, МБ':>11}")
+    for name, operations in CHAINS.items():
+        estimate = model.estimate(image.size, operations, image.mode)
+        measured = measure_chain(processor, image, operations, args.repeats)
+        error = (estimate['time_ms'] - measured) / measured * 100
+        report.add(name, [measured], args.check_size, 'RGB', estimated_ms=estimate['time_ms'],
+                   error_percent=error, peak_bytes=estimate['peak_bytes'])
+        print(f"   {name:30} {estimate['time_ms']:11.1f} {measured:10.1f} {error:+7.1f}% "
+              f"{estimate['peak_bytes'] / 2**20:11.1f}")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# noise_benchmark.py
+"""
+Бенчмарк шумоподавления:
+- импульсный шум: медианный фильтр по всему изображению против адаптивного
+  (только в пикселях с шумом) - время, PSNR и доля нетронутых пикселей
+- гауссов шум: время против PSNR для каждого метода denoise и самый дешёвый метод,
+  который проходит порог качества
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PIL import Image, ImageChops, ImageFilter
+import denoise
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+
+NOISE_LEVELS = (0.0, 0.001, 0.01, 0.05)
+
+
+def add_impulse_noise(image, fraction: float, seed: int = 0):
+    """Соль и перец в доле fraction пикселей"""
+    rng = random.Random(seed)
+    noisy = image.copy()
+    pixels = noisy.load()
+    white = (255,) * len(image.getbands())
+    black = (0,) * len(image.getbands())
+    for _ in range(int(image.width * image.height * fraction)):
+        position = (rng.randrange(image.width), rng.randrange(image.height))
+        pixels[position] = white if rng.random() < 0.5 else black
+    return noisy
+
+
+def add_gaussian_noise(image, sigma: float):
+    """Гауссов шум (одинаковый во всех каналах) с отклонением sigma"""
+    noise = Image.effect_noise(image.size, sigma).convert(image.mode)
+    return ImageChops.add(image, noise, 1.0, -128)
+
+
+def psnr(image, reference) -> float:
+    """Пиковое отношение сигнал/шум в dB (inf для совпадающих изображений)"""
+    histogram = ImageChops.difference(image, reference).histogram()
+    squared = sum(count * (index % 256) ** 2 for index, count in enumerate(histogram))
+    if not squared:
+        return float('inf')
+    mse = squared / (image.width * image.height * len(image.getbands()))
+    return 10 * math.log10(255 ** 2 / mse)
+
+
+def unchanged_fraction(image, source) -> float:
+    """Доля пикселей, которые фильтр не изменил"""
+    changed = ImageChops.difference(image, source).convert('L').point(lambda value: 255 if value else 0)
+    return 1 - changed.histogram()[255] / (image.width * image.height)
+
+
+def adaptive_without_numpy(image, size):
+    saved, denoise.np = denoise.np, None
+    try:
+        return denoise.adaptive_median(image, size)[0]
+    finally:
+        denoise.np = saved
+
+
+METHODS = {
+    'uniform': lambda image, size: image.filter(ImageFilter.MedianFilter(size)),
+    'adaptive': lambda image, size: denoise.adaptive_median(image, size)[0],
+    'adaptive (без numpy)': adaptive_without_numpy,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк методов шумоподавления")
+    parser.add_argument('--size', default='1920x1080', help="Размер тестового изображения")
+    parser.add_argument('--strength', type=int, default=3, help="Окно медианного фильтра")
+    parser.add_argument('--repeats', type=int, default=3, help="Повторов на замер")
+    parser.add_argument('--sigma', type=float, default=20.0, help="Отклонение гауссова шума")
+    parser.add_argument('--min-psnr', type=float, default=28.0,
+                        help="Порог качества для выбора самого дешёвого метода, dB")
+    parser.add_argument('--json', default='noise_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+
+    width, height = (int(value) for value in args.size.split('x'))
+    clean = generate_image(width, height, 'photo', 'RGB', seed=1)
+    report = BenchmarkResults('noise_benchmark')
+
+    print(f"\n🎚️  Шумоподавление {args.size}, окно {args.strength}"
+          f"{'' if denoise.np is not None else ' (numpy не установлен)'}")
+    print(f"   {'ШУМ':>6} {'МЕТОД':22} {'ms':>8} {'PSNR, dB':>9} {'нетронуто':>10}")
+    for level in NOISE_LEVELS:
+        noisy = add_impulse_noise(clean, level)
+        print(f"   {level * 100:5.1f}% {'(без фильтра)':22} {'':>8} {psnr(noisy, clean):9.1f}")
+        for name, method in METHODS.items():
+            if name == 'adaptive' and denoise.np is None:
+                continue
+            samples = []
+            for _ in range(args.repeats):
+                start_time = time.perf_counter()
+                result = method(noisy, args.strength)
+                samples.append((time.perf_counter() - start_time) * 1000)
+            quality = psnr(result, clean)
+            untouched = unchanged_fraction(result, noisy)
+            report.add('remove_noise', samples, args.size, 'RGB',
+                       params={'method': name, 'noise': level, 'strength': args.strength},
+                       psnr_db=quality, unchanged=untouched)
+            print(f"   {'':>6} {name:22} {min(samples):8.1f} {quality:9.1f} {untouched * 100:9.1f}%")
+
+    print(f"\n🌫️  Гауссов шум sigma={args.sigma:g}: время против PSNR, {args.size}")
+    print(f"   {'СОДЕРЖИМОЕ':10} {'МЕТОД':14} {'strength':>8} {'ms':>8} {'PSNR, dB':>9}")
+    for kind in ('photo', 'mixed'):
+        reference = generate_image(width, height, kind, 'RGB', seed=1)
+        noisy = add_gaussian_noise(reference, args.sigma)
+        print(f"   {kind:10} {'(без фильтра)':14} {'':>8} {'':>8} {psnr(noisy, reference):9.1f}")
+        passing = []
+        for method in denoise.available_methods():
+            for strength in (3, 5):
+                samples = []
+                for _ in range(args.repeats):
+                    start_time = time.perf_counter()
+                    result = denoise.denoise(noisy, method, strength)
+                    samples.append((time.perf_counter() - start_time) * 1000)
+                quality = psnr(result, reference)
+                report.add('denoise', samples, args.size, 'RGB',
+                           params={'method': method, 'strength': strength, 'content': kind,
+                                   'sigma': args.sigma}, psnr_db=quality)
+                print(f"   {'':10} {method:14} {strength:8d} {min(samples):8.1f} {quality:9.1f}")
+                if quality >= args.min_psnr:
+                    passing.append((min(samples), method, strength))
+        if passing:
+            best_time, method, strength = min(passing)
+            print(f"   🎯 {kind}: самый дешёвый метод с PSNR >= {args.min_psnr:g} dB - "
+                  f"{method} (strength={strength}, {best_time:.1f} ms)")
+        else:
+            print(f"   ⚠️  {kind}: ни один метод не достиг {args.min_psnr:g} dB")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
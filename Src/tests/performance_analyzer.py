@@ -1,11 +1,47 @@
 # performance_analyzer.py
+import argparse
 import time
 import statistics
 import os
 import sys
+import tempfile
+from collections import defaultdict
 from functools import wraps
-from PIL import Image
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from image_processor import ImageProcessor
+from profiling import profile_to
+import resize_engine
+from benchmark_results import BenchmarkResults, compare_main
+from corpus import generate_corpus, generate_image
+from cost_model import default_model
+
+# Цепочки, которые выполняют замеры обработки, - для сравнения с оценкой модели стоимости
+PROCESSING_CHAIN = [{'op': 'remove_noise', 'strength': strength} for strength in (1, 3, 5, 7)] + [
+    {'op': 'convert_to_grayscale'},
+    {'op': 'resize_image', 'width': 1600, 'height': 900},
+    {'op': 'resize_image', 'width': 800, 'height': 600},
+    {'op': 'resize_image', 'width': 400, 'height': 300},
+]
+QUICK_CHAIN = [{'op': 'remove_noise', 'strength': 3}, {'op': 'convert_to_grayscale'},
+               {'op': 'resize_image', 'width': 400, 'height': 300}]
+
+
+def print_estimate_verdict(label, measured_ms, estimate):
+    """Сравнение замера с оценкой модели стоимости вместо фиксированных порогов"""
+    model = default_model()
+    ratio = measured_ms / estimate['time_ms'] if estimate['time_ms'] else 1.0
+    details = f"{measured_ms:.1f} ms, оценка {estimate['time_ms']:.1f} ms"
+    if ratio <= 1.15:
+        print(f"   ✅ {label}: в пределах оценки ({details})")
+    elif ratio <= 1.5:
+        print(f"   ⚡ {label}: медленнее оценки на {(ratio - 1) * 100:.0f}% ({details})")
+    else:
+        print(f"   📉 {label}: медленнее оценки на {(ratio - 1) * 100:.0f}% ({details}) - возможна регрессия")
+    if not model.calibrated:
+        print("   ℹ️  Модель стоимости не откалибрована для этой машины: "
+              "запустите tests/cost_model_benchmark.py")
 
 def performance_decorator(iterations=5, warmup=1):
     """Универсальный декоратор для измерения производительности"""
@@ -20,6 +56,11 @@ def performance_decorator(iterations=5, warmup=1):
                     print("   🔥 Прогрев...")
                 func(*args, **kwargs)
             
+            # Замеры, накопленные во время прогрева, не учитываются
+            warmup_hook = getattr(args[0], 'on_warmup_done', None) if args else None
+            if warmup_hook is not None:
+                warmup_hook()
+            
             # Измерение времени выполнения
             execution_times = []
             for i in range(iterations):
@@ -42,6 +83,7 @@ def performance_decorator(iterations=5, warmup=1):
                 'median_time_ms': statistics.median(execution_times),
                 'stdev_time_ms': statistics.stdev(execution_times) if len(execution_times) > 1 else 0,
                 'total_time_ms': sum(execution_times),
+                'samples_ms': execution_times,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
             }
             
@@ -58,31 +100,33 @@ def performance_decorator(iterations=5, warmup=1):
 class CrossPlatformImageProcessorBenchmark:
     """Кроссплатформенный бенчмарк для ImageProcessor"""
     
-    def __init__(self):
+    def __init__(self, corpus_count=20, corpus_megapixels=2.0):
         self.processor = ImageProcessor()
         self.results = {}
+        # Машиночитаемые результаты: операция x размер x режим x формат
+        self.report = BenchmarkResults('CrossPlatformImageProcessorBenchmark')
+        self._samples = defaultdict(list)
         # Тестовые размеры изображений
         self.test_sizes = [
             (100, 100),      # Очень маленькое (для тестов)
             (800, 600),      # Small
             (1920, 1080),    # HD
         ]
+        # Разнородный корпус: разные содержимое, режимы и пропорции (0 - не запускать)
+        self.corpus_count = corpus_count
+        self.corpus_megapixels = corpus_megapixels
     
     def create_test_images(self):
         """Создание тестовых изображений разных размеров и форматов"""
         print("🖼️ Создание тестовых изображений...")
         
         for width, height in self.test_sizes:
-            # RGB JPEG (качественный)
-            rgb_image = Image.new('RGB', (width, height), color=(255, 100, 100))
-            # Добавляем немного шума для реалистичности
-            for x in range(0, width, 50):
-                for y in range(0, height, 50):
-                    rgb_image.putpixel((x, y), (200, 150, 100))
+            # RGB JPEG (качественный): фотоподобная текстура из детерминированного корпуса
+            rgb_image = generate_image(width, height, 'photo', 'RGB', seed=1)
             rgb_image.save(f'test_rgb_{width}x{height}.jpg', quality=95)
             
-            # Grayscale PNG
-            gray_image = Image.new('L', (width, height), color=150)
+            # Grayscale PNG: текстура с текстоподобными краями
+            gray_image = generate_image(width, height, 'mixed', 'L', seed=2)
             gray_image.save(f'test_gray_{width}x{height}.png')
             
             print(f"   ✅ Создано: {width}x{height} (JPG, PNG)")
@@ -107,6 +151,32 @@ class CrossPlatformImageProcessorBenchmark:
         
         print(f"   ✅ Удалено файлов: {removed_count}")
     
+    def _record(self, operation, time_ms, size='', mode='', format='', **params):
+        """Запоминание одного замера для машиночитаемого отчёта"""
+        key = (operation, size, mode, format, tuple(sorted(params.items())))
+        self._samples[key].append(time_ms)
+    
+    def on_warmup_done(self):
+        """Вызывается декоратором после прогрева: прогревочные замеры отбрасываются"""
+        self._samples.clear()
+    
+    def _flush_samples(self):
+        """Перенос накопленных замеров в отчёт"""
+        for (operation, size, mode, format, params), samples in self._samples.items():
+            self.report.add(operation, samples, size=size, mode=mode, format=format,
+                            params=dict(params))
+        self._samples.clear()
+    
+    def _finish_section(self, stats):
+        """Завершение раздела: детальные замеры и общее время функции бенчмарка"""
+        self._flush_samples()
+        self.report.add(stats['function'], stats['samples_ms'], size='all')
+    
+    def save_json(self, path):
+        """Сохранение машиночитаемых результатов в JSON"""
+        self._flush_samples()
+        self.report.save(path)
+    
     def get_file_size(self, filename):
         """Получение размера файла в KB"""
         if os.path.exists(filename):
@@ -122,11 +192,11 @@ class CrossPlatformImageProcessorBenchmark:
         for width, height in self.test_sizes:
             # Тестируем разные форматы
             formats = [
-                (f'test_rgb_{width}x{height}.jpg', 'JPEG'),
-                (f'test_gray_{width}x{height}.png', 'PNG')
+                (f'test_rgb_{width}x{height}.jpg', 'JPEG', 'RGB'),
+                (f'test_gray_{width}x{height}.png', 'PNG', 'L')
             ]
             
-            for filename, format_name in formats:
+            for filename, format_name, color_mode in formats:
                 key = f"{format_name}_{width}x{height}"
                 file_size = self.get_file_size(filename)
                 
@@ -136,6 +206,7 @@ class CrossPlatformImageProcessorBenchmark:
                 load_time = (time.perf_counter() - start_time) * 1000
                 
                 if success:
+                    self._record('load_image', load_time, f"{width}x{height}", color_mode, format_name)
                     load_results[key] = {
                         'success': True,
                         'time_ms': load_time,
@@ -171,6 +242,7 @@ class CrossPlatformImageProcessorBenchmark:
             success = self.processor.remove_noise(strength)
             processing_time = (time.perf_counter() - start_time) * 1000
             
+            self._record('remove_noise', processing_time, '1920x1080', 'RGB', strength=strength)
             processing_results[f'noise_strength_{strength}'] = {
                 'time_ms': processing_time,
                 'success': success
@@ -182,6 +254,7 @@ class CrossPlatformImageProcessorBenchmark:
         start_time = time.perf_counter()
         success = self.processor.convert_to_grayscale()
         processing_time = (time.perf_counter() - start_time) * 1000
+        self._record('convert_to_grayscale', processing_time, '1920x1080', 'RGB')
         processing_results['grayscale'] = {
             'time_ms': processing_time,
             'success': success
@@ -196,6 +269,7 @@ class CrossPlatformImageProcessorBenchmark:
             success = self.processor.resize_image(width, height)
             resize_time = (time.perf_counter() - start_time) * 1000
             
+            self._record('resize_image', resize_time, '1920x1080', 'RGB', target=f"{width}x{height}")
             processing_results[f'resize_{width}x{height}'] = {
                 'time_ms': resize_time,
                 'success': success
@@ -230,6 +304,7 @@ class CrossPlatformImageProcessorBenchmark:
             save_time = (time.perf_counter() - start_time) * 1000
             
             file_size = self.get_file_size(filename) if success else 0
+            self._record('save_image', save_time, '1920x1080', self.processor.current_image.mode, format_name)
             
             save_results[format_name] = {
                 'time_ms': save_time,
@@ -259,6 +334,7 @@ class CrossPlatformImageProcessorBenchmark:
         success = self.processor.undo()
         undo_time = (time.perf_counter() - start_time) * 1000
         
+        self._record('undo', undo_time, '800x600', 'RGB')
         undo_results['undo'] = {
             'time_ms': undo_time,
             'success': success
@@ -270,6 +346,7 @@ class CrossPlatformImageProcessorBenchmark:
         success = self.processor.reset_to_original()
         reset_time = (time.perf_counter() - start_time) * 1000
         
+        self._record('reset_to_original', reset_time, '800x600', 'RGB')
         undo_results['reset'] = {
             'time_ms': reset_time,
             'success': success
@@ -283,6 +360,7 @@ class CrossPlatformImageProcessorBenchmark:
         print("\n🔄 Тестирование полного рабочего процесса...")
         
         workflow_steps = {}
+        self.processor.reset_stats()
         total_start = time.perf_counter()
         
         print("   📋 Последовательность операций:")
@@ -319,6 +397,8 @@ class CrossPlatformImageProcessorBenchmark:
         
         # Общее время
         workflow_steps['total'] = (time.perf_counter() - total_start) * 1000
+        for step, time_ms in workflow_steps.items():
+            self._record(f'workflow_{step}', time_ms, '1920x1080', 'RGB', 'JPEG')
         
         # Вывод результатов
         print("\n   📊 Результаты рабочего процесса:")
@@ -329,8 +409,78 @@ class CrossPlatformImageProcessorBenchmark:
         print(f"      {'='*25}")
         print(f"      {'ОБЩЕЕ ВРЕМЯ':15} {workflow_steps['total']:8.2f} ms 🎯")
         
+        # Память, выделенная под изображения за весь процесс (по статистике процессора)
+        allocated = sum(op['allocated_bytes']['sum'] for op in self.processor.stats().values())
+        print(f"      {'ВЫДЕЛЕНО':15} {allocated / 2**20:8.2f} MB")
+        self.report.add('workflow_allocation', [workflow_steps['total']], size='1920x1080',
+                        mode='RGB', format='JPEG', allocated_bytes=allocated)
+        
         return workflow_steps
     
+    def benchmark_corpus(self):
+        """
+        Рабочий процесс на разнородном корпусе: загрузка, шумоподавление, grayscale,
+        уменьшение вдвое, сохранение; замеры группируются по содержимому и режиму
+        """
+        print(f"\n🗂️ Корпус: {self.corpus_count} изображений ~{self.corpus_megapixels} Мп")
+        by_group = defaultdict(list)
+        with tempfile.TemporaryDirectory() as work_dir:
+            corpus = generate_corpus(work_dir, self.corpus_count, self.corpus_megapixels)
+            for item in corpus:
+                size = f"{item['width']}x{item['height']}"
+                format_name = 'JPEG' if item['path'].endswith('.jpg') else 'PNG'
+                start_time = time.perf_counter()
+                success = (self.processor.load_image(item['path'])
+                           and self.processor.remove_noise(3)
+                           and self.processor.convert_to_grayscale()
+                           and self.processor.resize_image(max(1, item['width'] // 2),
+                                                           max(1, item['height'] // 2))
+                           and self.processor.save_image(os.path.join(work_dir, 'corpus_output.png')))
+                time_ms = (time.perf_counter() - start_time) * 1000
+                if not success:
+                    print(f"      ❌ {os.path.basename(item['path'])}: Ошибка обработки")
+                    continue
+                self._record('corpus_workflow', time_ms, size, item['mode'], format_name,
+                             kind=item['kind'])
+                by_group[(item['kind'], item['mode'])].append(time_ms)
+        
+        corpus_results = {}
+        for (kind, mode), samples in sorted(by_group.items()):
+            corpus_results[f'{kind}_{mode}'] = statistics.mean(samples)
+            print(f"      ✅ {kind:9} {mode:5} {statistics.mean(samples):8.2f} ms "
+                  f"(изображений: {len(samples)})")
+        return corpus_results
+    
+    def benchmark_resize_strategies(self, repeats=3):
+        """Сравнение стратегий изменения размера на уменьшении 4K -> миниатюра"""
+        print("\n📐 Тестирование стратегий изменения размера (4K -> миниатюры)...")
+        
+        source_size = (3840, 2160)
+        source = generate_image(*source_size, 'photo', 'RGB', seed=1)
+        targets = [(1280, 720), (320, 180), (160, 90)]
+        
+        strategy_results = {}
+        for width, height in targets:
+            baseline_ms = None
+            for quality in resize_engine.QUALITY_PRESETS:
+                times = []
+                for _ in range(repeats):
+                    start_time = time.perf_counter()
+                    resize_engine.resize(source, width, height, quality=quality)
+                    times.append((time.perf_counter() - start_time) * 1000)
+                
+                time_ms = statistics.median(times)
+                for sample in times:
+                    self._record('resize_engine', sample, '3840x2160', 'RGB',
+                                 quality=quality, target=f"{width}x{height}")
+                if quality == 'best':
+                    baseline_ms = time_ms
+                strategy_results[f'{quality}_{width}x{height}'] = time_ms
+                speedup = baseline_ms / time_ms if time_ms > 0 else 0
+                print(f"      ✅ {quality:9} {width}x{height}: {time_ms:8.2f} ms (x{speedup:.1f})")
+        
+        return strategy_results
+    
     def run_comprehensive_benchmark(self):
         """Запуск комплексного бенчмарка"""
         print("🎯 ЗАПУСК КОМПЛЕКСНОГО АНАЛИЗА ПРОИЗВОДИТЕЛЬНОСТИ")
@@ -344,22 +494,36 @@ class CrossPlatformImageProcessorBenchmark:
             print("\n1. 📊 ОПЕРАЦИИ ЗАГРУЗКИ")
             load_results, load_stats = self.benchmark_load_operations()
             self.results['load'] = load_stats
+            self._finish_section(load_stats)
             
             print("\n2. 📊 ОПЕРАЦИИ ОБРАБОТКИ")
             processing_results, processing_stats = self.benchmark_processing_operations()
             self.results['processing'] = processing_stats
+            self._finish_section(processing_stats)
             
             print("\n3. 📊 ОПЕРАЦИИ СОХРАНЕНИЯ")
             save_results, save_stats = self.benchmark_save_operations()
             self.results['save'] = save_stats
+            self._finish_section(save_stats)
             
             print("\n4. 📊 ОПЕРАЦИИ ОТМЕНЫ")
             undo_results, undo_stats = self.benchmark_undo_operations()
             self.results['undo'] = undo_stats
+            self._finish_section(undo_stats)
             
             print("\n5. 📊 ПОЛНЫЙ РАБОЧИЙ ПРОЦЕСС")
             workflow_results = self.benchmark_complete_workflow()
             self.results['workflow'] = workflow_results
+            self._flush_samples()
+            
+            print("\n6. 📊 СТРАТЕГИИ ИЗМЕНЕНИЯ РАЗМЕРА")
+            self.results['resize_strategies'] = self.benchmark_resize_strategies()
+            self._flush_samples()
+            
+            if self.corpus_count:
+                print("\n7. 📊 РАЗНОРОДНЫЙ КОРПУС")
+                self.results['corpus'] = self.benchmark_corpus()
+                self._flush_samples()
             
             # Вывод суммарных результатов
             self._print_summary()
@@ -409,12 +573,8 @@ class CrossPlatformImageProcessorBenchmark:
         if 'processing' in self.results:
             proc_stats = self.results['processing']
             if 'mean_time_ms' in proc_stats:
-                if proc_stats['mean_time_ms'] < 50:
-                    print("   ✅ Отличная производительность обработки")
-                elif proc_stats['mean_time_ms'] < 100:
-                    print("   ⚡ Хорошая производительность обработки")
-                else:
-                    print("   📉 Производительность обработки можно улучшить")
+                estimate = default_model().estimate((1920, 1080), PROCESSING_CHAIN, 'RGB')
+                print_estimate_verdict("Обработка", proc_stats['mean_time_ms'], estimate)
         
         if 'undo' in self.results:
             undo_stats = self.results['undo']
@@ -435,7 +595,7 @@ def quick_performance_test():
     processor = ImageProcessor()
     
     # Создаем тестовое изображение
-    test_image = Image.new('RGB', (800, 600), color=(255, 100, 100))
+    test_image = generate_image(800, 600, 'photo', 'RGB', seed=1)
     test_image.save('quick_test.jpg')
     
     try:
@@ -467,12 +627,9 @@ def quick_performance_test():
         
         # Анализ результатов
         print(f"\n💡 Результаты быстрого теста:")
-        if total_time < 200:
-            print("   ✅ Отличная производительность!")
-        elif total_time < 500:
-            print("   ⚡ Хорошая производительность")
-        else:
-            print("   📉 Производительность можно улучшить")
+        estimate = default_model().estimate((800, 600), QUICK_CHAIN, 'RGB',
+                                            input_format='jpg', output_format='jpg')
+        print_estimate_verdict("Быстрый тест", total_time, estimate)
     
     finally:
         # Очистка
@@ -480,8 +637,72 @@ def quick_performance_test():
             if os.path.exists(file):
                 os.remove(file)
 
-# Запуск бенчмарка
-if __name__ == "__main__":
+def save_text_results(results, path='performance_results.txt'):
+    """Сохранение сводных результатов в текстовый файл"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("РЕЗУЛЬТАТЫ ТЕСТИРОВАНИЯ ПРОИЗВОДИТЕЛЬНОСТИ\n")
+        f.write("=" * 50 + "\n\n")
+        for category, stats in results.items():
+            f.write(f"{category.upper()}:\n")
+            for key, value in stats.items():
+                if key == 'samples_ms':
+                    continue
+                if isinstance(value, float):
+                    f.write(f"  {key}: {value:.2f}\n")
+                else:
+                    f.write(f"  {key}: {value}\n")
+            f.write("\n")
+    print(f"💾 Результаты сохранены в '{path}'")
+
+
+def run_full_benchmark(json_path='performance_results.json', corpus_count=20, corpus_megapixels=2.0):
+    """Полный бенчмарк с сохранением текстового и JSON-отчётов"""
+    benchmark = CrossPlatformImageProcessorBenchmark(corpus_count, corpus_megapixels)
+    results = benchmark.run_comprehensive_benchmark()
+    if results:
+        save_text_results(results)
+        benchmark.save_json(json_path)
+        print(f"💾 Машиночитаемые результаты сохранены в '{json_path}'")
+    return results
+
+
+def run_selected(args):
+    """Запуск выбранного из командной строки режима"""
+    if args.mode == 'quick':
+        quick_performance_test()
+        return 0
+    return 0 if run_full_benchmark(args.json, args.corpus, args.corpus_mp) else 1
+
+
+def main(argv=None):
+    """
+    Точка входа:
+      performance_analyzer.py full [--json results.json] [--corpus 20] [--corpus-mp 2] [--profile stacks.txt]
+      performance_analyzer.py quick [--profile stacks.txt]
+      performance_analyzer.py compare old.json new.json [--threshold 10]
+    Без аргументов - интерактивный выбор
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        return compare_main(argv[1:])
+    
+    if argv:
+        parser = argparse.ArgumentParser(description="Бенчмарк ImageProcessor")
+        parser.add_argument('mode', choices=['full', 'quick'])
+        parser.add_argument('--json', default='performance_results.json',
+                            help="Файл для машиночитаемых результатов")
+        parser.add_argument('--corpus', type=int, default=20,
+                            help="Изображений разнородного корпуса в полном режиме (0 - пропустить)")
+        parser.add_argument('--corpus-mp', type=float, default=2.0,
+                            help="Средний размер изображений корпуса в мегапикселях")
+        parser.add_argument('--profile', metavar='PATH',
+                            help="Профилировать прогон: свёрнутые стеки и разбивка по фазам в PATH")
+        args = parser.parse_args(argv)
+        if args.profile:
+            with profile_to(args.profile):
+                return run_selected(args)
+        return run_selected(args)
+    
     print("Выберите тип тестирования:")
     print("1 - Полный бенчмарк (рекомендуется)")
     print("2 - Быстрый тест")
@@ -491,32 +712,20 @@ if __name__ == "__main__":
         
         if choice == "1":
             print("\n" + "="*50)
-            benchmark = CrossPlatformImageProcessorBenchmark()
-            results = benchmark.run_comprehensive_benchmark()
-            
-            # Сохранение результатов в файл
-            if results:
-                with open('performance_results.txt', 'w', encoding='utf-8') as f:
-                    f.write("РЕЗУЛЬТАТЫ ТЕСТИРОВАНИЯ ПРОИЗВОДИТЕЛЬНОСТИ\n")
-                    f.write("=" * 50 + "\n\n")
-                    for category, stats in results.items():
-                        f.write(f"{category.upper()}:\n")
-                        for key, value in stats.items():
-                            if isinstance(value, float):
-                                f.write(f"  {key}: {value:.2f}\n")
-                            else:
-                                f.write(f"  {key}: {value}\n")
-                        f.write("\n")
-                print("💾 Результаты сохранены в 'performance_results.txt'")
-                
+            run_full_benchmark()
         elif choice == "2":
             quick_performance_test()
         else:
             print("Запуск полного бенчмарка по умолчанию...")
-            benchmark = CrossPlatformImageProcessorBenchmark()
-            results = benchmark.run_comprehensive_benchmark()
+            run_full_benchmark()
             
     except KeyboardInterrupt:
         print("\n\n❌ Тестирование прервано пользователем")
     except Exception as e:
-        print(f"\n❌ Ошибка: {e}")
\ No newline at end of file
+        print(f"\n❌ Ошибка: {e}")
+    return 0
+
+
+# Запуск бенчмарка
+if __name__ == "__main__":
+    sys.exit(main())
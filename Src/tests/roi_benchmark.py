@@ -0,0 +1,86 @@
+# roi_benchmark.py
+"""
+Бенчмарк операций над областью (ROI) большого скана:
+исправление небольшого дефекта через region против обработки всего кадра -
+время операции и отмены, память под историю отмены и прирост памяти процессора
+(копия кадра, если бы операция над областью копировала исходное, видна в приросте)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import denoise   # импорт denoise и numpy не входит в первый замер
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+from image_processor import ImageProcessor
+from logging_config import configure_logging
+
+OPERATIONS = {
+    'remove_noise(5)': lambda processor, region: processor.remove_noise(5, region=region),
+    'remove_noise(nlm)': lambda processor, region: processor.remove_noise(5, method='nlm', region=region),
+    'convert_to_grayscale': lambda processor, region: processor.convert_to_grayscale(region=region),
+}
+
+
+def timed(function) -> float:
+    start_time = time.perf_counter()
+    function()
+    return (time.perf_counter() - start_time) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк операций над областью изображения")
+    parser.add_argument('--size', default='7680x4320', help="Размер скана (10000x10000 - 100 Мпикс)")
+    parser.add_argument('--region', type=int, default=256, help="Сторона области дефекта, пиксели")
+    parser.add_argument('--skip-full', action='store_true', help="Не замерять обработку всего кадра")
+    parser.add_argument('--json', default='roi_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    configure_logging(mode='quiet')
+
+    width, height = (int(value) for value in args.size.split('x'))
+    left, top = width // 3, height // 3
+    region = (left, top, left + args.region, top + args.region)
+    report = BenchmarkResults('roi_benchmark')
+    processor = ImageProcessor()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'scan.jpg')
+        generate_image(width, height, 'photo', 'RGB', seed=1).save(path, quality=90)
+        processor.load_image(path)
+
+        print(f"\n🔍 Операции над областью {args.region}x{args.region} скана {args.size} "
+              f"({width * height / 1e6:.0f} Мпикс)")
+        print(f"   {'ОПЕРАЦИЯ':22} {'ОБЛАСТЬ':8} {'ms':>9} {'отмена, ms':>11} {'история, МБ':>12} "
+              f"{'прирост, МБ':>12}")
+        for name, operation in OPERATIONS.items():
+            variants = (('region', region),) if args.skip_full else (('кадр', None), ('region', region))
+            for label, target in variants:
+                if name == 'remove_noise(nlm)' and target is None and width * height > 10_000_000:
+                    continue   # nlm по всему кадру идёт минутами - сравнение и так очевидно
+                # Каждый замер - первая операция после загрузки/сброса: текущее делит объект с исходным
+                held = processor.memory_usage()['total']
+                operation_ms = timed(lambda: operation(processor, target))
+                usage = processor.memory_usage()
+                growth = usage['total'] - held
+                history = usage['undo_patch'] + (usage['previous'] if processor.previous_image is not None
+                                                 and processor.previous_image is not processor.current_image
+                                                 else 0)
+                undo_ms = timed(processor.undo)
+                report.add(name, [operation_ms], args.size, 'RGB',
+                           params={'target': label, 'region': args.region},
+                           undo_ms=undo_ms, history_bytes=history, growth_bytes=growth)
+                print(f"   {name:22} {label:8} {operation_ms:9.1f} {undo_ms:11.2f} {history / 2**20:12.2f} "
+                      f"{growth / 2**20:12.2f}")
+                processor.reset_to_original()
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
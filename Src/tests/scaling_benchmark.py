@@ -0,0 +1,331 @@
+# scaling_benchmark.py
+"""
+Бенчмарк масштабирования: пропускная способность в зависимости
+от размера изображения и от числа рабочих процессов
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_processor import ImageProcessor
+from recipe import Recipe
+from worker_pool import WorkerPool
+from benchmark_results import BenchmarkResults
+from corpus import generate_corpus, generate_image
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+# Размеры до 8K и ~50 Мп
+SIZE_SWEEP = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+    (3840, 2160),
+    (7680, 4320),
+    (8660, 5773),
+]
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ (None, если недоступно)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS - байты
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_baseline_mb() -> float:
+    """
+    База для прироста RSS в дочернем процессе
+    Процесс, порождённый fork, наследует RSS и пик родителя, поэтому пик сначала
+    сбрасывается до текущего RSS (Linux, /proc/self/clear_refs); где сброса нет,
+    базой остаётся унаследованный пик
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def create_image(path: str, width: int, height: int):
+    """Фотоподобное тестовое изображение из детерминированного корпуса"""
+    generate_image(width, height, 'photo', 'RGB', seed=width * height).save(path, quality=90)
+
+
+def run_pipeline(path: str, output_path: str) -> tuple:
+    """
+    Типичный конвейер в отдельном процессе:
+    загрузка, шумоподавление, grayscale, уменьшение вдвое, сохранение
+    Возвращает (время в секундах или None, если шаг не удался; прирост пикового RSS в МБ)
+    """
+    baseline = rss_baseline_mb()
+    processor = ImageProcessor()
+    start_time = time.perf_counter()
+    success = processor.load_image(path)
+    if success:
+        width, height = processor.current_image.size
+        success = (processor.remove_noise(3) and processor.convert_to_grayscale()
+                   and processor.resize_image(max(1, width // 2), max(1, height // 2))
+                   and processor.save_image(output_path))
+    elapsed = time.perf_counter() - start_time
+    peak = peak_rss_mb()
+    growth = peak - baseline if peak is not None else None
+    return (elapsed if success else None), growth
+
+
+def run_recipe_fresh(recipe_dict: dict, path: str, output_path: str) -> bool:
+    """Рецепт на свежем ImageProcessor - так выглядит задача без прогретого процессора"""
+    return Recipe.from_dict(recipe_dict).apply(ImageProcessor(), path, output_path)
+
+
+def fit_linear(xs: list, ys: list) -> dict:
+    """Метод наименьших квадратов: y = intercept + slope * x, плюс R^2"""
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx if sxx else 0.0
+    intercept = mean_y - slope * mean_x
+    ss_tot = sum((y - mean_y) ** 2 for y in ys)
+    ss_res = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    r_squared = 1 - ss_res / ss_tot if ss_tot else 1.0
+    return {'intercept': intercept, 'slope': slope, 'r_squared': r_squared}
+
+
+def fit_amdahl(workers: list, speedups: list) -> dict:
+    """
+    Подбор доли параллельной части p по закону Амдала:
+    1/S = (1 - p) + p/w  =>  1/S - 1 = p * (1/w - 1)
+    """
+    xs = [1 / w - 1 for w in workers]
+    ys = [1 / s - 1 for s in speedups]
+    sxx = sum(x * x for x in xs)
+    p = sum(x * y for x, y in zip(xs, ys)) / sxx if sxx else 1.0
+    p = max(0.0, min(1.0, p))
+    max_speedup = 1 / (1 - p) if p < 1 else float('inf')
+    return {'parallel_fraction': p, 'max_speedup': max_speedup}
+
+
+def benchmark_sizes(work_dir: str, sizes: list, repeats: int, report: BenchmarkResults) -> list:
+    """Зависимость времени конвейера от размера изображения (один процесс)"""
+    print("\n📐 Масштабирование по размеру изображения")
+    print(f"   {'РАЗМЕР':>12} {'Мп':>6} {'изобр/с':>9} {'МБ/с':>8} {'прирост RSS, МБ':>16}")
+    points = []
+    for width, height in sizes:
+        path = os.path.join(work_dir, f'scale_{width}x{height}.jpg')
+        create_image(path, width, height)
+        output_path = os.path.join(work_dir, f'scale_out_{width}x{height}.jpg')
+
+        samples = []
+        rss = None
+        for _ in range(repeats):
+            # Каждый замер - в свежем процессе, чтобы прирост RSS относился к этому размеру
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                elapsed, rss = executor.submit(run_pipeline, path, output_path).result()
+            samples.append(elapsed)
+
+        elapsed = min(samples)
+        megapixels = width * height / 1e6
+        megabytes = width * height * 3 / 1024 / 1024
+        point = {
+            'size': f"{width}x{height}",
+            'megapixels': megapixels,
+            'images_per_sec': 1 / elapsed,
+            'mb_per_sec': megabytes / elapsed,
+            'rss_growth_mb': rss,
+        }
+        points.append(point)
+        report.add('pipeline', [s * 1000 for s in samples], size=point['size'], mode='RGB',
+                   format='JPEG', images_per_sec=point['images_per_sec'],
+                   mb_per_sec=point['mb_per_sec'], rss_growth_mb=rss)
+        rss_text = f"{rss:16.1f}" if rss is not None else f"{'-':>16}"
+        print(f"   {point['size']:>12} {megapixels:6.1f} {point['images_per_sec']:9.2f} "
+              f"{point['mb_per_sec']:8.1f} {rss_text}")
+    return points
+
+
+def benchmark_workers(work_dir: str, size: tuple, batch: int, max_workers: int,
+                      report: BenchmarkResults) -> list:
+    """Пропускная способность пакета в зависимости от числа рабочих процессов"""
+    width, height = size
+    print(f"\n👷 Масштабирование по числу процессов ({batch} x {width}x{height})")
+    print(f"   {'ПРОЦЕССЫ':>9} {'изобр/с':>9} {'МБ/с':>8} {'ускорение':>10}")
+    path = os.path.join(work_dir, f'batch_{width}x{height}.jpg')
+    create_image(path, width, height)
+    megabytes = width * height * 3 / 1024 / 1024
+
+    points = []
+    for workers in range(1, max_workers + 1):
+        outputs = [os.path.join(work_dir, f'batch_out_{i}.jpg') for i in range(batch)]
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_pipeline, [path] * batch, outputs))
+        elapsed = time.perf_counter() - start_time
+
+        rss_values = [rss for _, rss in results if rss is not None]
+        point = {
+            'workers': workers,
+            'images_per_sec': batch / elapsed,
+            'mb_per_sec': batch * megabytes / elapsed,
+            'rss_growth_mb': max(rss_values) if rss_values else None,
+        }
+        point['speedup'] = point['images_per_sec'] / points[0]['images_per_sec'] if points else 1.0
+        points.append(point)
+        report.add('batch_pipeline', [elapsed * 1000], size=f"{width}x{height}", mode='RGB',
+                   format='JPEG', params={'workers': workers}, **point)
+        print(f"   {workers:9} {point['images_per_sec']:9.2f} {point['mb_per_sec']:8.1f} "
+              f"{point['speedup']:10.2f}")
+    return points
+
+
+def benchmark_corpus(work_dir: str, count: int, megapixels: float, workers: int,
+                     report: BenchmarkResults) -> dict:
+    """
+    Пропускная способность на разнородном корпусе (содержимое, режимы, пропорции)
+    Время конвейера группируется по содержимому и режиму
+    """
+    print(f"\n🗂️ Корпус: {count} изображений ~{megapixels} Мп, процессов: {workers}")
+    corpus_dir = os.path.join(work_dir, 'corpus')
+    corpus = generate_corpus(corpus_dir, count, megapixels)
+    # PNG для всех результатов: после конвейера RGBA (и P с прозрачностью) остаются с альфой
+    outputs = [os.path.join(work_dir, f'corpus_out_{i}.png') for i in range(len(corpus))]
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_pipeline, [item['path'] for item in corpus], outputs))
+    elapsed = time.perf_counter() - start_time
+
+    groups = {}
+    succeeded = []
+    for item, (seconds, _) in zip(corpus, results):
+        if seconds is None:
+            continue
+        succeeded.append(item)
+        groups.setdefault((item['kind'], item['mode']), []).append(seconds * 1000)
+    print(f"   {'СОДЕРЖИМОЕ':>10} {'РЕЖИМ':>6} {'ms/изобр':>9}")
+    for (kind, mode), samples in sorted(groups.items()):
+        report.add('corpus_pipeline', samples, mode=mode, params={'kind': kind})
+        print(f"   {kind:>10} {mode:>6} {sum(samples) / len(samples):9.1f}")
+
+    # Пропускная способность - только по обработанным изображениям: быстрые ошибки её не завышают
+    failed = len(corpus) - len(succeeded)
+    megabytes = sum(item['width'] * item['height'] * 3 for item in succeeded) / 1024 / 1024
+    summary = {
+        'images_per_sec': len(succeeded) / elapsed,
+        'mb_per_sec': megabytes / elapsed,
+        'failed': failed,
+    }
+    report.add('corpus_batch', [elapsed * 1000], params={'workers': workers}, **summary)
+    print(f"   Итого: {summary['images_per_sec']:.2f} изобр/с, {summary['mb_per_sec']:.1f} МБ/с, "
+          f"ошибок: {failed}")
+    return summary
+
+
+def benchmark_job_overhead(work_dir: str, jobs: int, report: BenchmarkResults) -> dict:
+    """
+    Накладные расходы на задачу для маленького изображения:
+    процесс на задачу, общий процесс со свежим процессором на задачу и пул прогретых процессов
+    """
+    print(f"\n🔥 Накладные расходы на задачу ({jobs} задач, 256x256)")
+    path = os.path.join(work_dir, 'overhead_256x256.jpg')
+    create_image(path, 256, 256)
+    # Без медианного фильтра: пиксельной работы мало, и разница между стратегиями видна
+    recipe = Recipe([{"op": "convert_to_grayscale"},
+                     {"op": "resize_image", "width": 128, "height": 128}])
+    outputs = [os.path.join(work_dir, f'overhead_out_{i}.jpg') for i in range(jobs)]
+
+    def process_per_job():
+        for output_path in outputs:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                executor.submit(run_recipe_fresh, recipe.to_dict(), path, output_path).result()
+
+    def fresh_processor():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            list(executor.map(run_recipe_fresh, [recipe.to_dict()] * jobs, [path] * jobs, outputs))
+
+    def warm_pool():
+        with WorkerPool(recipe, processes=1) as pool:
+            list(pool.run((path, output_path) for output_path in outputs))
+
+    per_job = {}
+    for name, run in (('process_per_job', process_per_job), ('fresh_processor', fresh_processor),
+                      ('warm_pool', warm_pool)):
+        start_time = time.perf_counter()
+        run()
+        per_job[name] = (time.perf_counter() - start_time) * 1000 / jobs
+        report.add('job_overhead', [per_job[name]], size='256x256', mode='RGB', format='JPEG',
+                   params={'strategy': name})
+        print(f"   {name:18} {per_job[name]:8.2f} ms/задачу")
+    return per_job
+
+
+def main(argv=None):
+    """Прогон по размерам, прогон по числу процессов и подбор кривых масштабирования"""
+    parser = argparse.ArgumentParser(description="Бенчмарк масштабирования ImageProcessor")
+    parser.add_argument('--max-mp', type=float, default=60.0,
+                        help="Максимальный размер в мегапикселях для прогона по размерам")
+    parser.add_argument('--repeats', type=int, default=2, help="Повторов на каждый размер")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help="Максимальное число процессов (по умолчанию - число ядер)")
+    parser.add_argument('--batch', type=int, default=16, help="Изображений в пакете")
+    parser.add_argument('--batch-size', default='1920x1080', help="Размер изображений пакета")
+    parser.add_argument('--overhead-jobs', type=int, default=50,
+                        help="Задач в замере накладных расходов (0 - пропустить)")
+    parser.add_argument('--corpus', type=int, default=20,
+                        help="Изображений разнородного корпуса (0 - пропустить)")
+    parser.add_argument('--corpus-mp', type=float, default=2.0,
+                        help="Средний размер изображений корпуса в мегапикселях")
+    parser.add_argument('--json', default='scaling_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in SIZE_SWEEP if size[0] * size[1] / 1e6 <= args.max_mp]
+    batch_size = tuple(int(v) for v in args.batch_size.lower().split('x'))
+    report = BenchmarkResults('scaling_benchmark')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        size_points = benchmark_sizes(work_dir, sizes, args.repeats, report)
+        worker_points = benchmark_workers(work_dir, batch_size, args.batch,
+                                          args.max_workers, report)
+        if args.corpus:
+            benchmark_corpus(work_dir, args.corpus, args.corpus_mp, args.max_workers, report)
+        if args.overhead_jobs:
+            benchmark_job_overhead(work_dir, args.overhead_jobs, report)
+
+    fits = {}
+    if len(size_points) > 1:
+        fits['seconds_per_image'] = fit_linear(
+            [p['megapixels'] for p in size_points],
+            [1 / p['images_per_sec'] for p in size_points])
+        fit = fits['seconds_per_image']
+        print(f"\n📈 Время на изображение ≈ {fit['intercept'] * 1000:.1f} ms + "
+              f"{fit['slope'] * 1000:.1f} ms/Мп (R² = {fit['r_squared']:.3f})")
+    if len(worker_points) > 1:
+        fits['workers'] = fit_amdahl([p['workers'] for p in worker_points],
+                                     [p['speedup'] for p in worker_points])
+        fit = fits['workers']
+        print(f"📈 Параллельная доля p ≈ {fit['parallel_fraction']:.2f}, "
+              f"предельное ускорение ≈ {fit['max_speedup']:.1f}x")
+
+    data = report.to_dict()
+    data['fits'] = fits
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# scheduler_benchmark.py
+"""
+Бенчмарк смешанной нагрузки: bulk-переобработка и интерактивные запросы на одних потоках
+Сравнивает очередь FIFO и планировщик с приоритетами и вытеснением по задержке
+интерактивных задач (p50/p99) и пропускной способности bulk
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_results import BenchmarkResults, summarize
+from corpus import generate_image
+from logging_config import configure_logging
+from recipe import Recipe
+from scheduler import Scheduler
+
+BULK_RECIPE = Recipe([{"op": "remove_noise", "strength": 3},
+                      {"op": "resize_image", "width": 960, "height": 540},
+                      {"op": "convert_to_grayscale"}], 'png')
+INTERACTIVE_RECIPE = Recipe([{"op": "resize_image", "width": 320, "height": 240}], 'jpg')
+
+
+def run_mixed_load(policy: str, workers: int, bulk_jobs: int, interactive_jobs: int,
+                   interval: float, bulk_path: str, interactive_path: str, output_dir: str) -> dict:
+    """Все bulk-задачи ставятся сразу, интерактивные приходят с интервалом interval"""
+    with Scheduler(workers=workers, policy=policy) as scheduler:
+        start_time = time.perf_counter()
+        bulk = [scheduler.submit(BULK_RECIPE, bulk_path, os.path.join(output_dir, f'bulk_{index}.png'))
+                for index in range(bulk_jobs)]
+        interactive = []
+        for index in range(interactive_jobs):
+            time.sleep(interval)
+            interactive.append(scheduler.submit(
+                INTERACTIVE_RECIPE, interactive_path,
+                os.path.join(output_dir, f'interactive_{index}.jpg'), priority='interactive'))
+        interactive_ms = [future.result()['latency_ms'] for future in interactive]
+        bulk_results = [future.result() for future in bulk]
+        elapsed = time.perf_counter() - start_time
+        stats = scheduler.stats()
+    return {
+        'interactive_ms': interactive_ms,
+        'bulk_ms': [result['latency_ms'] for result in bulk_results],
+        'bulk_per_second': bulk_jobs / elapsed,
+        'preemptions': stats['bulk']['preemptions'],
+        'deadline_missed': stats['interactive']['deadline_missed'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк планировщика смешанной нагрузки")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Рабочих потоков")
+    parser.add_argument('--bulk-jobs', type=int, default=12, help="Bulk-задач (1280x720)")
+    parser.add_argument('--interactive-jobs', type=int, default=20, help="Интерактивных задач (640x480)")
+    parser.add_argument('--interval', type=float, default=0.1, help="Интервал интерактивных запросов, с")
+    parser.add_argument('--json', default='scheduler_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    configure_logging(mode='quiet')   # журнал по каждой операции исказил бы задержки
+
+    report = BenchmarkResults('scheduler_benchmark')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bulk_path = os.path.join(temp_dir, 'bulk.png')
+        interactive_path = os.path.join(temp_dir, 'interactive.jpg')
+        generate_image(1280, 720, 'photo', 'RGB', seed=1).save(bulk_path)
+        generate_image(640, 480, 'photo', 'RGB', seed=2).save(interactive_path)
+
+        print(f"\n⚖️  Смешанная нагрузка: {args.bulk_jobs} bulk + {args.interactive_jobs} "
+              f"интерактивных каждые {args.interval * 1000:.0f} ms, потоков: {args.workers}")
+        print(f"   {'ПОЛИТИКА':10} {'p50, ms':>9} {'p99, ms':>9} {'bulk/с':>8} "
+              f"{'вытеснений':>11} {'сроков пропущено':>17}")
+        for policy in ('fifo', 'priority'):
+            result = run_mixed_load(policy, args.workers, args.bulk_jobs, args.interactive_jobs,
+                                    args.interval, bulk_path, interactive_path, temp_dir)
+            latency = summarize(result['interactive_ms'])
+            report.add('interactive', result['interactive_ms'], '640x480', 'RGB',
+                       params={'policy': policy})
+            report.add('bulk', result['bulk_ms'], '1280x720', 'RGB', params={'policy': policy},
+                       bulk_per_second=result['bulk_per_second'], preemptions=result['preemptions'])
+            print(f"   {policy:10} {latency['p50_ms']:9.1f} {latency['p99_ms']:9.1f} "
+                  f"{result['bulk_per_second']:8.2f} {result['preemptions']:11d} "
+                  f"{result['deadline_missed']:17d}")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
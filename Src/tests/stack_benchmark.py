@@ -0,0 +1,87 @@
+# stack_benchmark.py
+"""
+Бенчмарк пакетной обработки кадров одного размера (подготовка обучающих данных):
+цикл по кадрам через ImageProcessor (с полным логированием и в режиме quiet)
+против process_stack - одна векторная операция на всю пачку (N, H, W, C),
+без накладных расходов Python и логов на кадр
+"""
+import argparse
+import os
+import sys
+import time
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import frame_stack
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+from image_processor import ImageProcessor
+from logging_config import configure_logging, shutdown_logging
+
+FRAME_SIZES = ((32, 32), (64, 64), (128, 128), (256, 256))
+
+
+def per_frame(processor, frames, target: tuple):
+    """Прежний путь: каждый кадр отдельно через процессор"""
+    results = []
+    for frame in frames:
+        processor.current_image = frame
+        processor.convert_to_grayscale(output_mode='L')
+        processor.resize_image(*target)
+        results.append(processor.current_image)
+    return frame_stack.np.stack([frame_stack.np.asarray(image) for image in results])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетной обработки кадров")
+    parser.add_argument('--frames', type=int, default=256, help="Кадров в пачке")
+    parser.add_argument('--repeats', type=int, default=3, help="Повторов на замер")
+    parser.add_argument('--json', default='stack_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+    if frame_stack.np is None:
+        print("⚠️  numpy не установлен - бенчмарк пропущен")
+        return 0
+    np = frame_stack.np
+    console = open(os.devnull, 'w')   # строки лога verbose не смешиваются с таблицей
+    report = BenchmarkResults('stack_benchmark')
+    processor = ImageProcessor()
+
+    print(f"\n🎞️  Пачка из {args.frames} кадров: grayscale(L) + resize до половины")
+    print(f"   {'КАДР':>9} {'ПУТЬ':20} {'ms':>9} {'кадр/с':>9} {'ускорение':>10}")
+    print("   (ускорение - относительно цикла по кадрам в режиме quiet)")
+    for width, height in FRAME_SIZES:
+        frames = [generate_image(width, height, 'photo', 'RGB', seed=index % 8) for index in range(args.frames)]
+        stack = np.stack([np.asarray(frame) for frame in frames])
+        target = (width // 2, height // 2)
+        operations = [{"op": "convert_to_grayscale", "output_mode": "L"},
+                      {"op": "resize_image", "width": target[0], "height": target[1]}]
+        timings = {}
+        for name, log_mode, function in (
+                ('по кадрам, verbose', 'verbose', lambda: per_frame(processor, frames, target)),
+                ('по кадрам', 'quiet', lambda: per_frame(processor, frames, target)),
+                ('process_stack', 'quiet', lambda: processor.process_stack(stack, operations))):
+            configure_logging(mode=log_mode, stream=console)
+            samples = []
+            for _ in range(args.repeats):
+                start_time = time.perf_counter()
+                result = function()
+                samples.append((time.perf_counter() - start_time) * 1000)
+            timings[name] = min(samples)
+            report.add('frame_stack', samples, f'{width}x{height}', 'RGB',
+                       params={'variant': name, 'frames': args.frames})
+            speedup = timings['по кадрам'] / timings[name] if 'по кадрам' in timings else 1.0
+            print(f"   {width:>4}x{height:<4} {name:20} {timings[name]:9.1f} "
+                  f"{args.frames / timings[name] * 1000:9.0f} {speedup:9.1f}x")
+        reference = per_frame(processor, frames[:4], target)
+        difference = int(np.abs(result[:4].astype(int) - reference).max())
+        print(f"   {'':9} максимальное расхождение с покадровым путём: {difference}")
+
+    shutdown_logging()
+    console.close()
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
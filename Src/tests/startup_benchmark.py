@@ -0,0 +1,97 @@
+# startup_benchmark.py
+"""
+Бенчмарк холодного старта: время запуска свежего интерпретатора
+до готовности CLI и рабочего процесса и самые дорогие импорты (-X importtime)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark_results import BenchmarkResults
+
+# Модули проекта лежат на уровень выше папки tests
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Сценарий -> код, который выполняется в свежем процессе
+SCENARIOS = {
+    'interpreter': "pass",
+    'import_package': "import image_processor",
+    'processor': "from image_processor import ImageProcessor; ImageProcessor()",
+    'batch_cli': "import batch",
+    'watcher_cli': "import watcher",
+    'worker_first_image': ("from image_processor import ImageProcessor; "
+                           "processor = ImageProcessor(); processor.load_image({path!r})"),
+    'gui_module': "import main",
+}
+
+
+def parse_importtime(stderr: str) -> list:
+    """Импорты верхнего уровня из вывода -X importtime: (модуль, накопленное время в ms)"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):   # вложенный импорт
+            continue
+        modules.append((name.strip(), int(cumulative) / 1000))
+    return modules
+
+
+def run_scenario(code: str, work_dir: str, repeats: int) -> tuple:
+    """Время запуска процесса (ms) по каждому повтору и разбор импортов последнего запуска"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC_DIR))
+    samples = []
+    stderr = ''
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=work_dir,
+                                env=env, capture_output=True, text=True)
+        samples.append((time.perf_counter() - start_time) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        stderr = result.stderr
+    return samples, parse_importtime(stderr)
+
+
+def main(argv=None):
+    """Прогон всех сценариев холодного старта"""
+    parser = argparse.ArgumentParser(description="Бенчмарк времени холодного старта")
+    parser.add_argument('--repeats', type=int, default=10, help="Запусков на сценарий")
+    parser.add_argument('--top', type=int, default=5, help="Сколько самых дорогих импортов показать")
+    parser.add_argument('--json', default='startup_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+
+    report = BenchmarkResults('startup_benchmark')
+    print("\n🚀 Холодный старт процессов")
+    print(f"   {'СЦЕНАРИЙ':20} {'p50, ms':>9} {'min, ms':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'input.png')
+        subprocess.run([sys.executable, '-c',
+                        f"from PIL import Image; Image.new('RGB', (64, 64)).save({path!r})"],
+                       check=True)
+        for scenario, code in SCENARIOS.items():
+            try:
+                samples, modules = run_scenario(code.format(path=path), work_dir, args.repeats)
+            except RuntimeError as e:
+                print(f"   {scenario:20} ⚠️  пропущен: {e}")
+                continue
+            case = report.add('startup', samples, params={'scenario': scenario},
+                              imports=dict(modules))
+            print(f"   {scenario:20} {case['p50_ms']:9.1f} {case['min_ms']:9.1f}")
+            heaviest = sorted(modules, key=lambda item: item[1], reverse=True)[:args.top]
+            for name, cumulative_ms in heaviest:
+                if cumulative_ms >= 1.0:
+                    print(f"      {name:30} {cumulative_ms:7.1f} ms")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
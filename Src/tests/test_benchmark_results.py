@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from benchmark_results import BenchmarkResults, compare, percentile
+
+
+def test_percentiles():
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.5) == 3.0
+    assert percentile([10.0, 20.0], 0.5) == 15.0
+    results = BenchmarkResults()
+    case = results.add('resize_image', [5.0, 1.0, 3.0], size='800x600', mode='RGB')
+    assert case['p50_ms'] == 3.0
+    assert case['max_ms'] == 5.0
+    assert 'python' in results.to_dict()['environment']
+
+
+def test_compare_flags_regressions():
+    baseline = BenchmarkResults()
+    baseline.add('remove_noise', [10.0, 10.0], size='1920x1080', params={'strength': 3})
+    baseline.add('save_image', [5.0, 5.0], size='1920x1080', format='PNG')
+    current = BenchmarkResults()
+    current.add('remove_noise', [13.0, 13.0], size='1920x1080', params={'strength': 3})
+    current.add('save_image', [5.2, 5.2], size='1920x1080', format='PNG')
+    
+    rows = compare(baseline.to_dict(), current.to_dict(), threshold_pct=10)
+    flagged = {row['case']: row['regression'] for row in rows}
+    assert flagged == {
+        'remove_noise|strength=3|1920x1080||': True,
+        'save_image|1920x1080||PNG': False,
+    }
+
+
+def test_scaling_fits():
+    from scaling_benchmark import fit_amdahl, fit_linear
+    
+    linear = fit_linear([1.0, 2.0, 4.0], [0.15, 0.25, 0.45])
+    assert abs(linear['slope'] - 0.1) < 1e-9
+    assert abs(linear['intercept'] - 0.05) < 1e-9
+    
+    # Ускорения для p = 0.8: S(w) = 1 / (0.2 + 0.8 / w)
+    workers = [1, 2, 4, 8]
+    speedups = [1 / (0.2 + 0.8 / w) for w in workers]
+    assert abs(fit_amdahl(workers, speedups)['parallel_fraction'] - 0.8) < 1e-9
+
+
+def test_corpus_is_deterministic(tmp_path):
+    from corpus import corpus_specs, generate_corpus, generate_image
+    
+    first = generate_image(64, 48, 'mixed', 'RGB', seed=7)
+    second = generate_image(64, 48, 'mixed', 'RGB', seed=7)
+    assert first.tobytes() == second.tobytes()
+    assert generate_image(64, 48, 'photo', 'P').mode == 'P'
+    
+    specs = corpus_specs(6, megapixels=0.01, seed=3)
+    assert specs == corpus_specs(6, megapixels=0.01, seed=3)
+    assert len({width * 1000 // height for width, height, _, _ in specs}) > 1
+    corpus = generate_corpus(str(tmp_path), count=4, megapixels=0.01)
+    assert len(corpus) == 4
@@ -0,0 +1,98 @@
+# transport_benchmark.py
+"""
+Бенчмарк передачи изображений между процессами: pickle против разделяемой памяти,
+и параллельные remove_noise / resize полосами против однопроцессных
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Модули проекта лежат на уровень выше папки tests
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PIL import Image, ImageFilter
+from shared_images import ParallelExecutor, export_image, import_image, map_image, _attach
+from benchmark_results import BenchmarkResults
+from corpus import generate_image
+
+SIZES = [(1920, 1080), (3840, 2160), (7680, 4320)]
+
+
+def _echo(image):
+    """Рабочий процесс получает изображение и возвращает его обратно (pickle в обе стороны)"""
+    return image
+
+
+def _touch(ref):
+    """Рабочий процесс получает только ссылку и читает изображение на месте"""
+    image = map_image(_attach(ref.name).buf, ref)
+    return image.getpixel((0, 0))
+
+
+def measure(func, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start_time) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк передачи изображений между процессами")
+    parser.add_argument('--repeats', type=int, default=5, help="Повторов на замер")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Процессов для параллельных операций")
+    parser.add_argument('--json', default='transport_results.json', help="Файл результатов")
+    args = parser.parse_args(argv)
+
+    report = BenchmarkResults('transport_benchmark')
+    with ProcessPoolExecutor(max_workers=1) as single, \
+            ParallelExecutor(workers=args.workers, min_pixels=0) as parallel:
+        single.submit(_echo, None).result()   # прогрев процесса
+
+        print("\n📦 Передача изображения в процесс и обратно")
+        print(f"   {'РАЗМЕР':>10} {'pickle, ms':>11} {'shm, ms':>9}")
+        for width, height in SIZES:
+            image = generate_image(width, height, 'photo', 'RGB', seed=1)
+            size = f"{width}x{height}"
+
+            def via_shared_memory():
+                buffer, ref = export_image(image, parallel.pool)
+                single.submit(_touch, ref).result()
+                import_image(buffer, ref)
+                buffer.release()
+
+            pickled = measure(lambda: single.submit(_echo, image).result(), args.repeats)
+            shared = measure(via_shared_memory, args.repeats)
+            report.add('transport', pickled, size, 'RGB', params={'method': 'pickle'})
+            report.add('transport', shared, size, 'RGB', params={'method': 'shared_memory'})
+            print(f"   {size:>10} {min(pickled):11.1f} {min(shared):9.1f}")
+
+        print(f"\n🧵 Полосы в {args.workers} процессах против одного потока")
+        print(f"   {'ОПЕРАЦИЯ':24} {'РАЗМЕР':>10} {'1 поток, ms':>12} {'полосы, ms':>11}")
+        for width, height in SIZES[:2]:
+            image = generate_image(width, height, 'photo', 'RGB', seed=2)
+            size = f"{width}x{height}"
+            half = (width // 2, height // 2)
+            cases = (
+                ('remove_noise(3)', lambda: image.filter(ImageFilter.MedianFilter(3)),
+                 lambda: parallel.median_filter(image, 3)),
+                ('resize 1/2 LANCZOS', lambda: image.resize(half, Image.Resampling.LANCZOS),
+                 lambda: parallel.resize(image, half, Image.Resampling.LANCZOS)),
+            )
+            for name, serial_op, parallel_op in cases:
+                serial = measure(serial_op, args.repeats)
+                striped = measure(parallel_op, args.repeats)
+                report.add(name, serial, size, 'RGB', params={'workers': 1})
+                report.add(name, striped, size, 'RGB', params={'workers': args.workers})
+                print(f"   {name:24} {size:>10} {min(serial):12.1f} {min(striped):11.1f}")
+
+    report.save(args.json)
+    print(f"💾 Результаты сохранены в '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
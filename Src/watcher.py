@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from image_processor import ImageProcessor
+from recipe import Recipe
+
+SUPPORTED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class DirectoryWatcher:
+    """
+    Режим непрерывной обработки: опрос входной папки, обработка новых файлов
+    по рецепту в пуле потоков и перенос исходников в папку обработанных
+    Состояние хранится в журнале (JSON Lines), поэтому после сбоя работа продолжается
+    """
+
+    def __init__(self, input_dir: str, recipe: Recipe, output_dir: str = 'output',
+                 processed_dir: str = None, failed_dir: str = None, journal_path: str = None,
+                 workers: int = 4, poll_interval: float = 1.0, settle_time: float = 2.0,
+                 memory_budget: int = None):
+        self.input_dir = input_dir
+        self.recipe = recipe
+        self.output_dir = output_dir
+        self.processed_dir = processed_dir or os.path.join(input_dir, 'processed')
+        self.failed_dir = failed_dir or os.path.join(input_dir, 'failed')
+        self.journal_path = journal_path or os.path.join(input_dir, '.watcher_journal.jsonl')
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.memory_budget = memory_budget
+        # Просматривается только сама входная папка, поэтому вложенные в неё папки результатов,
+        # обработанных и неудачных не читаются; совпадающая с ней - читалась бы по кругу
+        for folder in (self.output_dir, self.processed_dir, self.failed_dir):
+            if os.path.abspath(folder) == os.path.abspath(input_dir):
+                raise ValueError(f"Папка {folder} не может совпадать с наблюдаемой папкой")
+
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._journal_lock = threading.Lock()
+        self._candidates = {}   # путь -> (размер, mtime, время последнего изменения)
+        self._in_progress = set()
+        self._journal_state = {}
+
+        for folder in (self.output_dir, self.processed_dir, self.failed_dir):
+            os.makedirs(folder, exist_ok=True)
+        self._recover()
+
+    def _processor(self) -> ImageProcessor:
+        """Один прогретый процессор на поток"""
+        if not hasattr(self._local, 'processor'):
+            self._local.processor = ImageProcessor(memory_budget=self.memory_budget)
+        return self._local.processor
+
+    def _write_journal(self, name: str, state: str, **details):
+        """Добавление записи в журнал состояний"""
+        entry = {"file": name, "state": state, "timestamp": datetime.now().isoformat()}
+        entry.update(details)
+        with self._journal_lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_state[name] = state
+
+    def _recover(self):
+        """
+        Восстановление после сбоя: файлы, обработанные до сбоя, только переносятся,
+        начатые, но не завершённые - обрабатываются заново. Журнал сжимается
+        """
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue   # недописанная строка при сбое
+                    self._journal_state[entry['file']] = entry['state']
+
+        pending = {}
+        for name, state in self._journal_state.items():
+            source = os.path.join(self.input_dir, name)
+            if not os.path.exists(source):
+                continue
+            if state == 'done':
+                self._move(source, self.processed_dir)
+            elif state == 'failed':
+                self._move(source, self.failed_dir)
+            else:
+                pending[name] = state
+                self.logger.info(f"Незавершённая обработка будет повторена: {name}")
+
+        # В сжатом журнале остаются только незавершённые записи
+        self._journal_state = pending
+        with open(self.journal_path, 'w', encoding='utf-8') as f:
+            for name, state in pending.items():
+                f.write(json.dumps({"file": name, "state": state}, ensure_ascii=False) + '\n')
+
+    def _move(self, path: str, target_dir: str):
+        """Перенос файла без перезаписи одноимённых"""
+        target = os.path.join(target_dir, os.path.basename(path))
+        if os.path.exists(target):
+            stem, ext = os.path.splitext(os.path.basename(path))
+            target = os.path.join(target_dir, f"{stem}_{datetime.now():%Y%m%d%H%M%S%f}{ext}")
+        shutil.move(path, target)
+
+    def scan(self) -> list:
+        """
+        Поиск файлов, готовых к обработке
+        Файл готов, если его размер и время изменения не менялись settle_time секунд
+        """
+        now = time.monotonic()
+        ready = []
+        seen = set()
+        with os.scandir(self.input_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (not entry.is_file() or name.startswith('.')
+                        or not name.lower().endswith(SUPPORTED_EXTENSIONS)
+                        or name in self._in_progress):
+                    continue
+                seen.add(name)
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous = self._candidates.get(name)
+                if previous is None or previous[:2] != signature:
+                    self._candidates[name] = signature + (now,)
+                elif now - previous[2] >= self.settle_time:
+                    ready.append(name)
+
+        # Забываем файлы, которые исчезли до обработки
+        for name in list(self._candidates):
+            if name not in seen:
+                del self._candidates[name]
+        return sorted(ready)
+
+    def process_file(self, name: str) -> bool:
+        """Обработка одного файла по рецепту"""
+        source = os.path.join(self.input_dir, name)
+        output_path = self.recipe.output_path(source, self.output_dir)
+        self._write_journal(name, 'started')
+        try:
+            success = self.recipe.apply(self._processor(), source, output_path)
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки {name}: {str(e)}")
+            success = False
+
+        self._write_journal(name, 'done' if success else 'failed', output=output_path)
+        self._move(source, self.processed_dir if success else self.failed_dir)
+        return success
+
+    def run(self, stop_event: threading.Event = None, max_idle_cycles: int = None) -> dict:
+        """
+        Основной цикл наблюдения
+        stop_event: событие для остановки извне
+        max_idle_cycles: завершить работу после стольких циклов без новых файлов
+        """
+        stop_event = stop_event or threading.Event()
+        counters = {'processed': 0, 'failed': 0}
+        idle_cycles = 0
+
+        def finished(name, future):
+            success = future.exception() is None and future.result()
+            with self._journal_lock:
+                self._in_progress.discard(name)
+                counters['processed' if success else 'failed'] += 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while not stop_event.is_set():
+                ready = self.scan()
+                for name in ready:
+                    with self._journal_lock:
+                        self._in_progress.add(name)
+                    self._candidates.pop(name, None)
+                    future = executor.submit(self.process_file, name)
+                    future.add_done_callback(lambda f, name=name: finished(name, f))
+
+                idle = not ready and not self._in_progress and not self._candidates
+                idle_cycles = idle_cycles + 1 if idle else 0
+                if max_idle_cycles is not None and idle_cycles >= max_idle_cycles:
+                    break
+                stop_event.wait(self.poll_interval)
+
+        self.logger.info(f"Наблюдение завершено: обработано {counters['processed']}, "
+                         f"ошибок {counters['failed']}")
+        return counters
+
+
+def main(argv=None):
+    """Точка входа режима наблюдения за папкой (то же, что python -m image_processor watch)"""
+    from image_processor.cli import main as cli_main
+    return cli_main(['watch'] + list(sys.argv[1:] if argv is None else argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
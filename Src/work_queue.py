@@ -0,0 +1,343 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from batch import discover_inputs, output_paths
+from recipe import Recipe
+
+# Состояния задачи
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+
+class WorkQueue:
+    """
+    Долговечная очередь задач в SQLite - замена внешнему брокеру для распределённых пакетов
+    Координатор делит входы на шарды, рабочие процессы берут задачи в аренду (lease).
+    Аренда истекает через lease_seconds: задача упавшего или зависшего рабочего
+    снова становится доступной; после max_attempts попыток она считается неудачной
+    Только для процессов одного узла: режим WAL держит общий индекс в разделяемой памяти
+    и не работает через сетевые файловые системы (NFS, SMB); каждому процессу - своё подключение
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Транзакции управляются явно (BEGIN IMMEDIATE при выдаче аренды)
+        self.connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS batches (
+                id TEXT PRIMARY KEY,
+                recipe TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT NOT NULL,
+                shard INTEGER NOT NULL,
+                input_path TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                started_at REAL,
+                finished_at REAL,
+                elapsed_ms REAL,
+                error TEXT
+            )
+        """)
+        # Номера шардов свои в каждом пакете: аренда выбирает по паре (batch_id, shard)
+        self.connection.execute("DROP INDEX IF EXISTS tasks_state")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_batch_shard ON tasks (state, batch_id, shard, id)")
+
+    def submit(self, recipe: Recipe, inputs: list, output_dir: str, shard_size: int = 50,
+               roots: list = None) -> str:
+        """
+        Постановка пакета в очередь; возвращает идентификатор пакета
+        roots - папки, из которых раскрыты входы (пути результатов повторяют их структуру)
+        """
+        batch_id = uuid.uuid4().hex[:12]
+        rows = []
+        targets = output_paths(recipe, inputs, output_dir, roots)
+        for index, path in enumerate(inputs):
+            output_path = targets[path]
+            rows.append((batch_id, index // shard_size, os.path.abspath(path), output_path, PENDING))
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute("INSERT INTO batches VALUES (?, ?, ?)",
+                                    (batch_id, json.dumps(recipe.to_dict()), time.time()))
+            self.connection.executemany(
+                "INSERT INTO tasks (batch_id, shard, input_path, output_path, state) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+        return batch_id
+
+    def recipe(self, batch_id: str) -> Recipe:
+        row = self.connection.execute("SELECT recipe FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        return Recipe.from_dict(json.loads(row[0]))
+
+    def _expire_leases(self, now: float):
+        # Истёкшие аренды без оставшихся попыток - неудачные задачи, остальные - снова в очередь
+        self.connection.execute(
+            "UPDATE tasks SET state = ?, error = 'аренда истекла', finished_at = ?, "
+            "lease_owner = NULL, lease_expires = NULL "
+            "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts))
+        self.connection.execute(
+            "UPDATE tasks SET state = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE state = ? AND lease_expires < ?",
+            (PENDING, LEASED, now))
+
+    def expire_leases(self):
+        """
+        Разбор истёкших аренд без выдачи новых: задачи возвращаются в очередь
+        или, если попытки исчерпаны, становятся неудачными, даже когда ни один рабочий не опрашивает очередь
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._expire_leases(time.time())
+
+    def lease(self, worker_id: str, limit: int = 10) -> list:
+        """
+        Аренда до limit задач одного шарда одного пакета (новые и с истёкшей арендой)
+        Пакеты выдаются в порядке постановки, шарды пакета - по порядку
+        Возвращает список словарей id / batch_id / input_path / output_path / attempts
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._expire_leases(now)
+            # id растёт в порядке постановки: первая доступная задача - из самого раннего пакета и шарда
+            row = self.connection.execute(
+                "SELECT batch_id, shard FROM tasks WHERE state = ? ORDER BY id LIMIT 1",
+                (PENDING,)).fetchone()
+            if row is None:
+                return []
+            rows = self.connection.execute(
+                "SELECT id, batch_id, input_path, output_path, attempts FROM tasks "
+                "WHERE state = ? AND batch_id = ? AND shard = ? ORDER BY id LIMIT ?",
+                (PENDING, row[0], row[1], limit)).fetchall()
+            self.connection.executemany(
+                "UPDATE tasks SET state = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, started_at = ? WHERE id = ?",
+                [(LEASED, worker_id, now + self.lease_seconds, now, task_id) for task_id, *_ in rows])
+        return [{'id': task_id, 'batch_id': batch_id, 'input_path': input_path,
+                 'output_path': output_path, 'attempts': attempts + 1}
+                for task_id, batch_id, input_path, output_path, attempts in rows]
+
+    def renew(self, worker_id: str, task_ids: list):
+        """Продление аренды задач, которые рабочий ещё не закончил"""
+        expires = time.time() + self.lease_seconds
+        self.connection.executemany(
+            "UPDATE tasks SET lease_expires = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+            [(expires, task_id, LEASED, worker_id) for task_id in task_ids])
+
+    def complete(self, task_id: int, worker_id: str, ok: bool, elapsed_ms: float,
+                 error: str = None) -> bool:
+        """
+        Отчёт о задаче; принимается, только если аренда всё ещё у этого рабочего
+        Неудачная задача возвращается в очередь, пока не исчерпаны попытки
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute(
+                "SELECT attempts FROM tasks WHERE id = ? AND state = ? AND lease_owner = ?",
+                (task_id, LEASED, worker_id)).fetchone()
+            if row is None:
+                return False
+            if ok:
+                state = DONE
+            else:
+                state = FAILED if row[0] >= self.max_attempts else PENDING
+            self.connection.execute(
+                "UPDATE tasks SET state = ?, finished_at = ?, elapsed_ms = ?, error = ?, "
+                "lease_expires = NULL, lease_owner = CASE WHEN ? THEN lease_owner END WHERE id = ?",
+                (state, time.time(), elapsed_ms, error, state != PENDING, task_id))
+        return True
+
+    def status(self, batch_id: str = None) -> dict:
+        """
+        Сводка по пакету (или по всей очереди): число задач в каждом состоянии,
+        повторы, пропускная способность и вклад каждого рабочего
+        """
+        where, params = ("WHERE batch_id = ?", (batch_id,)) if batch_id else ("", ())
+        counts = {state: 0 for state in (PENDING, LEASED, DONE, FAILED)}
+        for state, count in self.connection.execute(
+                f"SELECT state, COUNT(*) FROM tasks {where} GROUP BY state", params):
+            counts[state] = count
+        retried, first_start, last_finish = self.connection.execute(
+            f"SELECT SUM(attempts > 1), MIN(started_at), MAX(finished_at) FROM tasks {where}",
+            params).fetchone()
+        workers = {}
+        done_filter = f"{where} {'AND' if where else 'WHERE'} state = ?"
+        for owner, count, busy_ms in self.connection.execute(
+                f"SELECT lease_owner, COUNT(*), SUM(elapsed_ms) FROM tasks {done_filter} "
+                f"GROUP BY lease_owner", params + (DONE,)):
+            workers[owner] = {
+                'processed': count,
+                'busy_s': round((busy_ms or 0.0) / 1000, 3),
+                'images_per_busy_sec': count / (busy_ms / 1000) if busy_ms else 0.0,
+            }
+        elapsed = (last_finish - first_start) if first_start and last_finish else 0.0
+        total = sum(counts.values())
+        return {
+            'total': total,
+            'pending': counts[PENDING],
+            'leased': counts[LEASED],
+            'processed': counts[DONE],
+            'failed': counts[FAILED],
+            'retried': retried or 0,
+            'finished': counts[PENDING] + counts[LEASED] == 0,
+            'elapsed_s': round(elapsed, 3),
+            'images_per_sec': counts[DONE] / elapsed if elapsed > 0 else 0.0,
+            'workers': workers,
+        }
+
+    def failures(self, batch_id: str) -> list:
+        """Неудачные задачи пакета: путь входа и последняя ошибка"""
+        return [{'path': path, 'error': error} for path, error in self.connection.execute(
+            "SELECT input_path, error FROM tasks WHERE batch_id = ? AND state = ? ORDER BY id",
+            (batch_id, FAILED))]
+
+    def close(self):
+        self.connection.close()
+
+
+class QueueWorker:
+    """
+    Рабочий узла: берёт задачи в аренду, выполняет рецепт пакета на прогретом
+    ImageProcessor и отчитывается; аренда продлевается перед каждой задачей шарда
+    """
+
+    def __init__(self, queue_path: str, worker_id: str = None, lease_seconds: float = 60.0,
+                 max_attempts: int = 3, shard_tasks: int = 10, poll_interval: float = 0.5,
+                 memory_budget: int = None):
+        self.queue = WorkQueue(queue_path, lease_seconds, max_attempts)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.shard_tasks = shard_tasks
+        self.poll_interval = poll_interval
+        self.memory_budget = memory_budget
+        self.logger = logging.getLogger(__name__)
+        self._recipes = {}
+        self._processor = None
+
+    def _run_task(self, task: dict) -> tuple:
+        from image_processor import ImageProcessor
+        if self._processor is None:
+            self._processor = ImageProcessor(memory_budget=self.memory_budget)
+        recipe = self._recipes.get(task['batch_id'])
+        if recipe is None:
+            recipe = self._recipes[task['batch_id']] = self.queue.recipe(task['batch_id'])
+        try:
+            ok = recipe.apply(self._processor, task['input_path'], task['output_path'])
+            return ok, None if ok else "рецепт не выполнен"
+        except Exception as e:
+            return False, str(e)
+        finally:
+            self._processor.release()
+
+    def run(self, max_tasks: int = None, exit_when_idle: bool = True) -> dict:
+        """
+        Цикл рабочего; exit_when_idle - выйти, когда в очереди не осталось доступных задач
+        Возвращает счётчики processed / failed / rejected
+        """
+        counters = {'processed': 0, 'failed': 0, 'rejected': 0}
+        done = 0
+        try:
+            while max_tasks is None or done < max_tasks:
+                limit = self.shard_tasks if max_tasks is None else min(self.shard_tasks, max_tasks - done)
+                tasks = self.queue.lease(self.worker_id, limit)
+                if not tasks:
+                    if exit_when_idle and self.queue.status()['leased'] == 0:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                for index, task in enumerate(tasks):
+                    self.queue.renew(self.worker_id, [t['id'] for t in tasks[index:]])
+                    start_time = time.perf_counter()
+                    ok, error = self._run_task(task)
+                    elapsed_ms = (time.perf_counter() - start_time) * 1000
+                    if not self.queue.complete(task['id'], self.worker_id, ok, elapsed_ms, error):
+                        counters['rejected'] += 1   # аренда истекла и задача отдана другому
+                    elif ok:
+                        counters['processed'] += 1
+                    else:
+                        counters['failed'] += 1
+                        self.logger.error(f"Ошибка обработки {task['input_path']}: {error}")
+                    done += 1
+        finally:
+            self.queue.close()
+        return counters
+
+
+def _worker_process(queue_path: str, lease_seconds: float, max_attempts: int, log_mode: str):
+    import logging_config
+    logging_config.configure_logging(log_mode)
+    try:
+        QueueWorker(queue_path, lease_seconds=lease_seconds, max_attempts=max_attempts).run()
+    finally:
+        logging_config.shutdown_logging()
+
+
+def start_local_workers(queue_path: str, count: int, lease_seconds: float = 60.0,
+                        max_attempts: int = 3, log_mode: str = 'quiet') -> list:
+    """Запуск count рабочих процессов на этом узле"""
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=_worker_process, name='queue-worker',
+                                          args=(queue_path, lease_seconds, max_attempts, log_mode))
+        process.start()
+        processes.append(process)
+    return processes
+
+
+class Coordinator:
+    """Координатор: ставит пакет в очередь и собирает сводку, пока рабочие его выполняют"""
+
+    def __init__(self, queue_path: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.queue_path = queue_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.queue = WorkQueue(queue_path, lease_seconds, max_attempts)
+
+    def submit(self, recipe: Recipe, paths: list, output_dir: str, shard_size: int = 50) -> str:
+        """Раскрытие файлов и папок (без папки результатов) и постановка пакета в очередь"""
+        return self.queue.submit(recipe, discover_inputs(paths, [output_dir]), output_dir, shard_size, paths)
+
+    def wait(self, batch_id: str, poll_interval: float = 1.0, progress=None,
+             timeout: float = None) -> dict:
+        """
+        Ожидание завершения пакета; progress(status) вызывается на каждом опросе
+        Истёкшие аренды разбираются на каждом опросе - и без живых рабочих
+        timeout - не ждать дольше, с (в сводке finished останется False)
+        Возвращает сводку WorkQueue.status с путями неудачных входов
+        """
+        start_time = time.perf_counter()
+        while True:
+            self.queue.expire_leases()
+            status = self.queue.status(batch_id)
+            if progress is not None:
+                progress(status)
+            if status['finished']:
+                break
+            if timeout is not None and time.perf_counter() - start_time > timeout:
+                break
+            time.sleep(poll_interval)
+        status['batch_id'] = batch_id
+        status['failures'] = self.queue.failures(batch_id)
+        return status
+
+    def close(self):
+        self.queue.close()
@@ -0,0 +1,181 @@
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from recipe import Recipe
+
+# Сколько освобождённых блоков памяти Pillow держит для повторного использования
+# (размер блока по умолчанию 16 МБ); 0 - отдавать память системе сразу
+DEFAULT_CACHED_BLOCKS = 32
+
+
+def _allocated_bytes(processor) -> int:
+    """Сколько байт под изображения выделил процессор с момента создания"""
+    return int(sum(entry['allocated_bytes']['sum'] for entry in processor.stats().values()))
+
+
+def _worker_main(conn, recipe_dict: dict, memory_budget: int, log_mode: str,
+                 max_jobs: int, max_bytes: int, cached_blocks: int):
+    """
+    Цикл рабочего процесса: один прогретый ImageProcessor на все задачи
+    После max_jobs задач или max_bytes выделенной памяти процесс завершается,
+    и пул запускает вместо него новый
+    """
+    import logging_config
+    from PIL import Image
+    from image_processor import ImageProcessor
+
+    logging_config.configure_logging(log_mode)
+    Image.core.set_blocks_max(cached_blocks)
+    recipe = Recipe.from_dict(recipe_dict)
+    processor = ImageProcessor(memory_budget=memory_budget)
+    jobs = 0
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            input_path, output_path = job
+            start_time = time.perf_counter()
+            try:
+                ok, error = recipe.apply(processor, input_path, output_path), None
+            except Exception as e:
+                ok, error = False, str(e)
+            processor.release()
+            jobs += 1
+            recycle = jobs >= max_jobs or (max_bytes is not None
+                                           and _allocated_bytes(processor) >= max_bytes)
+            conn.send({
+                'input': input_path,
+                'output': output_path,
+                'ok': ok,
+                'error': error,
+                'worker': os.getpid(),
+                'elapsed_ms': (time.perf_counter() - start_time) * 1000,
+                'recycle': recycle,
+            })
+            if recycle:
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        logging_config.shutdown_logging()
+        conn.close()
+
+
+class WorkerPool:
+    """
+    Пул долгоживущих рабочих процессов для выполнения рецепта
+    Каждый процесс держит прогретый ImageProcessor и кэш блоков памяти Pillow,
+    поэтому на задачу приходится только работа с пикселями
+    Процесс перезапускается после max_jobs задач или max_bytes выделенной памяти,
+    чтобы ограничить рост памяти; задача упавшего процесса считается неудачной
+    """
+
+    def __init__(self, recipe: Recipe, processes: int = None, max_jobs: int = 500,
+                 max_bytes: int = 4 * 2**30, memory_budget: int = None, log_mode: str = 'quiet',
+                 cached_blocks: int = DEFAULT_CACHED_BLOCKS, start_method: str = None):
+        self.recipe = recipe
+        self.processes = processes or os.cpu_count() or 1
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.memory_budget = memory_budget
+        self.log_mode = log_mode
+        self.cached_blocks = cached_blocks
+        self.recycled = 0
+        self.crashed = 0
+        self.logger = logging.getLogger(__name__)
+        self._context = multiprocessing.get_context(start_method)
+        self._workers = {}   # соединение -> процесс
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, name='image-worker', daemon=True,
+            args=(child_conn, self.recipe.to_dict(), self.memory_budget, self.log_mode,
+                  self.max_jobs, self.max_bytes, self.cached_blocks))
+        process.start()
+        child_conn.close()
+        self._workers[parent_conn] = process
+        return parent_conn
+
+    def _retire(self, conn):
+        process = self._workers.pop(conn)
+        conn.close()
+        process.join()
+
+    def start(self):
+        """Запуск процессов заранее, чтобы первая задача не платила за старт"""
+        while len(self._workers) < self.processes:
+            self._spawn()
+
+    def run(self, jobs):
+        """
+        Выполнение задач (input_path, output_path); результаты выдаются по мере готовности
+        в порядке завершения: словари input / output / ok / error / worker / elapsed_ms
+        """
+        self.start()
+        jobs = iter(jobs)
+        idle = list(self._workers)
+        busy = {}   # соединение -> задача
+        exhausted = False
+        while True:
+            while idle and not exhausted:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                conn = idle.pop()
+                try:
+                    conn.send(tuple(job))
+                except OSError:
+                    # Процесс завершился, пока простаивал: заменяем его
+                    self.crashed += 1
+                    self._retire(conn)
+                    conn = self._spawn()
+                    conn.send(tuple(job))
+                busy[conn] = tuple(job)
+            if not busy:
+                return
+
+            sentinels = {self._workers[conn].sentinel: conn for conn in busy}
+            for ready in wait(list(busy) + list(sentinels)):
+                conn = sentinels.get(ready, ready)
+                if conn not in busy:
+                    continue   # процесс уже обработан через соединение
+                job = busy.pop(conn)
+                crashed = False
+                try:
+                    result = conn.recv()
+                except (EOFError, OSError):
+                    crashed = True
+                    self.crashed += 1
+                    self.logger.error(f"Рабочий процесс завершился аварийно на {job[0]}")
+                    result = {'input': job[0], 'output': job[1], 'ok': False,
+                              'error': "рабочий процесс завершился аварийно",
+                              'worker': self._workers[conn].pid, 'elapsed_ms': 0.0,
+                              'recycle': True}
+                if result.pop('recycle'):
+                    if not crashed:
+                        self.recycled += 1
+                    self._retire(conn)
+                    conn = self._spawn()
+                idle.append(conn)
+                yield result
+
+    def close(self):
+        """Остановка процессов после завершения текущих задач"""
+        for conn in list(self._workers):
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            self._retire(conn)